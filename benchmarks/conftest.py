@@ -0,0 +1,48 @@
+"""
+Fixtures of the benchmarks: a local mock of the coinmarketcap.com api.
+
+Latency and size of the mock api can be set with the environment variables
+CMC_BENCH_LATENCY (seconds per response, default 0.02) and CMC_BENCH_COINS
+(coins of the listing, default 5000).
+"""
+
+from contextlib import ExitStack
+import os
+from unittest.mock import patch
+
+import pytest
+
+import cryptocmd.session
+
+from .server import MockCmcServer
+
+
+@pytest.fixture(scope="session")
+def cmc_server():
+    with MockCmcServer(
+        latency=float(os.environ.get("CMC_BENCH_LATENCY", 0.02)),
+        coins=int(os.environ.get("CMC_BENCH_COINS", 5000)),
+    ) as server:
+        yield server
+
+
+@pytest.fixture
+def cmc_api(cmc_server):
+    """
+    Points the scrapers to the mock api, with a fresh default registry, rate
+    limiter and session. The ones of the process are restored afterwards.
+    """
+    with ExitStack() as stack:
+        stack.enter_context(patch("cryptocmd.utils._CMC_DATA_API", cmc_server.api_url))
+        for name in (
+            "cryptocmd.registry._default_registry",
+            "cryptocmd.throttle._default_rate_limiter",
+            "cryptocmd.session._default_session",
+        ):
+            stack.enter_context(patch(name, None))
+        try:
+            yield cmc_server
+        finally:
+            # the default session opened against the mock api, if any
+            if cryptocmd.session._default_session is not None:
+                cryptocmd.session._default_session.close()
@@ -0,0 +1,122 @@
+"""
+Local stand-in for the coinmarketcap.com data api, serving synthetic responses.
+"""
+
+import datetime
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+from .synthetic import make_listing, make_quote, make_response
+
+# first day of data on coinmarketcap.com
+HISTORY_START = datetime.date(2013, 4, 28)
+
+
+class MockCmcServer(object):
+    """
+    HTTP server answering ``/data-api/v3/cryptocurrency/listing`` and
+    ``/data-api/v3/cryptocurrency/historical`` like coinmarketcap.com does, with
+    synthetic data and a configurable latency.
+
+    Use as a context manager, and point ``cryptocmd.utils._CMC_DATA_API`` to
+    ``api_url``.
+    """
+
+    def __init__(self, latency=0.0, coins=5000, history_start=HISTORY_START):
+        """
+        :param latency: seconds every response is delayed by.
+        :param coins: number of coins of the listing.
+        :param history_start: first day of data of every coin.
+        """
+
+        self.latency = latency
+        self.coins = coins
+        self.history_start = history_start
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def api_url(self):
+        host, port = self._server.server_address[:2]
+        return "http://{}:{}/data-api/v3".format(host, port)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server._count()
+                parts = urlsplit(self.path)
+                if parts.path.endswith("/cryptocurrency/listing"):
+                    body = server._listing()
+                elif parts.path.endswith("/cryptocurrency/historical"):
+                    params = dict(parse_qsl(parts.query))
+                    body = server._historical(
+                        int(params["id"]),
+                        int(params["timeStart"]),
+                        int(params["timeEnd"]),
+                    )
+                else:
+                    self.send_error(404)
+                    return
+
+                time.sleep(server.latency)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def _count(self):
+        with self._lock:
+            self.requests += 1
+
+    @lru_cache(maxsize=1)
+    def _listing(self):
+        listing = make_listing(self.coins)
+        first = listing["data"]["cryptoCurrencyList"][0]
+        first.update(symbol="BTC", name="Bitcoin")
+        return json.dumps(listing).encode()
+
+    @lru_cache(maxsize=256)
+    def _historical(self, coin_id, time_start, time_end):
+        # like the live api: days after timeStart, up to timeEnd
+        day = datetime.datetime.fromtimestamp(time_start, tz=datetime.timezone.utc)
+        day = max(day.date() + datetime.timedelta(days=1), self.history_start)
+        end = datetime.datetime.fromtimestamp(time_end, tz=datetime.timezone.utc).date()
+
+        quotes = []
+        while day <= end:
+            quotes.append(make_quote(day))
+            day += datetime.timedelta(days=1)
+        return json.dumps(make_response(quotes, coin_id=coin_id)).encode()
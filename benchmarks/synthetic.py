@@ -0,0 +1,73 @@
+"""
+Synthetic coinmarketcap.com payloads for the benchmarks.
+"""
+
+import datetime
+
+
+def make_quote(day):
+    """Return a CMC quote dict for a ``datetime.date``."""
+    date_str = day.isoformat()
+    price = 100.0 + day.toordinal() % 1000
+    return {
+        "timeOpen": f"{date_str}T00:00:00.000Z",
+        "timeHigh": f"{date_str}T13:21:00.000Z",
+        "timeLow": f"{date_str}T04:07:00.000Z",
+        "timeClose": f"{date_str}T23:59:59.999Z",
+        "quote": {
+            "open": price,
+            "high": price * 1.05,
+            "low": price * 0.95,
+            "close": price * 1.01,
+            "volume": price * 1e6,
+            "marketCap": price * 1e9,
+            "timestamp": f"{date_str}T23:59:59.999Z",
+        },
+    }
+
+
+def make_quotes(days, end=datetime.date(2025, 12, 31)):
+    """Return ``days`` consecutive daily quotes ending on ``end``, oldest first."""
+    start = end - datetime.timedelta(days=days - 1)
+    return [make_quote(start + datetime.timedelta(days=i)) for i in range(days)]
+
+
+def make_response(quotes, coin_id=1, symbol="BTC", name="Bitcoin"):
+    """Return a CMC historical API response dict."""
+    return {
+        "status": {"error_code": 0, "error_message": None},
+        "data": {"id": coin_id, "symbol": symbol, "name": name, "quotes": quotes},
+    }
+
+
+def make_listing(coins):
+    """Return a CMC listing API response dict of ``coins`` coins."""
+    return {
+        "status": {"error_code": "0", "error_message": "SUCCESS"},
+        "data": {
+            "cryptoCurrencyList": [
+                {
+                    "id": i,
+                    "name": f"Coin {i}",
+                    "symbol": f"C{i}",
+                    "slug": f"coin-{i}",
+                    "cmcRank": i,
+                    "circulatingSupply": 1e9 / i,
+                    "totalSupply": 2e9 / i,
+                    "tags": ["mineable", "pow"],
+                    "quotes": [
+                        {
+                            "name": "USD",
+                            "price": 1.0 / i,
+                            "volume24h": 1e6 / i,
+                            "marketCap": 1e9 / i,
+                            "percentChange24h": 0.5,
+                            "lastUpdated": "2025-12-31T23:59:59.999Z",
+                        }
+                    ],
+                }
+                for i in range(1, coins + 1)
+            ],
+            "totalCount": str(coins),
+        },
+    }
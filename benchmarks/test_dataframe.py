@@ -0,0 +1,50 @@
+"""
+Benchmarks of building a DataFrame of a 20 year series.
+
+Run with: pytest benchmarks/test_dataframe.py
+"""
+
+import pytest
+
+from cryptocmd import CmcScraper
+
+from .synthetic import make_quotes, make_response
+
+pd = pytest.importorskip("pandas")
+
+TWENTY_YEARS = 20 * 365
+
+
+@pytest.fixture(scope="module")
+def scraper():
+    scraper = CmcScraper(id_number=1)
+    scraper._ingest(make_response(make_quotes(TWENTY_YEARS)))
+    return scraper
+
+
+def _legacy_dataframe(headers, rows):
+    """DataFrame building of cryptocmd 0.6.5: object inference, then date parsing."""
+    dataframe = pd.DataFrame(data=rows, columns=headers)
+    dataframe["Date"] = pd.to_datetime(
+        dataframe["Date"], format="%d-%m-%Y", dayfirst=True
+    )
+    return dataframe
+
+
+@pytest.mark.benchmark(group="dataframe")
+def test_legacy_dataframe(benchmark, scraper):
+    headers, rows = scraper.get_data()
+    dataframe = benchmark(_legacy_dataframe, headers, rows)
+    assert len(dataframe) == TWENTY_YEARS
+
+
+@pytest.mark.benchmark(group="dataframe")
+def test_dataframe(benchmark, scraper):
+    dataframe = benchmark(scraper.get_dataframe)
+    assert len(dataframe) == TWENTY_YEARS
+
+
+@pytest.mark.benchmark(group="dataframe")
+def test_dataframe_no_copy(benchmark, scraper):
+    dataframe = benchmark(scraper.get_dataframe, copy=False)
+    assert len(dataframe) == TWENTY_YEARS
@@ -0,0 +1,81 @@
+"""
+Benchmarks of decoding api responses and extracting the fields the scrapers read.
+
+Run with: pytest benchmarks/test_decode.py
+"""
+
+import json
+
+import pytest
+
+from cryptocmd import decode
+from cryptocmd.candles import Candles
+
+from .synthetic import make_listing, make_quotes, make_response
+
+
+class _Response(object):
+    def __init__(self, body):
+        self.content = json.dumps(body).encode()
+
+    def json(self):
+        return json.loads(self.content)
+
+
+@pytest.fixture(scope="module")
+def chunk():
+    # one yearly window of the historical api
+    return _Response(make_response(make_quotes(365)))
+
+
+@pytest.fixture(scope="module")
+def listing():
+    return _Response(make_listing(5000))
+
+
+def _coins(json_data):
+    return [
+        (c["id"], c["symbol"], c["name"])
+        for c in json_data["data"]["cryptoCurrencyList"]
+    ]
+
+
+@pytest.mark.benchmark(group="decode-chunk")
+def test_chunk_stdlib(benchmark, chunk):
+    candles = benchmark(lambda: Candles.from_quotes(chunk.json()["data"]["quotes"]))
+    assert len(candles) == 365
+
+
+@pytest.mark.benchmark(group="decode-chunk")
+def test_chunk_orjson(benchmark, chunk):
+    orjson = pytest.importorskip("orjson")
+    candles = benchmark(
+        lambda: Candles.from_quotes(orjson.loads(chunk.content)["data"]["quotes"])
+    )
+    assert len(candles) == 365
+
+
+@pytest.mark.benchmark(group="decode-chunk")
+def test_chunk_msgspec(benchmark, chunk):
+    pytest.importorskip("msgspec")
+    candles = benchmark(
+        lambda: Candles.from_quotes(decode.historical(chunk)["data"]["quotes"])
+    )
+    assert len(candles) == 365
+
+
+@pytest.mark.benchmark(group="decode-listing")
+def test_listing_stdlib(benchmark, listing):
+    assert len(benchmark(lambda: _coins(listing.json()))) == 5000
+
+
+@pytest.mark.benchmark(group="decode-listing")
+def test_listing_orjson(benchmark, listing):
+    orjson = pytest.importorskip("orjson")
+    assert len(benchmark(lambda: _coins(orjson.loads(listing.content)))) == 5000
+
+
+@pytest.mark.benchmark(group="decode-listing")
+def test_listing_msgspec(benchmark, listing):
+    pytest.importorskip("msgspec")
+    assert len(benchmark(lambda: _coins(decode.listing(listing)))) == 5000
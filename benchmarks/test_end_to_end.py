@@ -0,0 +1,95 @@
+"""
+End to end benchmarks against a local mock of the coinmarketcap.com api: all time
+download, coin id resolution, ingestion, DataFrame and exports.
+
+Run with: pytest benchmarks/test_end_to_end.py
+"""
+
+import io
+import os
+
+import pytest
+from tablib.exceptions import UnsupportedFormat
+
+from cryptocmd import CmcScraper, CmcSession, CoinRegistry
+from cryptocmd.utils import download_coin_data
+
+_EXPORT_FORMATS = ["csv", "tsv", "json", "yaml", "xlsx", "parquet", "arrow"]
+_STREAM_FORMATS = ["csv", "tsv", "jsonl"]
+
+
+@pytest.fixture
+def session():
+    with CmcSession(pool_size=16) as session:
+        yield session
+
+
+@pytest.fixture
+def downloaded(cmc_api, session):
+    scraper = CmcScraper("BTC", session=session)
+    scraper.get_data()
+    return scraper
+
+
+@pytest.mark.parametrize("max_workers", [1, 8])
+@pytest.mark.benchmark(group="download-all-time")
+def test_download_all_time(benchmark, cmc_api, session, max_workers):
+    def download():
+        scraper = CmcScraper("BTC", max_workers=max_workers, session=session)
+        return scraper.get_data()
+
+    _, rows = benchmark.pedantic(download, rounds=5)
+    assert len(rows) > 12 * 365
+
+
+@pytest.mark.benchmark(group="resolve-id")
+def test_resolve_coin_id(benchmark, cmc_api, session):
+    def resolve():
+        return CoinRegistry(session=session).get_id("BTC")
+
+    assert benchmark.pedantic(resolve, rounds=5) == 1
+
+
+@pytest.mark.benchmark(group="ingest-download")
+def test_ingest_rows(benchmark, cmc_api, session):
+    coin_data = download_coin_data("BTC", None, None, "USD", None, session=session)
+    scraper = CmcScraper("BTC")
+
+    def ingest():
+        scraper._ingest(coin_data)
+        return scraper.rows
+
+    assert len(benchmark(ingest)) == len(coin_data["data"]["quotes"])
+
+
+@pytest.mark.parametrize("copy", [True, False])
+@pytest.mark.benchmark(group="dataframe-download")
+def test_get_dataframe(benchmark, downloaded, copy):
+    pytest.importorskip("pandas")
+    dataframe = benchmark(downloaded.get_dataframe, copy=copy)
+    assert len(dataframe) == len(downloaded.candles)
+
+
+@pytest.mark.parametrize("format", _EXPORT_FORMATS)
+@pytest.mark.benchmark(group="export")
+def test_export(benchmark, downloaded, tmp_path, format):
+    # formats whose optional dependency is missing are skipped: tablib raises
+    # UnsupportedFormat, and the pyarrow formats NotImplementedError
+    try:
+        path = downloaded.export(format, name="btc", path=str(tmp_path))
+    except (ImportError, UnsupportedFormat, NotImplementedError) as e:
+        pytest.skip("'{}' export is unavailable: {}".format(format, e))
+    assert path == os.path.join(str(tmp_path), "btc.{}".format(format))
+
+    benchmark(downloaded.export, format, name="btc", path=str(tmp_path))
+
+
+@pytest.mark.parametrize("format", _STREAM_FORMATS)
+@pytest.mark.benchmark(group="export-stream")
+def test_export_stream(benchmark, cmc_api, session, format):
+    def stream():
+        f = io.StringIO()
+        CmcScraper("BTC", max_workers=8, session=session).export_stream(format, f)
+        return f.getvalue()
+
+    assert benchmark.pedantic(stream, rounds=5)
@@ -0,0 +1,48 @@
+"""
+Benchmark of the cold start cost of 'import cryptocmd' in a fresh interpreter.
+
+Run with: pytest benchmarks/test_import.py
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+# cumulative microseconds 'import cryptocmd' may take, about 5x what it takes on a
+# laptop. It took ~240ms when requests, tablib and asyncio were imported eagerly.
+_IMPORT_BUDGET_US = 120_000
+
+
+def _import_time_us(statement="import cryptocmd"):
+    """Return the cumulative import time of cryptocmd in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        _, cumulative_us, name = line.split("|")
+        if name.strip() == "cryptocmd":
+            return int(cumulative_us)
+    raise AssertionError("cryptocmd not in -X importtime output")
+
+
+@pytest.mark.parametrize(
+    "statement",
+    ["import cryptocmd", "from cryptocmd import CmcScraper, CmcSession; CmcSession()"],
+    ids=["import", "session"],
+)
+@pytest.mark.benchmark(group="import")
+def test_import(benchmark, statement):
+    def run():
+        subprocess.run([sys.executable, "-c", statement], check=True)
+
+    benchmark.pedantic(run, rounds=10, warmup_rounds=1)
+
+
+def test_import_within_budget():
+    # best of 3, as the first run also pays for reading cold .pyc files
+    import_time_us = min(_import_time_us() for _ in range(3))
+    assert import_time_us < _IMPORT_BUDGET_US
@@ -0,0 +1,112 @@
+"""
+Benchmarks of parsing downloaded quotes into a scraper, on a 20 year series.
+
+Run with: pytest benchmarks/test_ingest.py
+"""
+
+from datetime import datetime
+
+import pytest
+
+from cryptocmd import CmcScraper
+from cryptocmd import candles
+
+from .synthetic import make_quotes, make_response
+
+TWENTY_YEARS = 20 * 365
+
+
+def _legacy_ingest(quotes, order_ascending):
+    """Row building of cryptocmd 0.6.5: prepend each row, re-parse dates to sort."""
+    rows = []
+    for _row in quotes:
+        _row_quote = _row["quote"]
+        date = datetime.strptime(_row["timeOpen"], "%Y-%m-%dT%H:%M:%S.%fZ").strftime(
+            "%d-%m-%Y"
+        )
+        row = [
+            date,
+            _row_quote["open"],
+            _row_quote["high"],
+            _row_quote["low"],
+            _row_quote["close"],
+            _row_quote["volume"],
+            _row_quote["marketCap"],
+            _row["timeOpen"],
+            _row["timeHigh"],
+            _row["timeLow"],
+            _row["timeClose"],
+        ]
+        rows.insert(0, row)
+
+    if order_ascending:
+        rows.sort(key=lambda x: datetime.strptime(x[0], "%d-%m-%Y"))
+    return rows
+
+
+@pytest.fixture(scope="module")
+def coin_data():
+    return make_response(make_quotes(TWENTY_YEARS))
+
+
+@pytest.mark.parametrize("order_ascending", [False, True])
+@pytest.mark.benchmark(group="ingest")
+def test_legacy_ingest(benchmark, coin_data, order_ascending):
+    quotes = coin_data["data"]["quotes"]
+    rows = benchmark(_legacy_ingest, quotes, order_ascending)
+    assert len(rows) == TWENTY_YEARS
+
+
+@pytest.mark.parametrize("order_ascending", [False, True])
+@pytest.mark.benchmark(group="ingest")
+def test_ingest(benchmark, coin_data, order_ascending):
+    scraper = CmcScraper(id_number=1, order_ascending=order_ascending)
+    benchmark(scraper._ingest, coin_data)
+    assert len(scraper.candles) == TWENTY_YEARS
+
+
+@pytest.mark.parametrize("order_ascending", [False, True])
+@pytest.mark.benchmark(group="ingest-rows")
+def test_ingest_and_rows(benchmark, coin_data, order_ascending):
+    """Ingestion followed by building the get_data() row view."""
+    scraper = CmcScraper(id_number=1, order_ascending=order_ascending)
+
+    def ingest_and_rows():
+        scraper._ingest(coin_data)
+        return scraper.rows
+
+    rows = benchmark(ingest_and_rows)
+    assert len(rows) == TWENTY_YEARS
+
+
+@pytest.fixture(scope="module")
+def timestamps(coin_data):
+    return [
+        _row[field]
+        for _row in coin_data["data"]["quotes"]
+        for field in ("timeOpen", "timeHigh", "timeLow", "timeClose")
+    ]
+
+
+def _clear_caches():
+    candles._day_millis.cache_clear()
+    candles._time_of_day_millis.cache_clear()
+
+
+@pytest.mark.benchmark(group="parse-time")
+def test_parse_time_strptime(benchmark, timestamps):
+    def parse_all():
+        return [
+            datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%fZ") for value in timestamps
+        ]
+
+    benchmark(parse_all)
+
+
+@pytest.mark.benchmark(group="parse-time")
+def test_parse_time(benchmark, timestamps):
+    def parse_all():
+        return [candles.parse_time(value) for value in timestamps]
+
+    # start every round with cold caches
+    benchmark.pedantic(parse_all, setup=_clear_caches, rounds=10)
@@ -0,0 +1,47 @@
+"""
+Benchmarks of rolling a 20 year daily series up into weekly and monthly candles.
+
+Run with: pytest benchmarks/test_resample.py
+"""
+
+import pytest
+
+from cryptocmd import CmcScraper
+
+from .synthetic import make_quotes, make_response
+
+TWENTY_YEARS = 20 * 365
+
+
+@pytest.fixture(scope="module")
+def scraper():
+    scraper = CmcScraper(id_number=1)
+    scraper._ingest(make_response(make_quotes(TWENTY_YEARS)))
+    return scraper
+
+
+@pytest.mark.parametrize("interval", ["1w", "1M"])
+@pytest.mark.benchmark(group="resample")
+def test_resample(benchmark, scraper, interval):
+    candles = benchmark(scraper.candles.resample, interval)
+    assert len(candles) < len(scraper.candles)
+
+
+@pytest.mark.parametrize("rule", ["W-MON", "MS"])
+@pytest.mark.benchmark(group="resample")
+def test_pandas_resample(benchmark, scraper, rule):
+    pytest.importorskip("pandas")
+
+    def resample():
+        dataframe = scraper.get_dataframe(date_as_index=True)
+        return dataframe.resample(rule, label="left", closed="left").agg(
+            {
+                "Open": "first",
+                "High": "max",
+                "Low": "min",
+                "Close": "last",
+                "Volume": "sum",
+            }
+        )
+
+    assert len(benchmark(resample)) < len(scraper.candles)
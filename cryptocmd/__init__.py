@@ -1,2 +1,33 @@
 from .core import *  # noqa
+from .session import CmcSession  # noqa
+from .throttle import RateLimiter, RetryPolicy  # noqa
 from .__version__ import __version__  # noqa
+
+# loaded on first access, so that 'import cryptocmd' does not import asyncio,
+# sqlite3 or the json decoders unless they are used
+_LAZY_ATTRIBUTES = {
+    "AsyncCmcScraper": "aio",
+    "AsyncCmcSession": "aio",
+    "CandleArchive": "archive",
+    "ChunkCheckpoint": "checkpoint",
+    "CmcBatchScraper": "batch",
+    "ResponseCache": "cache",
+    "CoinRegistry": "registry",
+    "CandleStore": "store",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+    from importlib import import_module
+
+    value = getattr(import_module("." + module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,581 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Asyncio client for cryptocurrency price history from coinmarketcap.com
+"""
+
+import asyncio
+from collections import deque
+import itertools
+import weakref
+
+from . import events, utils
+from .candles import Candles, Resampler, _parse_interval
+from .core import _Downloaded
+from .registry import _listing_url, get_default_registry
+from .session import _HEADERS
+from .throttle import RetryPolicy, get_default_rate_limiter
+
+# windows requested at once when max_workers is not given
+_DEFAULT_CONCURRENCY = 8
+
+# asyncio.Lock of each registry, per event loop, so that the coroutines finding
+# the listing stale download it once between them
+_registry_locks = weakref.WeakKeyDictionary()
+
+
+def _import_aiohttp():
+    try:
+        import aiohttp
+    except ImportError:
+        aiohttp = None
+
+    if aiohttp is None:
+        raise NotImplementedError(
+            "Asyncio client requires 'aiohttp' to be installed."
+            "Try : pip install aiohttp"
+        )
+    return aiohttp
+
+
+class AsyncCmcSession(object):
+    """
+    Keep-alive aiohttp session with a connection pool, the asyncio counterpart of
+    CmcSession. It must be used from within a running event loop.
+
+    """
+
+    def __init__(
+        self, pool_size=10, timeout=30, headers=None, rate_limiter=None, retry=None
+    ):
+        """
+        :param pool_size: maximum number of connections kept open.
+        :param timeout: (optional) total seconds to wait for a request, ``None`` waits
+            forever.
+        :param headers: (optional) extra headers sent with every request.
+        :param rate_limiter: (optional) RateLimiter to send requests through, the
+            process-wide one shared with CmcSession by default.
+        :param retry: (optional) RetryPolicy of failed requests, as for CmcSession.
+        """
+
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.retry = RetryPolicy() if retry is None else retry
+        self.headers = dict(_HEADERS, **(headers or {}))
+        self._session = None
+
+    def __repr__(self):
+        return "<AsyncCmcSession pool_size:{}, timeout:{}>".format(
+            self.pool_size, self.timeout
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    def _client(self):
+        if self._session is None:
+            aiohttp = _import_aiohttp()
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def get_json(self, url):
+        """
+        Sends a GET request and decodes the json body of the response.
+        :param url: 'url' to request
+        :return: json data of the response
+        """
+
+        aiohttp = _import_aiohttp()
+        rate_limiter = self.rate_limiter or get_default_rate_limiter()
+        retry = self.retry or RetryPolicy(max_retries=0)
+
+        attempt = 0
+        while True:
+            wait = rate_limiter.reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            try:
+                async with self._client().get(url) as response:
+                    status = response.status
+                    if status in retry.statuses and retry.should_retry(attempt, status):
+                        delay = retry.delay(
+                            attempt, response.headers.get("Retry-After")
+                        )
+                    else:
+                        # an error page, or retries are exhausted
+                        response.raise_for_status()
+                        rate_limiter.succeeded()
+                        return await response.json(content_type=None)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if not retry.should_retry(attempt):
+                    raise
+                delay = retry.delay(attempt)
+            else:
+                if status == 429:
+                    rate_limiter.throttled(delay)
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def close(self):
+        """Close all pooled connections."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+async def get_url_data(url, session):
+    """
+    This coroutine downloads the json data of the web page.
+    :param url: 'url' of the web page to download
+    :param session: AsyncCmcSession to send the request through
+    :return: json data of the response
+    """
+
+    try:
+        return await session.get_json(url)
+    except Exception as e:
+        print("Error message (get_url_data) :", e)
+        raise e
+
+
+async def get_coin_id(coin_code, coin_name, session, registry=None):
+    """
+    This coroutine fetches the id of currency from the given code, sharing the
+    coin registry of the synchronous API.
+    :param coin_code: coin code of a cryptocurrency e.g. btc
+    :param coin_name: coin name in case of many coins with same code e.g. sol -> solana, solcoin
+    :param session: AsyncCmcSession to send the request through
+    :param registry: (optional) CoinRegistry to resolve the code with.
+    :return: numeric coin id for the cryptocurrency on coinmarketcap.com
+    """
+
+    if registry is None:
+        registry = get_default_registry()
+
+    try:
+        if registry.is_stale:
+            async with _registry_lock(registry):
+                # the file cache is read and written off the event loop
+                if registry.is_stale and not await asyncio.to_thread(
+                    registry._load_cache
+                ):
+                    json_data = await get_url_data(_listing_url(), session)
+                    await asyncio.to_thread(registry.update, json_data)
+        return registry.get_id(coin_code, coin_name)
+    except Exception as e:
+        print("Error fetching coin id data for coin code {}".format(coin_code))
+        print("Error message:", e)
+        raise e
+
+
+def _registry_lock(registry):
+    loop = asyncio.get_running_loop()
+    locks = _registry_locks.setdefault(registry, weakref.WeakKeyDictionary())
+    lock = locks.get(loop)
+    if lock is None:
+        lock = locks[loop] = asyncio.Lock()
+    return lock
+
+
+async def download_coin_data(
+    coin_code,
+    start_date,
+    end_date,
+    fiat,
+    coin_name,
+    id_number=None,
+    max_workers=None,
+    session=None,
+):
+    """
+    Asyncio version of ``utils.download_coin_data``, requesting the yearly chunks
+    concurrently.
+
+    :param coin_code: coin code of a cryptocurrency e.g. btc
+    :param start_date: date since when to scrape data (in the format of dd-mm-yyyy)
+    :param end_date: date to which scrape the data (in the format of dd-mm-yyyy).
+    :param fiat: fiat code eg. USD, EUR
+    :param coin_name: coin name in case of many coins with same code e.g. sol -> solana, solcoin
+    :param id_number: id number for the token on coinmarketcap. Will override coin_code and coin_name when provided.
+    :param max_workers: (optional) number of yearly chunks requested at once.
+    :param session: (optional) AsyncCmcSession to send the requests through.
+        A session is opened for the call when not given.
+
+    :return: json data with historical OHLCV data for the cryptocurrency
+    """
+
+    start_dt, end_dt = utils._date_range(start_date, end_date)
+
+    own_session = session is None
+    if own_session:
+        session = AsyncCmcSession()
+
+    try:
+        coin_id = id_number or await get_coin_id(coin_code, coin_name, session)
+        convert_id = utils._get_convert_id(fiat)
+        semaphore = asyncio.Semaphore(max_workers or _DEFAULT_CONCURRENCY)
+
+        async def fetch_chunk(window):
+            async with semaphore:
+                api_url = utils._historical_url(coin_id, convert_id, *window)
+                return utils._check_chunk(await get_url_data(api_url, session))
+
+        tasks = [
+            asyncio.ensure_future(fetch_chunk(window))
+            for window in utils._chunk_windows(start_dt, end_dt)
+        ]
+        try:
+            return utils._merge_chunks(await asyncio.gather(*tasks))
+        except Exception as e:
+            for task in tasks:
+                task.cancel()
+            print(
+                "Error fetching price data for {} for interval '{}' and '{}'".format(
+                    f"(id {id_number})" if id_number else coin_code,
+                    start_dt.strftime("%d-%m-%Y"),
+                    end_dt.strftime("%d-%m-%Y"),
+                )
+            )
+            print("Error message (download_data) :", e)
+            raise e
+    finally:
+        if own_session:
+            await session.close()
+
+
+async def _iter_coin_chunks(
+    coin_code,
+    start_date,
+    end_date,
+    fiat,
+    coin_name,
+    id_number=None,
+    max_workers=None,
+    session=None,
+    newest_first=False,
+):
+    """
+    Asyncio version of ``utils._iter_coin_chunks``: at most ``max_workers`` windows
+    are requested ahead of the one being consumed, so memory stays bounded.
+    Parameters are the same as the ones of ``download_coin_data``.
+    :param newest_first: (optional) yield the newest window first.
+    :return: async generator of json data of each window, in the requested order
+    """
+
+    start_dt, end_dt = utils._date_range(start_date, end_date)
+
+    own_session = session is None
+    if own_session:
+        session = AsyncCmcSession()
+
+    pending = deque()
+    try:
+        coin_id = id_number or await get_coin_id(coin_code, coin_name, session)
+        convert_id = utils._get_convert_id(fiat)
+
+        windows = utils._chunk_windows(start_dt, end_dt)
+        if newest_first:
+            windows.reverse()
+
+        async def fetch_chunk(window):
+            api_url = utils._historical_url(coin_id, convert_id, *window)
+            return utils._check_chunk(await get_url_data(api_url, session))
+
+        windows = iter(windows)
+        for window in itertools.islice(windows, max_workers or _DEFAULT_CONCURRENCY):
+            pending.append(asyncio.ensure_future(fetch_chunk(window)))
+
+        while pending:
+            json_data = await pending.popleft()
+            for window in itertools.islice(windows, 1):
+                pending.append(asyncio.ensure_future(fetch_chunk(window)))
+            yield json_data
+    except Exception as e:
+        print(
+            "Error fetching price data for {} for interval '{}' and '{}'".format(
+                f"(id {id_number})" if id_number else coin_code,
+                start_dt.strftime("%d-%m-%Y"),
+                end_dt.strftime("%d-%m-%Y"),
+            )
+        )
+        print("Error message (download_data) :", e)
+        raise e
+    finally:
+        for task in pending:
+            task.cancel()
+        if own_session:
+            await session.close()
+
+
+# attributes of AsyncCmcScraper which are the ones of its CmcScraper
+_SCRAPER_ATTRIBUTES = frozenset(
+    [
+        "coin_code",
+        "coin_name",
+        "start_date",
+        "end_date",
+        "all_time",
+        "order_ascending",
+        "fiat",
+        "id_number",
+        "max_workers",
+        "symbol",
+        "headers",
+        "candles",
+        "rows",
+    ]
+)
+
+
+class AsyncCmcScraper(object):
+    """
+    Asyncio version of CmcScraper: ``get_data``, ``get_dataframe``, ``to_arrow``,
+    ``export`` and ``export_stream`` are awaitable, ``iter_quotes`` is an async
+    generator, and ``session`` is an AsyncCmcSession.
+
+    The downloaded data is kept, and formatted, by the CmcScraper ``scraper``, whose
+    attributes e.g. ``candles``, ``start_date`` or ``rows`` are readable here too.
+
+    """
+
+    def __init__(
+        self,
+        coin_code=None,
+        start_date=None,
+        end_date=None,
+        all_time=False,
+        order_ascending=False,
+        fiat="USD",
+        coin_name=None,
+        id_number=None,
+        max_workers=None,
+        session=None,
+    ):
+        """
+        Parameters are the same as the ones of ``CmcScraper``.
+        :param max_workers: (optional) number of yearly chunks requested at once.
+        :param session: (optional) AsyncCmcSession to send the requests through.
+            A session is opened for each download when not given.
+        """
+
+        self.scraper = _Downloaded(
+            coin_code,
+            start_date,
+            end_date,
+            all_time,
+            order_ascending,
+            fiat,
+            coin_name,
+            id_number=id_number,
+            max_workers=max_workers,
+        )
+        self.session = session
+
+    def __repr__(self):
+        return "<AsyncCmcScraper coin_code:{}, start_date:{}, end_date:{}, all_time:{}>".format(
+            self.coin_code, self.start_date, self.end_date, self.all_time
+        )
+
+    def __getattr__(self, name):
+        if name in _SCRAPER_ATTRIBUTES:
+            return getattr(self.scraper, name)
+        raise AttributeError(
+            "'AsyncCmcScraper' object has no attribute '{}'".format(name)
+        )
+
+    async def _download_data(self, **kwargs):
+        """
+        This coroutine downloads the data.
+        :param forced: (optional) if ``True``, data will be re-downloaded.
+        :return:
+        """
+
+        forced = kwargs.get("forced")
+        scraper = self.scraper
+
+        if len(scraper.candles) and not forced:
+            return
+
+        if scraper.all_time:
+            scraper.start_date, scraper.end_date = None, None
+
+        coin_data = await download_coin_data(
+            scraper.coin_code,
+            scraper.start_date,
+            scraper.end_date,
+            scraper.fiat,
+            scraper.coin_name,
+            scraper.id_number,
+            max_workers=scraper.max_workers,
+            session=self.session,
+        )
+
+        scraper._ingest(coin_data)
+
+    async def get_data(self, format="", verbose=False, interval=None, **kwargs):
+        """
+        This coroutine returns the downloaded data in specified format.
+        Parameters are the same as the ones of ``CmcScraper.get_data``.
+        """
+
+        if interval is not None:
+            _parse_interval(interval)
+
+        await self._download_data(**kwargs)
+        return self.scraper.get_data(format, verbose, interval)
+
+    async def get_dataframe(
+        self, date_as_index=False, coin_column=False, copy=True, interval=None, **kwargs
+    ):
+        """
+        This coroutine gives scraped data as DataFrame.
+        Parameters are the same as the ones of ``CmcScraper.get_dataframe``.
+        """
+
+        if interval is not None:
+            _parse_interval(interval)
+
+        await self._download_data(**kwargs)
+        return self.scraper.get_dataframe(date_as_index, coin_column, copy, interval)
+
+    async def to_arrow(self, coin_column=False, **kwargs):
+        """
+        This coroutine gives scraped data as a typed Arrow table.
+        Parameters are the same as the ones of ``CmcScraper.to_arrow``.
+        """
+
+        await self._download_data(**kwargs)
+        return self.scraper.to_arrow(coin_column)
+
+    async def export(
+        self,
+        format,
+        name=None,
+        path=None,
+        partition_by=None,
+        compression=None,
+        **kwargs,
+    ):
+        """
+        This coroutine exports the data to specified file format.
+        Parameters are the same as the ones of ``CmcScraper.export``.
+        :return: path of the exported file, or ``None`` if it could not be written.
+        """
+
+        await self._download_data(**kwargs)
+        return self.scraper.export(format, name, path, partition_by, compression)
+
+    async def _iter_candles(self):
+        """
+        This coroutine downloads the data one yearly chunk at a time, without
+        keeping it.
+        :return: async generator of Candles of each chunk, in the order of the scraper
+        """
+
+        scraper = self.scraper
+        descending = not scraper.order_ascending
+
+        async for json_data in _iter_coin_chunks(
+            scraper.coin_code,
+            None if scraper.all_time else scraper.start_date,
+            None if scraper.all_time else scraper.end_date,
+            scraper.fiat,
+            scraper.coin_name,
+            scraper.id_number,
+            scraper.max_workers,
+            self.session,
+            newest_first=descending,
+        ):
+            yield Candles.from_quotes(
+                json_data["data"]["quotes"], descending=descending
+            )
+
+    async def _iter_chunk_candles(self, interval=None):
+        """
+        This coroutine downloads the data one yearly chunk at a time, rolled up into
+        candles of ``interval`` if given, see ``resample_chunks``.
+        :return: async generator of Candles, in the order of the scraper
+        """
+
+        if interval is None:
+            async for candles in self._iter_candles():
+                yield candles
+            return
+
+        resampler = Resampler(interval, descending=not self.scraper.order_ascending)
+        async for candles in self._iter_candles():
+            out = resampler.feed(candles)
+            if len(out):
+                yield out
+
+        out = resampler.flush()
+        if len(out):
+            yield out
+
+    async def iter_quotes(self, batch_size=None, interval=None):
+        """
+        This async generator downloads the data lazily, one yearly chunk at a time.
+        Parameters are the same as the ones of ``CmcScraper.iter_quotes``.
+        :return: async generator of rows, or of lists of rows
+        """
+
+        if interval is not None:
+            _parse_interval(interval)
+
+        batch = []
+        async for candles in self._iter_chunk_candles(interval):
+            if not batch_size:
+                for row in candles.iter_rows():
+                    yield row
+                continue
+
+            for row in candles.iter_rows():
+                batch.append(row)
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+
+        if batch:
+            yield batch
+
+    async def export_stream(
+        self, format, file=None, name=None, path=None, interval=None
+    ):
+        """
+        This coroutine exports the data to specified file format while it is
+        downloaded, writing each yearly chunk as soon as it arrives.
+        Parameters are the same as the ones of ``CmcScraper.export_stream``.
+        """
+
+        scraper = self.scraper
+        scraper._check_stream(format, interval)
+
+        if file is not None:
+            await self._write_stream(format, file, interval)
+            return
+
+        _file = scraper._stream_file(format, name, path)
+
+        try:
+            with open(_file, "w", newline="", encoding="utf-8") as f:
+                await self._write_stream(format, f, interval)
+        except IOError as err:
+            errno, strerror = err.args
+            print("I/O error({0}): {1}".format(errno, strerror))
+
+    async def _write_stream(self, format, f, interval=None):
+        with events.span("cryptocmd.export", **{"cryptocmd.format": format}):
+            write = self.scraper._chunk_writer(format, f)
+            async for candles in self._iter_chunk_candles(interval):
+                write(candles)
@@ -0,0 +1,377 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Memory-mapped binary archive of daily candles, for fast repeated reads
+"""
+
+import os
+
+from . import utils
+from .candles import _DAY, _EPOCH_ORDINAL, Candles, format_date, format_time, _value
+from .core import CmcScraper
+
+_MAGIC = b"CMCCNDL1"
+_VERSION = 1
+_HEADER_SIZE = 64
+_SUFFIX = ".candles"
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+
+    if numpy is None:
+        raise NotImplementedError(
+            "Candle archive requires 'numpy' to be installed." "Try : pip install numpy"
+        )
+    return numpy
+
+
+def _dtypes(np):
+    # little-endian header, followed by the int32 day index of the records (padded
+    # to 8 bytes) and the fixed-width records, oldest first
+    header = np.dtype(
+        [
+            ("magic", "S8"),
+            ("version", "<u4"),
+            ("record_size", "<u4"),
+            ("count", "<u8"),
+            ("coin_id", "<i8"),
+            ("fiat", "S8"),
+            ("reserved", "S24"),
+        ]
+    )
+    record = np.dtype(
+        [(name, "<i8") for name in Candles.time_columns]
+        + [(name, "<f8") for name in Candles.value_columns]
+    )
+    return header, record
+
+
+def _records_offset(count):
+    return _HEADER_SIZE + (count * 4 + 7) // 8 * 8
+
+
+def _epoch_day(dt):
+    # day number since the unix epoch of a datetime
+    return dt.date().toordinal() - _EPOCH_ORDINAL
+
+
+class ArchivedCandles(Candles):
+    """
+    Read-only Candles whose columns are views of memory-mapped archive records,
+    so slicing and reading them does not copy nor parse anything.
+
+    """
+
+    def __init__(self, records, descending=False):
+        """
+        :param records: structured array of archive records, oldest first
+        :param descending: order candles newest first instead of oldest first.
+        """
+
+        self.records = records[::-1] if descending else records
+        for name in self.value_columns + self.time_columns:
+            setattr(self, name, self.records[name])
+
+    def __repr__(self):
+        return "<ArchivedCandles rows:{}>".format(len(self))
+
+    def extend(self, quotes):
+        raise NotImplementedError("ArchivedCandles are read-only.")
+
+    def reverse(self):
+        """Reverses the order of the candles, without copying them."""
+        self.__init__(self.records[::-1])
+
+    def sort(self, descending=False):
+        """
+        Sorts the candles by 'Time Open', without copying them.
+        :param descending: sort newest first instead of oldest first.
+        """
+
+        if not self.is_sorted(descending):
+            self.reverse()
+
+    def is_sorted(self, descending=False):
+        """
+        Checks whether candles are ordered by 'Time Open'.
+        :param descending: check for newest first instead of oldest first.
+        """
+
+        if len(self) < 2:
+            return True
+        return (self.time_open[0] <= self.time_open[-1]) != descending
+
+    def as_numpy(self, name, copy=True):
+        """
+        Returns a column as a NumPy array, float64 for values and int64 for times.
+        :param name: name of the column e.g. 'close', 'time_open'
+        :param copy: if ``False``, a read-only view of the memory-mapped file is
+            returned instead of a copy.
+        """
+
+        np = _import_numpy()
+
+        column = getattr(self, name)
+        if copy:
+            return np.array(column)
+
+        view = column.view()
+        view.flags.writeable = False
+        return view
+
+    def row(self, index):
+        """
+        Returns a single candle in the row format of ``CmcScraper.get_data``.
+        :param index: position of the candle
+        """
+
+        record = self.records[index].item()
+        times, values = (
+            record[: len(self.time_columns)],
+            record[len(self.time_columns) :],
+        )
+        row = [format_date(times[0])]
+        row.extend(_value(value) for value in values)
+        row.extend(format_time(millis) for millis in times)
+        return row
+
+
+class CandleArchive(object):
+    """
+    Directory of binary candle files, one per (coin id, fiat).
+
+    Each file is a 64 bytes header, an int32 index of the days of the candles and
+    the candles as fixed-width records of int64 times (milliseconds since the unix
+    epoch) and float64 prices, volume and market cap, oldest first. Files are read
+    through ``numpy.memmap``: date ranges are found by binary search on the index,
+    and served as views of the file.
+
+    """
+
+    def __init__(self, path):
+        """
+        :param path: directory of the archive, created if it does not exist.
+        """
+
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def __repr__(self):
+        return "<CandleArchive path:{}>".format(self.path)
+
+    def _file(self, coin_id, fiat):
+        return os.path.join(self.path, "{}_{}{}".format(coin_id, fiat.upper(), _SUFFIX))
+
+    def _read(self, coin_id, fiat):
+        # (day index, records) memory-mapped from the file, or None
+        np = _import_numpy()
+        header_dtype, record_dtype = _dtypes(np)
+
+        path = self._file(coin_id, fiat)
+        if not os.path.exists(path):
+            return None
+
+        header = np.fromfile(path, dtype=header_dtype, count=1)
+        if len(header) != 1 or header["magic"][0] != _MAGIC:
+            raise ValueError("'{}' is not a candle archive file.".format(path))
+        if header["record_size"][0] != record_dtype.itemsize:
+            raise ValueError(
+                "'{}' was written with an incompatible record layout.".format(path)
+            )
+
+        count = int(header["count"][0])
+        if count == 0:
+            return np.empty(0, dtype="<i4"), np.empty(0, dtype=record_dtype)
+
+        index = np.memmap(
+            path, dtype="<i4", mode="r", offset=_HEADER_SIZE, shape=(count,)
+        )
+        records = np.memmap(
+            path,
+            dtype=record_dtype,
+            mode="r",
+            offset=_records_offset(count),
+            shape=(count,),
+        )
+        return index, records
+
+    def put(self, coin_id, fiat, candles):
+        """
+        Adds candles to the archive, replacing the ones of the same days.
+        :param coin_id: coinmarketcap.com id of the coin
+        :param fiat: fiat code eg. USD, EUR
+        :param candles: Candles to add, in any order
+        """
+
+        np = _import_numpy()
+        header_dtype, record_dtype = _dtypes(np)
+
+        records = np.empty(len(candles), dtype=record_dtype)
+        for name in candles.value_columns + candles.time_columns:
+            records[name] = candles.as_numpy(name, copy=False)
+
+        existing = self._read(coin_id, fiat)
+        if existing is not None:
+            records = np.concatenate([existing[1], records])
+            del existing
+
+        # keep the last candle added for each day, oldest day first
+        days = records["time_open"] // _DAY
+        _, last = np.unique(days[::-1], return_index=True)
+        records = records[len(records) - 1 - last]
+        count = len(records)
+
+        header = np.zeros(1, dtype=header_dtype)
+        header["magic"] = _MAGIC
+        header["version"] = _VERSION
+        header["record_size"] = record_dtype.itemsize
+        header["count"] = count
+        header["coin_id"] = coin_id
+        header["fiat"] = fiat.upper().encode("ascii")
+
+        index = np.zeros((_records_offset(count) - _HEADER_SIZE) // 4, dtype="<i4")
+        index[:count] = records["time_open"] // _DAY
+
+        path = self._file(coin_id, fiat)
+        tmp_path = "{}.tmp".format(path)
+        with open(tmp_path, "wb") as f:
+            f.write(header.tobytes())
+            f.write(index.tobytes())
+            f.write(records.tobytes())
+        os.replace(tmp_path, path)
+
+    def get(self, coin_id, fiat, start_date=None, end_date=None, order_ascending=False):
+        """
+        Reads candles of a date range, as views of the memory-mapped file.
+        :param coin_id: coinmarketcap.com id of the coin
+        :param fiat: fiat code eg. USD, EUR
+        :param start_date: (optional) first date to read (in the format of dd-mm-yyyy)
+        :param end_date: (optional) last date to read (in the format of dd-mm-yyyy)
+        :param order_ascending: data ordered by 'Date' in ascending order (i.e. oldest first).
+        :return: ArchivedCandles of the range, empty if the coin is not archived
+        """
+
+        np = _import_numpy()
+
+        found = self._read(coin_id, fiat)
+        if found is None:
+            return ArchivedCandles(np.empty(0, dtype=_dtypes(np)[1]))
+        index, records = found
+
+        start_dt, end_dt = utils._date_range(start_date, end_date)
+        lo = np.searchsorted(index, _epoch_day(start_dt), side="left")
+        hi = np.searchsorted(index, _epoch_day(end_dt), side="right")
+        return ArchivedCandles(records[lo:hi], descending=not order_ascending)
+
+    def save(self, scraper, coin_id=None):
+        """
+        Adds the data of a scraper to the archive.
+        :param scraper: CmcScraper which downloaded its data.
+        :param coin_id: (optional) coinmarketcap.com id of the coin. Defaults to the
+            ``id_number`` of the scraper, or its coin code resolved to an id.
+        """
+
+        if coin_id is None:
+            coin_id = scraper.id_number or utils.get_coin_id(
+                scraper.coin_code, scraper.coin_name, session=scraper.session
+            )
+        self.put(coin_id, scraper.fiat, scraper.candles)
+
+    def scraper(
+        self,
+        coin_id,
+        start_date=None,
+        end_date=None,
+        all_time=False,
+        order_ascending=False,
+        fiat="USD",
+        coin_code=None,
+    ):
+        """
+        Returns a scraper serving archived data instead of downloading it.
+        :param coin_id: coinmarketcap.com id of the coin
+        :param start_date: date since when to read data (in the format of dd-mm-yyyy)
+        :param end_date: date to which read the data (in the format of dd-mm-yyyy).
+        :param all_time: 'True' if need all archived data of the coin
+        :param order_ascending: data ordered by 'Date' in ascending order (i.e. oldest first).
+        :param fiat: fiat code eg. USD, EUR
+        :param coin_code: (optional) coin code used to name exports.
+        :return: ArchiveScraper of the data
+        """
+
+        return ArchiveScraper(
+            self,
+            coin_id,
+            start_date,
+            end_date,
+            all_time,
+            order_ascending,
+            fiat,
+            coin_code,
+        )
+
+
+class ArchiveScraper(CmcScraper):
+    """
+    CmcScraper reading its data from a CandleArchive instead of coinmarketcap.com.
+    ``get_data``, ``get_dataframe``, ``export`` and the streaming methods work the
+    same, and ``get_dataframe(copy=False)`` does not copy the archived columns.
+
+    """
+
+    def __init__(
+        self,
+        archive,
+        coin_id,
+        start_date=None,
+        end_date=None,
+        all_time=False,
+        order_ascending=False,
+        fiat="USD",
+        coin_code=None,
+    ):
+        """
+        :param archive: CandleArchive to read the data from
+        Other parameters are the same as the ones of ``CandleArchive.scraper``.
+        """
+
+        super(ArchiveScraper, self).__init__(
+            coin_code,
+            start_date,
+            end_date,
+            all_time,
+            order_ascending,
+            fiat,
+            id_number=coin_id,
+        )
+        self.archive = archive
+        self._load()
+
+    def __repr__(self):
+        return "<ArchiveScraper coin_id:{}, start_date:{}, end_date:{}, all_time:{}>".format(
+            self.id_number, self.start_date, self.end_date, self.all_time
+        )
+
+    def _load(self):
+        candles = self.archive.get(
+            self.id_number,
+            self.fiat,
+            None if self.all_time else self.start_date,
+            None if self.all_time else self.end_date,
+            self.order_ascending,
+        )
+        self.candles = candles
+        self._update_dates()
+
+    def _download_data(self, **kwargs):
+        # data is read from the archive; 'forced' re-reads the file
+        if kwargs.get("forced"):
+            self._load()
+
+    def _iter_candles(self):
+        yield self.candles
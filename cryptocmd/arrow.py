@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Typed Parquet and Arrow IPC (Feather) export of daily candles
+"""
+
+# formats written with pyarrow instead of tablib
+_ARROW_FORMATS = ("parquet", "arrow", "feather")
+
+# columns the data can be partitioned by
+_PARTITION_COLUMNS = ("Coin", "Fiat", "Year")
+
+_DAY = 24 * 60 * 60 * 1000
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        pyarrow = None
+
+    if pyarrow is None:
+        raise NotImplementedError(
+            "Parquet and Arrow formats require 'pyarrow' to be installed."
+            "Try : pip install pyarrow"
+        )
+    return pyarrow
+
+
+def _constant_column(pa, value, length):
+    # dictionary encoded column holding a single value, e.g. the coin of a scraper
+    indices = pa.array([0] * length, type=pa.int32())
+    return pa.DictionaryArray.from_arrays(indices, pa.array([str(value)]))
+
+
+def candles_to_table(candles, headers, coin=None, fiat=None):
+    """
+    Converts candles to an Arrow table, with typed columns: 'Date' as date32,
+    prices, volume and market cap as float64 (missing values as nulls) and times
+    as UTC millisecond timestamps.
+    :param candles: Candles to convert
+    :param headers: names of the columns, as ``CmcScraper.headers``
+    :param coin: (optional) value of a dictionary encoded 'Coin' column to add.
+    :param fiat: (optional) value of a dictionary encoded 'Fiat' column to add.
+    :return: pyarrow.Table of the candles
+    """
+
+    pa = _import_pyarrow()
+    import numpy as np
+
+    time_open = candles.as_numpy("time_open", copy=False)
+    arrays = [pa.array((time_open // _DAY).astype(np.int32), type=pa.date32())]
+    for name in candles.value_columns:
+        values = candles.as_numpy(name, copy=False)
+        arrays.append(pa.array(values, mask=np.isnan(values)))
+    for name in candles.time_columns:
+        arrays.append(
+            pa.array(
+                candles.as_numpy(name, copy=False), type=pa.timestamp("ms", tz="UTC")
+            )
+        )
+    names = list(headers)
+
+    if fiat is not None:
+        arrays.insert(0, _constant_column(pa, fiat, len(candles)))
+        names.insert(0, "Fiat")
+    if coin is not None:
+        arrays.insert(0, _constant_column(pa, coin, len(candles)))
+        names.insert(0, "Coin")
+
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def _partition_columns(partition_by):
+    columns = [column.capitalize() for column in partition_by]
+    for column in columns:
+        if column not in _PARTITION_COLUMNS:
+            raise ValueError(
+                "Unknown partition column '{}'. Available: {}".format(
+                    column, ", ".join(_PARTITION_COLUMNS)
+                )
+            )
+    return columns
+
+
+def write_table(
+    table, format, file, partition_by=None, compression=None, basename_template=None
+):
+    """
+    Writes an Arrow table as Parquet or Arrow IPC (Feather v2).
+    :param table: pyarrow.Table to write
+    :param format: 'parquet', 'arrow' or 'feather'
+    :param file: path of the file, or of the directory if partitioned.
+    :param partition_by: (optional) list of columns to partition the data by, among
+        'coin', 'fiat' and 'year'. A hive style directory tree (e.g.
+        ``Coin=BTC/Year=2024/``) is written instead of a single file.
+    :param compression: (optional) compression codec e.g. 'zstd', 'lz4', 'snappy'.
+        Parquet defaults to 'zstd'. Arrow IPC defaults to uncompressed, so the file
+        can be memory-mapped without copying.
+    :param basename_template: (optional) partitioned only, name of the files written
+        in each partition, with '{i}' replaced by a counter e.g. 'btc-{i}.parquet'.
+        Files of the same name are overwritten, others are kept.
+    """
+
+    pa = _import_pyarrow()
+
+    if format not in _ARROW_FORMATS:
+        raise ValueError(
+            "Format '{}' is not an Arrow format. Available: {}".format(
+                format, ", ".join(_ARROW_FORMATS)
+            )
+        )
+
+    if format == "parquet":
+        compression = compression or "zstd"
+    else:
+        compression = compression or "uncompressed"
+
+    if not partition_by:
+        if format == "parquet":
+            import pyarrow.parquet as pq
+
+            pq.write_table(table, file, compression=compression)
+        else:
+            import pyarrow.feather as feather
+
+            feather.write_feather(table, file, compression=compression)
+        return
+
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+
+    columns = _partition_columns(partition_by)
+    if "Year" in columns:
+        table = table.append_column(
+            "Year", pc.year(table.column("Date")).cast(pa.int16())
+        )
+    missing = [column for column in columns if column not in table.column_names]
+    if missing:
+        raise ValueError("Data has no '{}' column.".format("', '".join(missing)))
+
+    if format == "parquet":
+        file_format = ds.ParquetFileFormat()
+        file_options = file_format.make_write_options(compression=compression)
+    else:
+        file_format = ds.IpcFileFormat()
+        codec = None if compression == "uncompressed" else compression
+        file_options = file_format.make_write_options(compression=codec)
+
+    ds.write_dataset(
+        table,
+        file,
+        format=file_format,
+        file_options=file_options,
+        partitioning=columns,
+        partitioning_flavor="hive",
+        basename_template=basename_template or "part-{{i}}.{}".format(format),
+        existing_data_behavior="overwrite_or_ignore",
+    )
@@ -0,0 +1,336 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Scrape the price history of many cryptocurrencies at once
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+from . import events, utils
+from .arrow import _ARROW_FORMATS, _import_pyarrow, candles_to_table
+from .candles import Candles, format_date
+from .core import CmcScraper, _Downloaded, _write_arrow_export
+
+
+class CmcBatchScraper(object):
+    """
+    Scrape historical market price data of many cryptocurrencies from
+    coinmarketcap.com, sharing coin id resolution, connections and a worker pool.
+
+    """
+
+    def __init__(
+        self,
+        coins,
+        start_date=None,
+        end_date=None,
+        all_time=False,
+        order_ascending=False,
+        fiat="USD",
+        max_workers=8,
+        session=None,
+    ):
+        """
+        :param coins: list of coin codes e.g. ['btc', 'eth'] and/or coinmarketcap.com
+            id numbers e.g. [1, 1027].
+        :param start_date: date since when to scrape data (in the format of dd-mm-yyyy)
+        :param end_date: date to which scrape the data (in the format of dd-mm-yyyy).
+        :param all_time: 'True' if need data of all time for respective cryptocurrencies
+        :param order_ascending: data ordered by 'Date' in ascending order (i.e. oldest first).
+        :param fiat: fiat code eg. USD, EUR, or list of fiat codes e.g. ['USD', 'EUR']
+            to get the data of every coin in each of them. With a list, ``results``
+            and ``errors`` are keyed by (coin, fiat).
+        :param max_workers: number of requests in flight at once, across all coins
+            and fiats.
+        :param session: (optional) CmcSession to reuse connections across requests.
+        """
+
+        self.coins = list(coins)
+        self.start_date = start_date
+        self.end_date = end_date
+        self.all_time = bool(all_time) or not (start_date and end_date)
+        self.order_ascending = order_ascending
+        self.fiat = fiat
+        self.fiats = [fiat] if isinstance(fiat, str) else list(fiat)
+        self.max_workers = max_workers
+        self.session = session
+        self.results = {}
+        self.errors = {}
+        self._downloaded = False
+
+    def __repr__(self):
+        return "<CmcBatchScraper coins:{}, start_date:{}, end_date:{}, all_time:{}>".format(
+            len(self.coins), self.start_date, self.end_date, self.all_time
+        )
+
+    @property
+    def multi_fiat(self):
+        """``True`` if ``fiat`` is a list, so results are keyed by (coin, fiat)."""
+        return not isinstance(self.fiat, str)
+
+    def _key(self, coin, fiat):
+        return (coin, fiat) if self.multi_fiat else coin
+
+    def _scraper(self, coin, fiat):
+        if isinstance(coin, int):
+            return _Downloaded(
+                None,
+                self.start_date,
+                self.end_date,
+                self.all_time,
+                self.order_ascending,
+                fiat,
+                id_number=coin,
+                session=self.session,
+            )
+        return _Downloaded(
+            coin,
+            self.start_date,
+            self.end_date,
+            self.all_time,
+            self.order_ascending,
+            fiat,
+            session=self.session,
+        )
+
+    def _download_data(self, **kwargs):
+        """
+        This method downloads the data of all coins.
+        :param forced: (optional) if ``True``, data will be re-downloaded.
+        :return:
+        """
+
+        forced = kwargs.get("forced")
+
+        if self._downloaded and not forced:
+            return
+
+        if self.all_time:
+            start_date, end_date = None, None
+        else:
+            start_date, end_date = self.start_date, self.end_date
+
+        convert_ids = {fiat: utils._get_convert_id(fiat) for fiat in self.fiats}
+        windows = utils._chunk_windows(*utils._date_range(start_date, end_date))
+
+        self.results, self.errors = {}, {}
+        coin_ids = {}
+        for coin in self.coins:
+            try:
+                coin_ids[coin] = (
+                    coin
+                    if isinstance(coin, int)
+                    else utils.get_coin_id(coin, None, session=self.session)
+                )
+            except Exception as e:
+                for fiat in self.fiats:
+                    self.errors[self._key(coin, fiat)] = e
+
+        # the coin id is resolved once, and the chunks of every (coin, fiat) pair
+        # share the worker pool
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                (coin, fiat): [
+                    executor.submit(
+                        utils._fetch_chunk,
+                        coin_id,
+                        convert_id,
+                        *window,
+                        session=self.session,
+                    )
+                    for window in windows
+                ]
+                for coin, coin_id in coin_ids.items()
+                for fiat, convert_id in convert_ids.items()
+            }
+
+            for (coin, fiat), pair_futures in futures.items():
+                key = self._key(coin, fiat)
+                try:
+                    coin_data = utils._merge_chunks([f.result() for f in pair_futures])
+                except Exception as e:
+                    self.errors[key] = e
+                    continue
+
+                scraper = self._scraper(coin, fiat)
+                scraper._ingest(coin_data)
+                self.results[key] = scraper
+
+        self._downloaded = True
+
+    def get_data(self, format="", interval=None, **kwargs):
+        """
+        This method returns the downloaded data of every coin which succeeded.
+        Coins which failed are listed in ``errors`` instead.
+        :param format: extension name of data format, as taken by ``CmcScraper.get_data``
+        :param interval: (optional) roll the daily candles up into candles of a
+            number of days, weeks or months e.g. '1w', '1M', as ``CmcScraper.get_data``
+            does. This is not streaming: the daily candles of every coin are
+            downloaded and kept first. ``CmcScraper.iter_quotes(interval=...)`` rolls
+            up a single coin with bounded memory.
+        :param kwargs: Optional arguments that data downloader takes.
+        :return: dict of coin (or (coin, fiat) if ``fiat`` is a list) to the data of
+            the coin in the specified format
+        """
+
+        self._download_data(**kwargs)
+        return {
+            coin: scraper.get_data(format, interval=interval)
+            for coin, scraper in self.results.items()
+        }
+
+    def get_dataframe(self, date_as_index=False, interval=None, **kwargs):
+        """
+        This gives scraped data of all coins as a single long format DataFrame,
+        with the coin in a 'Coin' column, and the fiat in a 'Fiat' column if
+        ``fiat`` is a list.
+        :param date_as_index: make 'Date' as index and remove 'Date' column.
+        :param interval: (optional) roll the daily candles up into candles of a
+            number of days, weeks or months e.g. '1w', '1M'. The daily candles of
+            every coin are downloaded and kept first, as for ``get_data``.
+        :param kwargs: Optional arguments that data downloader takes.
+        :return: DataFrame of the downloaded data.
+        """
+
+        try:
+            import pandas as pd
+        except ImportError:
+            pd = None
+
+        if pd is None:
+            raise NotImplementedError(
+                "DataFrame Format requires 'pandas' to be installed."
+                "Try : pip install pandas"
+            )
+
+        self._download_data(**kwargs)
+
+        keys = list(self.results)
+        frames = [self.results[key].get_dataframe(interval=interval) for key in keys]
+
+        if frames:
+            dataframe = pd.concat(frames, ignore_index=True)
+        else:
+            dataframe = pd.DataFrame(columns=CmcScraper().headers)
+
+        if self.multi_fiat:
+            coins = list(dict.fromkeys(coin for coin, _ in keys))
+            fiats = list(dict.fromkeys(fiat for _, fiat in keys))
+            coin_codes, fiat_codes = [], []
+            for (coin, fiat), frame in zip(keys, frames):
+                coin_codes.extend([coins.index(coin)] * len(frame))
+                fiat_codes.extend([fiats.index(fiat)] * len(frame))
+            dataframe.insert(0, "Fiat", pd.Categorical.from_codes(fiat_codes, fiats))
+        else:
+            coins = keys
+            coin_codes = [
+                code for code, frame in enumerate(frames) for _ in range(len(frame))
+            ]
+        dataframe.insert(0, "Coin", pd.Categorical.from_codes(coin_codes, coins))
+
+        if date_as_index:
+            dataframe.set_index("Date", inplace=True)
+
+        return dataframe
+
+    def to_arrow(self, **kwargs):
+        """
+        This gives scraped data of all coins as a single typed Arrow table, with
+        the coin in a 'Coin' column, and the fiat in a 'Fiat' column if ``fiat``
+        is a list.
+        :param kwargs: Optional arguments that data downloader takes.
+        :return: pyarrow.Table of the downloaded data.
+        """
+
+        pa = _import_pyarrow()
+
+        self._download_data(**kwargs)
+
+        headers = CmcScraper().headers
+        tables = []
+        for key, scraper in self.results.items():
+            coin, fiat = key if self.multi_fiat else (key, None)
+            tables.append(candles_to_table(scraper.candles, headers, coin, fiat))
+
+        if not tables:
+            fiat = self.fiats[0] if self.multi_fiat else None
+            return candles_to_table(Candles(), headers, "", fiat)
+        return pa.concat_tables(tables).unify_dictionaries()
+
+    def export(
+        self,
+        format,
+        name=None,
+        path=None,
+        partition_by=None,
+        compression=None,
+        **kwargs,
+    ):
+        """
+        Exports the data of all coins to a single Parquet or Arrow IPC file, or to a
+        directory partitioned by coin, fiat and/or year.
+        :param format: extension name of file format. Available: parquet, arrow, feather
+        :param name: (optional) name of file.
+        :param path: (optional) output file path.
+        :param partition_by: (optional) list of columns among 'coin', 'fiat' and
+            'year' to partition the data by.
+        :param compression: (optional) compression codec e.g. 'zstd', 'lz4', 'snappy'.
+        :param kwargs: Optional arguments that data downloader takes.
+        :return: path of the exported file, or ``None`` if it could not be written,
+            in which case the error is printed, as ``CmcScraper.export`` does.
+        """
+
+        if format not in _ARROW_FORMATS:
+            raise ValueError(
+                "CmcBatchScraper exports only to {}; Use get_data for other formats.".format(
+                    ", ".join(_ARROW_FORMATS)
+                )
+            )
+
+        table = self.to_arrow(**kwargs)
+
+        if path is None:
+            # Export in current directory if path not specified
+            path = os.getcwd()
+
+        if name is None:
+            name = self._default_name()
+
+        if not (partition_by or name.endswith(".{}".format(format))):
+            name += ".{}".format(format)
+
+        with events.span("cryptocmd.export", **{"cryptocmd.format": format}):
+            return _write_arrow_export(
+                table,
+                format,
+                os.path.join(path, name),
+                partition_by=partition_by,
+                compression=compression,
+            )
+
+    def _default_name(self):
+        """
+        Makes the name of an export from the downloaded data, in the format of
+        {coins}_{fiats}-{first date}_{last date}, e.g. 'btc_eth_USD-01-01-2024_31-12-2024'.
+        Coins are given by code, or by symbol when given by id number, and 'coins'
+        stands for more than three of them.
+        """
+
+        scrapers = list(self.results.values())
+        coins = list(dict.fromkeys(scraper._coin() for scraper in scrapers))
+        name = "_".join(
+            [str(coin) for coin in coins] if 0 < len(coins) <= 3 else ["coins"]
+        )
+        name += "_" + "_".join(self.fiats)
+
+        times = [
+            time
+            for scraper in scrapers
+            if len(scraper.candles)
+            for time in (scraper.candles.time_open[0], scraper.candles.time_open[-1])
+        ]
+        if times:
+            name += "-{}_{}".format(format_date(min(times)), format_date(max(times)))
+        return name
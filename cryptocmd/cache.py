@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Local SQLite cache of the responses of coinmarketcap.com
+"""
+
+from contextlib import closing
+import datetime
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from . import decode
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    expires_at REAL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+
+def _normalize_url(url):
+    # same request whatever the order of the query parameters
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path, query, "")
+    )
+
+
+class CachedResponse(object):
+    """
+    Successful response served from, or saved to, the cache. Has the attributes of
+    ``requests.Response`` used by the scrapers.
+
+    """
+
+    status_code = 200
+    ok = True
+
+    def __init__(self, url, content, headers=None, json_data=None, from_cache=True):
+        self.url = url
+        self.content = content
+        self.headers = headers or {}
+        self.from_cache = from_cache
+        self._json = json_data
+
+    def __repr__(self):
+        return "<CachedResponse url:{}, from_cache:{}>".format(
+            self.url, self.from_cache
+        )
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+    @property
+    def decoded(self):
+        """``True`` once the json of the response is decoded, and kept."""
+        return self._json is not None
+
+    def json(self):
+        if self._json is None:
+            self._json = decode.loads(self.content)
+        return self._json
+
+    def raise_for_status(self):
+        pass
+
+
+class ResponseCache(object):
+    """
+    Size-bounded cache of successful API responses, keyed by normalized url.
+
+    Windows of the historical API which end before the last completed UTC day never
+    change, so they are kept until evicted. Other responses (recent windows, the
+    coin listing) expire after ``ttl`` seconds, and are then revalidated with
+    ``If-None-Match``/``If-Modified-Since`` when the server sent an ETag or a
+    Last-Modified date. The least recently used responses are evicted first once the
+    cache grows over ``max_size`` bytes.
+
+    """
+
+    def __init__(self, path, max_size=100 * 1024 * 1024, ttl=5 * 60):
+        """
+        :param path: path of the SQLite database file, created if it does not exist.
+        :param max_size: maximum bytes of response bodies kept.
+        :param ttl: seconds responses which may still change are fresh for.
+        """
+
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def __repr__(self):
+        return "<ResponseCache path:{}, max_size:{}, ttl:{}>".format(
+            self.path, self.max_size, self.ttl
+        )
+
+    def __len__(self):
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _expires_at(self, url, now):
+        # None (never) for historical windows of closed days, now + ttl otherwise
+        params = dict(parse_qsl(urlsplit(url).query))
+        if "timeEnd" in params:
+            end_day = datetime.datetime.fromtimestamp(
+                int(params["timeEnd"]), tz=datetime.timezone.utc
+            ).date()
+            today = datetime.datetime.now(datetime.timezone.utc).date()
+            if end_day < today - datetime.timedelta(days=1):
+                return None
+        return now + self.ttl
+
+    def lookup(self, url):
+        """
+        Looks up the cached response of a url.
+        :param url: 'url' of the request
+        :return: (response, fresh) tuple, response is ``None`` if not cached and
+            ``fresh`` is ``False`` if it has to be revalidated.
+        """
+
+        key = _normalize_url(url)
+        now = time.time()
+        with self._lock, closing(self._connect()) as conn, conn:
+            found = conn.execute(
+                "SELECT body, etag, last_modified, expires_at FROM responses "
+                "WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if found is None:
+                return None, False
+            conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+
+        body, etag, last_modified, expires_at = found
+        headers = {}
+        if etag:
+            headers["ETag"] = etag
+        if last_modified:
+            headers["Last-Modified"] = last_modified
+        fresh = expires_at is None or expires_at > now
+        return CachedResponse(url, bytes(body), headers), fresh
+
+    def revalidated(self, url):
+        """
+        Marks a cached response as fresh again, after the server answered 304.
+        :param url: 'url' of the request
+        """
+
+        now = time.time()
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE responses SET expires_at = ?, accessed_at = ? WHERE key = ?",
+                (self._expires_at(url, now), now, _normalize_url(url)),
+            )
+
+    def save(self, url, response):
+        """
+        Caches a response if it is a successful API response.
+        :param url: 'url' of the request
+        :param response: response of the request
+        :return: CachedResponse of the saved response, or ``response`` itself if it
+            was not cached.
+        """
+
+        if response.status_code != 200:
+            return response
+
+        try:
+            json_data = response.json()
+            error_code = json_data["status"]["error_code"]
+        except (ValueError, KeyError, TypeError):
+            return response
+        if str(error_code) != "0":
+            return response
+
+        body = response.content
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        now = time.time()
+
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    _normalize_url(url),
+                    sqlite3.Binary(body),
+                    etag,
+                    last_modified,
+                    self._expires_at(url, now),
+                    now,
+                    len(body),
+                ),
+            )
+            self._evict(conn)
+
+        return CachedResponse(
+            url, body, dict(response.headers), json_data, from_cache=False
+        )
+
+    def _evict(self, conn):
+        # drop least recently used responses until the cache fits in max_size
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        excess = total[0] - self.max_size
+        if excess <= 0:
+            return
+
+        evicted = []
+        for key, size in conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ):
+            evicted.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    def clear(self):
+        """Removes all cached responses."""
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM responses")
@@ -0,0 +1,444 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Columnar storage of daily candles
+"""
+
+from array import array
+import datetime
+from functools import lru_cache
+import math
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+_DAY = 24 * 60 * 60 * 1000
+
+# quote fields of the API, in the order of the value columns
+_QUOTE_FIELDS = ("open", "high", "low", "close", "volume", "marketCap")
+
+# time fields of the API, in the order of the time columns
+_TIME_FIELDS = ("timeOpen", "timeHigh", "timeLow", "timeClose")
+
+
+@lru_cache(maxsize=8192)
+def _day_millis(date_str):
+    # milliseconds since the unix epoch of a 'YYYY-MM-DD' date
+    return (datetime.date.fromisoformat(date_str).toordinal() - _EPOCH_ORDINAL) * _DAY
+
+
+@lru_cache(maxsize=8192)
+def _time_of_day_millis(time_str):
+    # milliseconds since midnight of a 'HH:MM:SS.fff' time
+    return (
+        (int(time_str[0:2]) * 60 + int(time_str[3:5])) * 60 + int(time_str[6:8])
+    ) * 1000 + int(time_str[9:12])
+
+
+@lru_cache(maxsize=8192)
+def _day_strings(days):
+    # ('YYYY-MM-DD', 'dd-mm-yyyy') of a day number since the unix epoch
+    date = datetime.date.fromordinal(days + _EPOCH_ORDINAL)
+    return date.isoformat(), date.strftime("%d-%m-%Y")
+
+
+def parse_time(value):
+    """
+    Parses a timestamp of the API e.g. '2024-01-01T00:00:00.000Z'.
+    :param value: timestamp string in UTC
+    :return: milliseconds since the unix epoch
+    """
+
+    # fast path for the fixed 'YYYY-MM-DDTHH:MM:SS.fffZ' layout the API uses: slices
+    # and int() instead of strptime, with dates and times of day memoized as the
+    # four timestamps of a candle share their date and often their time of day
+    if len(value) == 24 and value[10] == "T" and value[23] == "Z":
+        return _day_millis(value[:10]) + _time_of_day_millis(value[11:23])
+
+    dt = datetime.datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%fZ")
+    delta = dt.replace(tzinfo=datetime.timezone.utc) - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000 + delta.microseconds // 1000
+
+
+def format_time(millis):
+    """
+    Formats milliseconds since the unix epoch the way the API does.
+    :param millis: milliseconds since the unix epoch
+    :return: timestamp string e.g. '2024-01-01T00:00:00.000Z'
+    """
+
+    days, millis = divmod(millis, _DAY)
+    seconds, millis = divmod(millis, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return "{}T{:02d}:{:02d}:{:02d}.{:03d}Z".format(
+        _day_strings(days)[0], hours, minutes, seconds, millis
+    )
+
+
+def format_date(millis):
+    """
+    Formats milliseconds since the unix epoch as a 'Date' value.
+    :param millis: milliseconds since the unix epoch
+    :return: date string in the format of dd-mm-yyyy
+    """
+
+    return _day_strings(millis // _DAY)[1]
+
+
+def _value(number):
+    # missing values are stored as NaN and given back as None
+    return None if math.isnan(number) else number
+
+
+class Candles(object):
+    """
+    Daily candles stored column by column, in typed arrays.
+
+    Prices, volume and market cap are float64 (``array('d')``), missing values are
+    NaN. Times are int64 milliseconds since the unix epoch (``array('q')``).
+
+    """
+
+    value_columns = ("open", "high", "low", "close", "volume", "market_cap")
+    time_columns = ("time_open", "time_high", "time_low", "time_close")
+
+    def __init__(self):
+        for name in self.value_columns:
+            setattr(self, name, array("d"))
+        for name in self.time_columns:
+            setattr(self, name, array("q"))
+
+    def __repr__(self):
+        return "<Candles rows:{}>".format(len(self))
+
+    def __len__(self):
+        return len(self.time_open)
+
+    @property
+    def columns(self):
+        """Tuple of all the columns, values first, then times."""
+        return tuple(
+            getattr(self, name) for name in self.value_columns + self.time_columns
+        )
+
+    @classmethod
+    def from_quotes(cls, quotes, descending=False):
+        """
+        Builds candles from the quotes of the historical API.
+        :param quotes: list of quotes as found in ``json_data['data']['quotes']``
+        :param descending: order candles newest first instead of oldest first.
+        :return: Candles ordered by 'Time Open'
+        """
+
+        # the API returns quotes oldest first, so the requested order is reached in
+        # a single pass over the quotes, forwards or backwards
+        candles = cls()
+        candles.extend(reversed(quotes) if descending else quotes)
+        if not candles.is_sorted(descending):
+            candles.sort(descending)
+        return candles
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Builds candles from rows in the format of ``CmcScraper.get_data``.
+        :param rows: iterable of rows, as yielded by ``iter_rows``
+        :return: Candles in the order of the rows
+        """
+
+        candles = cls()
+        values = [getattr(candles, name) for name in cls.value_columns]
+        times = [getattr(candles, name) for name in cls.time_columns]
+        nan = float("nan")
+
+        for row in rows:
+            for column, value in zip(values, row[1:7]):
+                column.append(nan if value is None else value)
+            for column, value in zip(times, row[7:11]):
+                column.append(parse_time(value))
+        return candles
+
+    def extend(self, quotes):
+        """
+        Appends the quotes of the historical API.
+        :param quotes: iterable of quotes as found in ``json_data['data']['quotes']``
+        """
+
+        values = [getattr(self, name) for name in self.value_columns]
+        times = [getattr(self, name) for name in self.time_columns]
+        nan = float("nan")
+
+        for _row in quotes:
+            _row_quote = _row["quote"]
+            for column, field in zip(values, _QUOTE_FIELDS):
+                value = _row_quote[field]
+                column.append(nan if value is None else value)
+            for column, field in zip(times, _TIME_FIELDS):
+                column.append(parse_time(_row[field]))
+
+    def reverse(self):
+        """Reverses the order of the candles in place."""
+        for column in self.columns:
+            column.reverse()
+
+    def is_sorted(self, descending=False):
+        """
+        Checks whether candles are ordered by 'Time Open'.
+        :param descending: check for newest first instead of oldest first.
+        """
+
+        times = self.time_open
+        if descending:
+            return all(a >= b for a, b in zip(times, times[1:]))
+        return all(a <= b for a, b in zip(times, times[1:]))
+
+    def sort(self, descending=False):
+        """
+        Sorts the candles by 'Time Open' in place.
+        :param descending: sort newest first instead of oldest first.
+        """
+
+        order = sorted(
+            range(len(self)), key=self.time_open.__getitem__, reverse=descending
+        )
+        for name in self.value_columns + self.time_columns:
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, [column[i] for i in order]))
+
+    def as_numpy(self, name, copy=True):
+        """
+        Returns a column as a NumPy array, float64 for values and int64 for times.
+        :param name: name of the column e.g. 'close', 'time_open'
+        :param copy: if ``False``, a read-only view sharing memory with the column is
+            returned instead of a copy. The column can not be resized (e.g. by
+            ``extend``) while the view is alive, ``BufferError`` is raised.
+        """
+
+        import numpy as np
+
+        column = getattr(self, name)
+        dtype = np.float64 if column.typecode == "d" else np.int64
+        if copy:
+            return np.array(column, dtype=dtype)
+
+        view = np.frombuffer(column, dtype=dtype)
+        view.flags.writeable = False
+        return view
+
+    def resample(self, interval):
+        """
+        Rolls the daily candles up into weekly, monthly, ... candles, see Resampler.
+        :param interval: number of days ('d'), weeks ('w') or months ('M') of each
+            candle e.g. '1w', '1M'.
+        :return: Candles of the periods, in the same order as the daily candles
+        """
+
+        descending = len(self) > 1 and self.time_open[0] > self.time_open[-1]
+        resampler = Resampler(interval, descending)
+        candles = resampler.feed(self)
+        for column, values in zip(candles.columns, resampler.flush().columns):
+            column.extend(values)
+        return candles
+
+    def row(self, index):
+        """
+        Returns a single candle in the row format of ``CmcScraper.get_data``.
+        :param index: position of the candle
+        :return: list of Date, Open, High, Low, Close, Volume, Market Cap,
+            Time Open, Time High, Time Low, Time Close
+        """
+
+        row = [format_date(self.time_open[index])]
+        row.extend(_value(getattr(self, name)[index]) for name in self.value_columns)
+        row.extend(
+            format_time(getattr(self, name)[index]) for name in self.time_columns
+        )
+        return row
+
+    def iter_rows(self):
+        """Yields every candle in the row format of ``CmcScraper.get_data``."""
+        for index in range(len(self)):
+            yield self.row(index)
+
+
+# units of the intervals candles can be resampled to, e.g. '1w' or '3M'
+_INTERVAL_UNITS = ("d", "w", "M")
+
+# 1970-01-05, the first monday after the unix epoch, where weeks are counted from
+_FIRST_MONDAY = 4
+
+
+def _parse_interval(interval):
+    """
+    Parses an interval of ``Candles.resample``.
+    :param interval: number of days ('d'), weeks ('w') or months ('M') e.g. '1w'
+    :return: (count, unit) tuple
+    """
+
+    if isinstance(interval, str):
+        count, unit = interval[:-1] or "1", interval[-1:]
+    else:
+        count, unit = "", None
+    if unit not in _INTERVAL_UNITS or not count.isdigit() or int(count) < 1:
+        raise ValueError(
+            "Invalid interval '{}'. Use a number of days, weeks or months "
+            "e.g. '1d', '1w', '2w', '1M', '3M'.".format(interval)
+        )
+    return int(count), unit
+
+
+def _period(day, count, unit):
+    """
+    Returns the bounds of the period of ``count`` days, weeks or months holding a
+    day. Weeks start on monday and months on their first day.
+    :param day: day number since the unix epoch
+    :return: (first day, first day of the next period) tuple
+    """
+
+    if unit == "M":
+        date = datetime.date.fromordinal(day + _EPOCH_ORDINAL)
+        month = (date.year * 12 + date.month - 1) // count * count
+        start = datetime.date(month // 12, month % 12 + 1, 1)
+        month += count
+        end = datetime.date(month // 12, month % 12 + 1, 1)
+        return start.toordinal() - _EPOCH_ORDINAL, end.toordinal() - _EPOCH_ORDINAL
+
+    length = count * 7 if unit == "w" else count
+    origin = _FIRST_MONDAY if unit == "w" else 0
+    start = day - (day - origin) % length
+    return start, start + length
+
+
+class Resampler(object):
+    """
+    Rolls daily candles up into weekly, monthly, ... candles in a single pass over
+    their columns, fed chunk by chunk so that memory does not grow with the history.
+
+    Open and close are the first and last known prices of each period, high and low
+    the highest and lowest, volume the sum, and market cap the last known one. Times
+    are the 'Time Open' of the first day, the times of the high and the low, and the
+    'Time Close' of the last day. Periods are labeled by their first day with data.
+
+    """
+
+    def __init__(self, interval, descending=False):
+        """
+        :param interval: number of days ('d'), weeks ('w') or months ('M') of each
+            candle e.g. '1w', '1M'.
+        :param descending: candles are fed newest first instead of oldest first.
+        """
+
+        self.count, self.unit = _parse_interval(interval)
+        self.interval = interval
+        self.descending = descending
+        self._bounds = None
+        self._candle = None
+
+    def __repr__(self):
+        return "<Resampler interval:{}, descending:{}>".format(
+            self.interval, self.descending
+        )
+
+    def feed(self, candles):
+        """
+        Rolls up candles, in the order given by ``descending``.
+        :param candles: Candles to roll up
+        :return: Candles of the periods which are complete
+        """
+
+        out = Candles()
+        descending = self.descending
+        count, unit = self.count, self.unit
+        lo, hi = self._bounds or (0, 0)
+        candle = self._candle
+
+        for values in zip(*candles.columns):
+            (
+                open_,
+                high,
+                low,
+                close,
+                volume,
+                market_cap,
+                time_open,
+                time_high,
+                time_low,
+                time_close,
+            ) = values
+            day = time_open // _DAY
+
+            if candle is None or not lo <= day < hi:
+                if candle is not None:
+                    self._append(out, candle)
+                lo, hi = _period(day, count, unit)
+                candle = list(values)
+                continue
+
+            # the first and last days are swapped when fed newest first
+            if descending:
+                if open_ == open_:
+                    candle[0] = open_
+                candle[6] = time_open
+                if candle[3] != candle[3]:
+                    candle[3] = close
+                if candle[5] != candle[5]:
+                    candle[5] = market_cap
+            else:
+                if candle[0] != candle[0]:
+                    candle[0] = open_
+                if close == close:
+                    candle[3] = close
+                if market_cap == market_cap:
+                    candle[5] = market_cap
+                candle[9] = time_close
+
+            # NaN compares false, so missing prices never become the high or low
+            if high > candle[1] or candle[1] != candle[1]:
+                candle[1], candle[7] = high, time_high
+            if low < candle[2] or candle[2] != candle[2]:
+                candle[2], candle[8] = low, time_low
+            if volume == volume:
+                candle[4] = volume if candle[4] != candle[4] else candle[4] + volume
+
+        self._bounds = (lo, hi)
+        self._candle = candle
+        return out
+
+    def flush(self):
+        """
+        Ends the feed.
+        :return: Candles of the last period, which may be incomplete
+        """
+
+        out = Candles()
+        if self._candle is not None:
+            self._append(out, self._candle)
+        self._bounds = self._candle = None
+        return out
+
+    @staticmethod
+    def _append(out, candle):
+        for column, value in zip(out.columns, candle):
+            column.append(value)
+
+
+def resample_chunks(chunks, interval, descending=False):
+    """
+    Rolls daily candles up into weekly, monthly, ... candles, chunk by chunk.
+    :param chunks: iterable of Candles, e.g. the yearly chunks of a download
+    :param interval: number of days ('d'), weeks ('w') or months ('M') of each
+        candle e.g. '1w', '1M'.
+    :param descending: chunks are newest first instead of oldest first.
+    :return: generator of Candles of the periods, as soon as they are complete
+    """
+
+    resampler = Resampler(interval, descending)
+    for candles in chunks:
+        out = resampler.feed(candles)
+        if len(out):
+            yield out
+
+    out = resampler.flush()
+    if len(out):
+        yield out
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Chunk level checkpoints of downloads, so that a failed download resumes where it
+stopped
+"""
+
+from contextlib import closing
+import datetime
+import json
+import sqlite3
+import threading
+
+from . import decode
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    coin_id INTEGER NOT NULL,
+    convert_id INTEGER NOT NULL,
+    time_start INTEGER NOT NULL,
+    time_end INTEGER NOT NULL,
+    body TEXT NOT NULL,
+    PRIMARY KEY (coin_id, convert_id, time_start, time_end)
+);
+"""
+
+
+def _timestamps(window):
+    chunk_start, chunk_end = window
+    return int(chunk_start.timestamp()), int(chunk_end.timestamp())
+
+
+class ChunkCheckpoint(object):
+    """
+    Persistent record of the yearly windows a download already fetched.
+
+    Windows are saved as soon as they arrive, so when a download fails part way,
+    e.g. on a long all time backfill, retrying it only fetches the windows which are
+    missing. The windows of a download are dropped once it succeeds. Windows ending
+    on the last two days are not saved, as they may still change.
+
+    """
+
+    def __init__(self, path):
+        """
+        :param path: path of the SQLite database file, created if it does not exist.
+        """
+
+        self.path = path
+        self._lock = threading.Lock()
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def __repr__(self):
+        return "<ChunkCheckpoint path:{}>".format(self.path)
+
+    def __len__(self):
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, coin_id, convert_id, windows):
+        """
+        Returns the saved windows of a download.
+        :param coin_id: numeric coin id on coinmarketcap.com
+        :param convert_id: numeric id of the fiat the prices are quoted in
+        :param windows: list of (timeStart, timeEnd) tuples as made by _chunk_windows
+        :return: dict of the saved windows among ``windows`` to their json data
+        """
+
+        with closing(self._connect()) as conn:
+            saved = dict(
+                ((time_start, time_end), body)
+                for time_start, time_end, body in conn.execute(
+                    "SELECT time_start, time_end, body FROM chunks "
+                    "WHERE coin_id = ? AND convert_id = ?",
+                    (coin_id, convert_id),
+                )
+            )
+
+        found = {}
+        for window in windows:
+            body = saved.get(_timestamps(window))
+            if body is not None:
+                found[window] = decode.loads(body)
+        return found
+
+    def put(self, coin_id, convert_id, window, json_data):
+        """
+        Saves a fetched window, unless it may still change.
+        :param coin_id: numeric coin id on coinmarketcap.com
+        :param convert_id: numeric id of the fiat the prices are quoted in
+        :param window: (timeStart, timeEnd) tuple of the window
+        :param json_data: json data of the window
+        """
+
+        today = datetime.datetime.now(datetime.timezone.utc).date()
+        if window[1].date() >= today - datetime.timedelta(days=1):
+            return
+
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?, ?)",
+                (coin_id, convert_id) + _timestamps(window) + (json.dumps(json_data),),
+            )
+
+    def discard(self, coin_id, convert_id):
+        """
+        Drops the saved windows of a coin in a fiat.
+        :param coin_id: numeric coin id on coinmarketcap.com
+        :param convert_id: numeric id of the fiat the prices are quoted in
+        """
+
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "DELETE FROM chunks WHERE coin_id = ? AND convert_id = ?",
+                (coin_id, convert_id),
+            )
+
+    def clear(self):
+        """Drops all saved windows."""
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM chunks")
@@ -0,0 +1,420 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Command-line tool downloading the price history of many coins at once, e.g.
+
+    cryptocmd btc eth sol --fiat USD,EUR --format parquet --output prices/
+
+Finished coins are recorded in a manifest, so an interrupted run picks up where it
+stopped when run again with the same options.
+"""
+
+from __future__ import print_function
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+
+from . import events
+from .__version__ import __version__
+from .arrow import _ARROW_FORMATS, candles_to_table, write_table
+from .checkpoint import ChunkCheckpoint
+from .core import CmcScraper
+from .session import CmcSession
+
+_FORMATS = ("csv", "tsv", "json", "yaml", "xlsx") + _ARROW_FORMATS
+
+_MANIFEST_NAME = "cryptocmd-manifest.json"
+
+# yearly chunks of the jobs which failed part way, so their retries resume
+_CHECKPOINT_NAME = "cryptocmd-checkpoint.db"
+
+
+class Manifest(object):
+    """
+    JSON record of the (coin, fiat) jobs of a run which are done or failed, saved
+    after every job so that an interrupted run can be resumed.
+
+    """
+
+    def __init__(self, path, options):
+        """
+        :param path: path of the manifest file.
+        :param options: dict of the options the jobs are run with. A manifest of
+            other options can not be resumed.
+        """
+
+        self.path = path
+        self.options = options
+        self.jobs = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Reads the jobs of a previous run, if any.
+        :return: ``True`` if a previous run was found.
+        """
+
+        if not os.path.exists(self.path):
+            return False
+
+        with open(self.path) as f:
+            manifest = json.load(f)
+
+        if manifest.get("options") != self.options:
+            raise ValueError(
+                "Manifest '{}' was made with other options. Run with the same "
+                "options to resume it, or with --restart to start over.".format(
+                    self.path
+                )
+            )
+        self.jobs = manifest.get("jobs", {})
+        return True
+
+    def done(self, key):
+        """:return: ``True`` if the job finished in a previous run."""
+        return self.jobs.get(key, {}).get("status") == "done"
+
+    def record(self, key, **entry):
+        """
+        Records the outcome of a job and saves the manifest.
+        :param key: job key, as made by ``_job_key``
+        :param entry: status ('done' or 'failed') and details of the job.
+        """
+
+        with self._lock:
+            self.jobs[key] = entry
+            manifest = {"version": 1, "options": self.options, "jobs": self.jobs}
+            # written aside and renamed, so an interrupted run never leaves it torn
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(manifest, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+
+class _Progress(object):
+    # counts the finished jobs, rows and downloaded bytes of a run
+
+    def __init__(self, total, quiet=False):
+        self.total = total
+        self.quiet = quiet
+        self.finished = 0
+        self.done = 0
+        self.failed = 0
+        self.skipped = 0
+        self.rows = 0
+        self.bytes = 0
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        # events listener counting the body size of every response
+        if event.name == "cryptocmd.request":
+            size = event.attributes.get("http.response.body.size", 0)
+            with self._lock:
+                self.bytes += size
+
+    def skip(self, count):
+        self.skipped += count
+        self.finished += count
+
+    def job_done(self, label, rows, seconds):
+        with self._lock:
+            self.finished += 1
+            self.done += 1
+            self.rows += rows
+            self._print("{}: {} rows in {:.2f}s".format(label, rows, seconds))
+
+    def job_failed(self, label, error):
+        with self._lock:
+            self.finished += 1
+            self.failed += 1
+            self._print("{}: failed: {}".format(label, error))
+
+    def _print(self, message):
+        if not self.quiet:
+            print(
+                "[{}/{}] {}".format(self.finished, self.total, message),
+                file=sys.stderr,
+            )
+
+    def summary(self):
+        seconds = time.perf_counter() - self.start
+        megabytes = self.bytes / 2**20
+        return (
+            "{} jobs in {:.1f}s: {} done, {} skipped (done before), {} failed\n"
+            "{:,} rows ({:,.0f} rows/s), {:.1f} MB downloaded ({:.2f} MB/s)".format(
+                self.total,
+                seconds,
+                self.done,
+                self.skipped,
+                self.failed,
+                self.rows,
+                self.rows / seconds if seconds else 0,
+                megabytes,
+                megabytes / seconds if seconds else 0,
+            )
+        )
+
+
+def _split(values):
+    # flattens comma and whitespace separated values, skipping '#' comments
+    return [
+        item
+        for value in values
+        for item in value.split("#", 1)[0].replace(",", " ").split()
+    ]
+
+
+def _read_coins(args):
+    coins = _split(args.coins)
+    if args.coins_file:
+        with open(args.coins_file) as f:
+            coins.extend(_split(f))
+    # numbers are coinmarketcap.com id numbers, the rest coin codes
+    return list(dict.fromkeys(int(c) if c.isdigit() else c for c in coins))
+
+
+def _job_key(coin, fiat):
+    return "{}/{}".format(coin, fiat)
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog="cryptocmd",
+        description="Download historical market price data of cryptocurrencies "
+        "from coinmarketcap.com, many coins at once.",
+    )
+    parser.add_argument(
+        "coins",
+        nargs="*",
+        help="coin codes e.g. btc, or coinmarketcap.com id numbers e.g. 1",
+    )
+    parser.add_argument(
+        "-f",
+        "--coins-file",
+        help="file listing coins, separated by newlines, spaces or commas",
+    )
+    parser.add_argument(
+        "-s", "--start", help="first day of data (dd-mm-yyyy), all time by default"
+    )
+    parser.add_argument(
+        "-e", "--end", help="last day of data (dd-mm-yyyy), today by default"
+    )
+    parser.add_argument(
+        "--fiat", default="USD", help="fiat codes, comma separated (default: USD)"
+    )
+    parser.add_argument(
+        "-F",
+        "--format",
+        default="csv",
+        choices=_FORMATS,
+        help="output format (default: csv)",
+    )
+    parser.add_argument(
+        "-o", "--output", default=".", help="output directory (default: current)"
+    )
+    parser.add_argument(
+        "--partition-by",
+        help="write a single dataset partitioned by these columns, comma "
+        "separated among coin, fiat and year, instead of one file per coin. "
+        "Parquet, arrow and feather only.",
+    )
+    parser.add_argument(
+        "--dataset-name",
+        default="coins",
+        help="directory name of the partitioned dataset (default: coins)",
+    )
+    parser.add_argument("--compression", help="parquet, arrow and feather codec")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=4,
+        help="number of coins downloaded at once (default: 4)",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="requests in flight per coin, for yearly chunks (default: 1)",
+    )
+    parser.add_argument(
+        "--rate", type=float, help="maximum requests per second, across all jobs"
+    )
+    parser.add_argument(
+        "--manifest",
+        help="path of the resumable job manifest (default: {} in the output "
+        "directory)".format(_MANIFEST_NAME),
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="ignore the manifest and saved chunks of a previous run and "
+        "download every coin",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="only print the summary"
+    )
+    parser.add_argument(
+        "--version", action="version", version="%(prog)s {}".format(__version__)
+    )
+    return parser
+
+
+def _run_job(coin, fiat, args, session, checkpoint):
+    """
+    Downloads the data of a coin in a fiat and writes it.
+    :return: number of rows written
+    """
+
+    # a start without an end runs up to today, not all time
+    end = args.end
+    if args.start and end is None:
+        end = datetime.date.today().strftime("%d-%m-%Y")
+
+    scraper = CmcScraper(
+        None if isinstance(coin, int) else coin,
+        args.start,
+        end,
+        args.start is None,
+        fiat=fiat,
+        id_number=coin if isinstance(coin, int) else None,
+        max_workers=args.workers,
+        session=session,
+        checkpoint=checkpoint,
+    )
+    # only downloads, without building the rows of get_data
+    scraper._download_data()
+    rows = len(scraper.candles)
+
+    if args.partition_by:
+        table = candles_to_table(scraper.candles, scraper.headers, str(coin), fiat)
+        write_table(
+            table,
+            args.format,
+            os.path.join(args.output, args.dataset_name),
+            partition_by=args.partition_by,
+            compression=args.compression,
+            # one set of files per job, so that jobs never overwrite each other
+            basename_template="{}-{}-{{i}}.{}".format(coin, fiat, args.format),
+        )
+        return rows
+
+    name = "{0}_{1}-{2}_{3}.{4}".format(
+        coin, fiat, scraper.start_date, scraper.end_date, args.format
+    )
+    if not scraper.export(
+        args.format, name=name, path=args.output, compression=args.compression
+    ):
+        raise IOError("'{}' could not be written".format(name))
+    return rows
+
+
+def main(argv=None):
+    """
+    Entry point of the ``cryptocmd`` console script.
+    :param argv: (optional) command line arguments, ``sys.argv[1:]`` by default.
+    :return: exit status, 1 if any coin failed
+    """
+
+    parser = _parser()
+    args = parser.parse_args(argv)
+
+    try:
+        coins = _read_coins(args)
+    except IOError as e:
+        parser.error("coins file can not be read: {}".format(e))
+    if not coins:
+        parser.error("no coins given")
+
+    if args.end and not args.start:
+        parser.error("--end needs --start")
+    fiats = [fiat.upper() for fiat in _split([args.fiat])]
+    if args.partition_by:
+        if args.format not in _ARROW_FORMATS:
+            parser.error("--partition-by needs one of: {}".format(_ARROW_FORMATS))
+        args.partition_by = _split([args.partition_by])
+    if args.jobs < 1 or args.workers < 1:
+        parser.error("--jobs and --workers must be at least 1")
+
+    if args.rate:
+        from .throttle import RateLimiter, set_default_rate_limiter
+
+        set_default_rate_limiter(RateLimiter(rate=args.rate))
+
+    os.makedirs(args.output, exist_ok=True)
+    manifest = Manifest(
+        args.manifest or os.path.join(args.output, _MANIFEST_NAME),
+        {
+            "start": args.start,
+            "end": args.end,
+            "fiats": fiats,
+            "format": args.format,
+            "compression": args.compression,
+            "partition_by": args.partition_by,
+            "dataset_name": args.dataset_name if args.partition_by else None,
+        },
+    )
+    checkpoint = ChunkCheckpoint(os.path.join(args.output, _CHECKPOINT_NAME))
+    if args.restart:
+        checkpoint.clear()
+    else:
+        try:
+            manifest.load()
+        except ValueError as e:
+            print("Error message (manifest) :", e, file=sys.stderr)
+            return 2
+
+    jobs = [(coin, fiat) for coin in coins for fiat in fiats]
+    progress = _Progress(len(jobs), quiet=args.quiet)
+    pending = [job for job in jobs if not manifest.done(_job_key(*job))]
+    progress.skip(len(jobs) - len(pending))
+
+    def run(coin, fiat):
+        start = time.perf_counter()
+        rows = _run_job(coin, fiat, args, session, checkpoint)
+        return rows, time.perf_counter() - start
+
+    events.add_listener(progress)
+    session = CmcSession(pool_size=max(10, args.jobs * args.workers))
+    executor = ThreadPoolExecutor(max_workers=args.jobs)
+    try:
+        futures = {executor.submit(run, *job): job for job in pending}
+        for future in as_completed(futures):
+            coin, fiat = futures[future]
+            key, label = _job_key(coin, fiat), "{} {}".format(coin, fiat)
+            try:
+                rows, seconds = future.result()
+            except Exception as e:
+                manifest.record(key, status="failed", error=str(e))
+                progress.job_failed(label, e)
+            else:
+                manifest.record(key, status="done", rows=rows)
+                progress.job_done(label, rows, seconds)
+    except KeyboardInterrupt:
+        executor.shutdown(wait=False, cancel_futures=True)
+        print(
+            "Interrupted, run again with the same options to resume.",
+            file=sys.stderr,
+        )
+        print(progress.summary(), file=sys.stderr)
+        return 130
+    finally:
+        executor.shutdown()
+        events.remove_listener(progress)
+        session.close()
+
+    print(progress.summary(), file=sys.stderr)
+    return 1 if progress.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,10 +12,37 @@ __all__ = ["CmcScraper"]
 
 import os
 import csv
-import tablib
+import json
 import warnings
-from datetime import datetime
-from .utils import download_coin_data, InvalidParameters
+from . import events
+from .arrow import _ARROW_FORMATS, candles_to_table, write_table
+from .candles import Candles, _parse_interval, format_date, resample_chunks
+from .utils import (
+    download_coin_data,
+    InvalidParameters,
+    _date_range,
+    _iter_coin_chunks,
+)
+
+# formats which export_stream can write one chunk at a time
+_STREAM_FORMATS = ("csv", "tsv", "jsonl")
+
+
+def _write_arrow_export(table, format, file, partition_by=None, compression=None):
+    """
+    Writes an export with pyarrow under the error policy of ``CmcScraper.export``:
+    invalid parameters raise, errors while writing are printed.
+    :return: ``file`` if it was written, else ``None``
+    """
+
+    try:
+        write_table(
+            table, format, file, partition_by=partition_by, compression=compression
+        )
+    except IOError as err:
+        print("I/O error({0}): {1}".format(err.errno, err.strerror or err))
+        return None
+    return file
 
 
 class CmcScraper(object):
@@ -34,6 +61,10 @@ class CmcScraper(object):
         fiat="USD",
         coin_name=None,
         id_number=None,
+        max_workers=None,
+        session=None,
+        store=None,
+        checkpoint=None,
     ):
         """
         :param coin_code: coin code of cryptocurrency e.g. btc. Will be ignored if using id_number.
@@ -47,6 +78,13 @@ class CmcScraper(object):
         :param coin_name: coin name in case of many coins with same code e.g. sol -> solana, solcoin
         :param id_number: id number for the a cryptocurrency on the coinmarketcap.com.
             Will override coin_code and coin_name when provided.
+        :param max_workers: (optional) number of yearly chunks to download concurrently.
+        :param session: (optional) CmcSession to reuse connections across scrapers.
+        :param store: (optional) CandleStore to keep downloaded candles in, so only the
+            days missing from it are downloaded.
+        :param checkpoint: (optional) ChunkCheckpoint saving the yearly chunks as they
+            arrive, so that a download which failed resumes from the missing chunks
+            when retried, even with ``forced``.
         """
 
         self.coin_code = coin_code
@@ -69,8 +107,15 @@ class CmcScraper(object):
             "Time Low",
             "Time Close",
         ]
-        self.rows = []
+        self.candles = Candles()
         self.id_number = id_number
+        # symbol of the coin as returned by coinmarketcap.com, once downloaded
+        self.symbol = None
+        self.max_workers = max_workers
+        self.session = session
+        self.store = store
+        self.checkpoint = checkpoint
+        self._resume = False
 
         # enable all_time download if start_time or end_time is not given
         if not (self.start_date and self.end_date):
@@ -88,6 +133,40 @@ class CmcScraper(object):
             )
         )
 
+    @property
+    def candles(self):
+        """
+        Downloaded data as typed columns, which every format of the data is made
+        from. Once ``rows`` has been built, edits made to it in place are carried
+        over to ``candles``.
+        """
+        if self._rows is not None and self._rows != self._built_rows:
+            self._candles = Candles.from_rows(self._rows)
+            self._built_rows = [list(row) for row in self._rows]
+        return self._candles
+
+    @candles.setter
+    def candles(self, candles):
+        self._candles = candles
+        self._rows = self._built_rows = None
+
+    @property
+    def rows(self):
+        """
+        Downloaded data as list of rows, built from ``candles`` on first access.
+        """
+        if self._rows is None:
+            self._rows = list(self._candles.iter_rows())
+            # copy of the rows as built, telling whether they were edited since
+            self._built_rows = [list(row) for row in self._rows]
+        return self._rows
+
+    @rows.setter
+    def rows(self, rows):
+        # assigned rows replace the downloaded data, e.g. after filtering them
+        self.candles = Candles.from_rows(rows)
+        self._update_dates()
+
     def _download_data(self, **kwargs):
         """
         This method downloads the data.
@@ -97,77 +176,213 @@ class CmcScraper(object):
 
         forced = kwargs.get("forced")
 
-        if self.rows and not forced:
+        if len(self.candles) and not forced:
             return
 
         if self.all_time:
             self.start_date, self.end_date = None, None
 
-        coin_data = download_coin_data(
+        downloader = download_coin_data
+        if self.store is not None:
+            downloader = self.store.download_coin_data
+
+        try:
+            coin_data = downloader(
+                self.coin_code,
+                self.start_date,
+                self.end_date,
+                self.fiat,
+                self.coin_name,
+                self.id_number,
+                max_workers=self.max_workers,
+                session=self.session,
+                checkpoint=self.checkpoint,
+                # forced downloads start over, unless retrying one which failed
+                resume=self._resume or not forced,
+            )
+        except Exception:
+            self._resume = True
+            raise
+        self._resume = False
+
+        self._ingest(coin_data)
+
+    def _ingest(self, coin_data):
+        """
+        This method parses downloaded data into columns.
+        :param coin_data: json data as returned by ``download_coin_data``.
+        :return:
+        """
+
+        with events.span("cryptocmd.ingest") as span:
+            candles = Candles.from_quotes(
+                coin_data["data"]["quotes"], descending=not self.order_ascending
+            )
+            if span:
+                span.set(**{"cryptocmd.rows": len(candles)})
+
+        self.candles = candles
+        self.symbol = coin_data["data"].get("symbol") or self.symbol
+        self._update_dates()
+
+    def _coin(self):
+        # the coin as given, or its symbol when only its id number is given
+        return self.coin_code or self.symbol or self.id_number
+
+    def _update_dates(self):
+        """
+        This method sets 'start_date' and 'end_date' to the dates of the data.
+        :return:
+        """
+
+        candles = self.candles
+        if len(candles):
+            first = format_date(int(candles.time_open[0]))
+            last = format_date(int(candles.time_open[-1]))
+            if self.order_ascending:
+                self.start_date, self.end_date = first, last
+            else:
+                self.start_date, self.end_date = last, first
+
+    def _iter_candles(self):
+        """
+        This method downloads the data one yearly chunk at a time, without keeping it.
+        :return: generator of Candles of each chunk, in the order of the scraper
+        """
+
+        descending = not self.order_ascending
+
+        # newest first is reached by walking the windows backwards and reversing
+        # each of them, so no chunk has to wait for the others
+        for json_data in _iter_coin_chunks(
             self.coin_code,
-            self.start_date,
-            self.end_date,
+            None if self.all_time else self.start_date,
+            None if self.all_time else self.end_date,
             self.fiat,
             self.coin_name,
             self.id_number,
-        )
+            self.max_workers,
+            self.session,
+            newest_first=descending,
+        ):
+            yield Candles.from_quotes(
+                json_data["data"]["quotes"], descending=descending
+            )
+
+    def iter_quotes(self, batch_size=None, interval=None):
+        """
+        This method downloads the data lazily, one yearly chunk at a time, and yields
+        it as rows in the format of ``get_data`` as soon as each chunk is parsed.
+        The data is not kept by the scraper.
+        :param batch_size: (optional) yield lists of up to ``batch_size`` rows
+            instead of single rows.
+        :param interval: (optional) roll the daily candles up into candles of a
+            number of days, weeks or months e.g. '1w', '1M'.
+        :return: generator of rows, or of lists of rows
+        """
+
+        batch = []
+        for candles in self._iter_chunk_candles(interval):
+            if not batch_size:
+                for row in candles.iter_rows():
+                    yield row
+                continue
 
-        for _row in coin_data["data"]["quotes"]:
-            _row_quote = _row["quote"]
-            date = datetime.strptime(
-                _row["timeOpen"], "%Y-%m-%dT%H:%M:%S.%fZ"
-            ).strftime("%d-%m-%Y")
+            for row in candles.iter_rows():
+                batch.append(row)
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
 
-            row = [
-                date,
-                _row_quote["open"],
-                _row_quote["high"],
-                _row_quote["low"],
-                _row_quote["close"],
-                _row_quote["volume"],
-                _row_quote["marketCap"],
-                _row["timeOpen"],
-                _row["timeHigh"],
-                _row["timeLow"],
-                _row["timeClose"],
-            ]
+        if batch:
+            yield batch
 
-            self.rows.insert(0, row)
+    def _iter_chunk_candles(self, interval=None):
+        """
+        This method downloads the data one yearly chunk at a time, rolled up into
+        candles of ``interval`` if given, see ``Candles.resample``.
+        :return: generator of Candles, in the order of the scraper
+        """
+
+        if interval is None:
+            return self._iter_candles()
+
+        _parse_interval(interval)
+        return resample_chunks(
+            self._iter_candles(), interval, descending=not self.order_ascending
+        )
 
-        if self.rows:
-            self.end_date, self.start_date = self.rows[0][0], self.rows[-1][0]
+    def _resampled(self, interval):
+        """
+        This method gives the downloaded candles, rolled up into candles of
+        ``interval`` if given, see ``Candles.resample``.
+        """
 
-        if self.order_ascending:
-            self.rows.sort(key=lambda x: datetime.strptime(x[0], "%d-%m-%Y"))
+        if interval is None:
+            return self.candles
+        return self.candles.resample(interval)
 
-    def get_data(self, format="", verbose=False, **kwargs):
+    def get_data(self, format="", verbose=False, interval=None, **kwargs):
         """
         This method returns the downloaded data in specified format.
         :param format: extension name of data format. Available: json, xls, yaml, csv, dbf, tsv, html, latex, xlsx, ods
         :param verbose: (optional) Flag to enable verbose only.
+        :param interval: (optional) roll the daily candles up into candles of a
+            number of days, weeks or months e.g. '1w', '1M', without pandas. Open and
+            close are the first and last prices of each period, high and low the
+            highest and lowest, volume the sum and market cap the last one.
         :param kwargs: Optional arguments that data downloader takes.
         :return:
         """
 
+        if interval is not None:
+            _parse_interval(interval)
+
         self._download_data(**kwargs)
+        candles = self._resampled(interval)
         if verbose:
             print(*self.headers, sep=", ")
 
-            for row in self.rows:
+            for row in candles.iter_rows():
                 print(*row, sep=", ")
         elif format:
-            data = tablib.Dataset()
-            data.headers = self.headers
-            for row in self.rows:
-                data.append(row)
-            return data.export(format)
-        else:
+            return self._format_data(format, candles)
+        elif interval is None:
             return self.headers, self.rows
+        else:
+            return self.headers, list(candles.iter_rows())
+
+    def _format_data(self, format, candles=None):
+        """
+        This method serializes the downloaded data with tablib.
+        :param format: extension name of data format.
+        :param candles: (optional) Candles to serialize instead of the downloaded ones.
+        :return: str or bytes of the data in the specified format.
+        """
+
+        # imported here, so that 'import cryptocmd' does not load tablib's formats
+        import tablib
 
-    def get_dataframe(self, date_as_index=False, **kwargs):
+        data = tablib.Dataset()
+        data.headers = self.headers
+        for row in (self.candles if candles is None else candles).iter_rows():
+            data.append(row)
+        return data.export(format)
+
+    def get_dataframe(
+        self, date_as_index=False, coin_column=False, copy=True, interval=None, **kwargs
+    ):
         """
         This gives scraped data as DataFrame.
         :param date_as_index: make 'Date' as index and remove 'Date' column.
+        :param coin_column: (optional) add a categorical 'Coin' column with the coin code.
+        :param copy: (optional) if ``False``, the price, volume and market cap columns
+            are read-only views of the scraped data instead of copies. The views hold
+            on to the arrays of ``candles``: re-downloading replaces ``candles`` and
+            leaves them intact, but growing ``candles`` in place (e.g. with
+            ``candles.extend``) raises ``BufferError`` while the DataFrame is alive.
+        :param interval: (optional) roll the daily candles up into candles of a
+            number of days, weeks or months e.g. '1w', '1M', as ``get_data`` does.
         :param kwargs: Optional arguments that data downloader takes.
         :return: DataFrame of the downloaded data.
         """
@@ -183,14 +398,38 @@ class CmcScraper(object):
                 "Try : pip install pandas"
             )
 
+        if interval is not None:
+            _parse_interval(interval)
+
         self._download_data(**kwargs)
 
-        dataframe = pd.DataFrame(data=self.rows, columns=self.headers)
+        with events.span("cryptocmd.dataframe") as span:
+            # build typed columns straight from the candle arrays: float64 values and
+            # int64 epoch milliseconds turned into datetime64[ns] without any parsing
+            candles = self._resampled(interval)
+            day_ns = 24 * 60 * 60 * 10**9
+            time_open_ns = candles.as_numpy("time_open", copy=False) * 10**6
+
+            columns = {"Date": (time_open_ns - time_open_ns % day_ns).view("M8[ns]")}
+            for header, name in zip(self.headers[1:7], candles.value_columns):
+                columns[header] = candles.as_numpy(name, copy=copy)
+            for header, name in zip(self.headers[7:], candles.time_columns):
+                time_ns = candles.as_numpy(name, copy=False) * 10**6
+                columns[header] = pd.Series(time_ns.view("M8[ns]")).dt.tz_localize(
+                    "UTC"
+                )
 
-        # convert 'Date' column to datetime type
-        dataframe["Date"] = pd.to_datetime(
-            dataframe["Date"], format="%d-%m-%Y", dayfirst=True
-        )
+            dataframe = pd.DataFrame(columns, columns=self.headers, copy=False)
+
+            if coin_column:
+                dataframe.insert(
+                    0,
+                    "Coin",
+                    pd.Categorical.from_codes([0] * len(dataframe), [self._coin()]),
+                )
+
+            if span:
+                span.set(**{"cryptocmd.rows": len(dataframe)})
 
         if date_as_index:
             # set 'Date' column as index and drop the the 'Date' column.
@@ -235,24 +474,58 @@ class CmcScraper(object):
                     csvfile, delimiter=",", quoting=csv.QUOTE_NONNUMERIC
                 )
                 writer.writerow(self.headers)
-                for data in self.rows:
+                for data in self.candles.iter_rows():
                     writer.writerow(data)
         except IOError as err:
             errno, strerror = err.args
             print("I/O error({0}): {1}".format(errno, strerror))
 
-    def export(self, format, name=None, path=None, **kwargs):
+    def to_arrow(self, coin_column=False, **kwargs):
+        """
+        This gives scraped data as a typed Arrow table.
+        :param coin_column: (optional) add a dictionary encoded 'Coin' column with the coin code.
+        :param kwargs: Optional arguments that data downloader takes.
+        :return: pyarrow.Table of the downloaded data.
+        """
+
+        self._download_data(**kwargs)
+        return self._arrow_table(coin_column)
+
+    def _arrow_table(self, coin_column=False):
+        coin = self._coin() if coin_column else None
+        return candles_to_table(self.candles, self.headers, coin=coin)
+
+    def export(
+        self,
+        format,
+        name=None,
+        path=None,
+        partition_by=None,
+        compression=None,
+        **kwargs,
+    ):
         """
         Exports the data to specified file format
-        :param format: extension name of file format. Available: json, xls, yaml, csv, dbf, tsv, html, latex, xlsx, ods
+        :param format: extension name of file format. Available: json, xls, yaml, csv, dbf, tsv, html, latex, xlsx, ods,
+            and with pyarrow installed: parquet, arrow, feather
         :param name: (optional) name of file.
         :param path: (optional) output file path.
+        :param partition_by: (optional) parquet, arrow and feather only, list of
+            columns among 'coin' and 'year' to partition the data by. A directory
+            named after the file is written instead of a single file.
+        :param compression: (optional) parquet, arrow and feather only, compression
+            codec e.g. 'zstd', 'lz4', 'snappy'.
         :param kwargs: Optional arguments that data downloader takes.
-        :return:
+        :return: path of the exported file, or ``None`` if it could not be written,
+            in which case the error is printed.
         """
 
-        data = self.get_data(format, **kwargs)
+        self._download_data(**kwargs)
+
+        with events.span("cryptocmd.export", **{"cryptocmd.format": format}):
+            return self._export(format, name, path, partition_by, compression)
 
+    def _export(self, format, name, path, partition_by, compression):
         if path is None:
             # Export in current directory if path not specified
             path = os.getcwd()
@@ -263,6 +536,20 @@ class CmcScraper(object):
                 self.coin_code, self.fiat, self.start_date, self.end_date
             )
 
+        if format in _ARROW_FORMATS:
+            if not (partition_by or name.endswith(".{}".format(format))):
+                name += ".{}".format(format)
+            coin_column = any(c.lower() == "coin" for c in partition_by or ())
+            return _write_arrow_export(
+                self._arrow_table(coin_column),
+                format,
+                os.path.join(path, name),
+                partition_by=partition_by,
+                compression=compression,
+            )
+
+        data = self._format_data(format)
+
         if not name.endswith(".{}".format(format)):
             name += ".{}".format(format)
 
@@ -279,3 +566,109 @@ class CmcScraper(object):
             print("I/O error({0}): {1}".format(errno, strerror))
         except Exception as err:
             print("format: {0}, Error: {1}".format(format, err))
+        else:
+            return _file
+
+    def export_stream(self, format, file=None, name=None, path=None, interval=None):
+        """
+        Exports the data to specified file format while it is downloaded, writing
+        each yearly chunk as soon as it arrives. Memory use does not grow with the
+        length of the history and the data is not kept by the scraper.
+        :param format: extension name of file format. Available: csv, tsv, jsonl
+        :param file: (optional) writable text file-like object to export to,
+            instead of a file made from name and path.
+        :param name: (optional) name of file.
+        :param path: (optional) output file path.
+        :param interval: (optional) roll the daily candles up into candles of a
+            number of days, weeks or months e.g. '1w', '1M', as ``get_data`` does.
+        :return:
+        """
+
+        self._check_stream(format, interval)
+
+        if file is not None:
+            self._write_stream(format, file, interval)
+            return
+
+        _file = self._stream_file(format, name, path)
+
+        try:
+            with open(_file, "w", newline="", encoding="utf-8") as f:
+                self._write_stream(format, f, interval)
+        except IOError as err:
+            errno, strerror = err.args
+            print("I/O error({0}): {1}".format(errno, strerror))
+
+    def _check_stream(self, format, interval=None):
+        if format not in _STREAM_FORMATS:
+            raise InvalidParameters(
+                "'{}' format can not be streamed. Available: {}".format(
+                    format, ", ".join(_STREAM_FORMATS)
+                )
+            )
+
+        if interval is not None:
+            _parse_interval(interval)
+
+    def _stream_file(self, format, name=None, path=None):
+        if path is None:
+            # Export in current directory if path not specified
+            path = os.getcwd()
+
+        if name is None:
+            # Make name of file in format: {coin_code}_{fiat}-{start_date}_{end_date}.csv
+            start_dt, end_dt = _date_range(
+                None if self.all_time else self.start_date,
+                None if self.all_time else self.end_date,
+            )
+            name = "{0}_{1}-{2}_{3}".format(
+                self.coin_code,
+                self.fiat,
+                start_dt.strftime("%d-%m-%Y"),
+                end_dt.strftime("%d-%m-%Y"),
+            )
+
+        if not name.endswith(".{}".format(format)):
+            name += ".{}".format(format)
+
+        return "{0}/{1}".format(path, name)
+
+    def _write_stream(self, format, f, interval=None):
+        with events.span("cryptocmd.export", **{"cryptocmd.format": format}):
+            write = self._chunk_writer(format, f)
+            for candles in self._iter_chunk_candles(interval):
+                write(candles)
+
+    def _chunk_writer(self, format, f):
+        """
+        This method starts a streamed export, writing the header if any.
+        :return: function writing the rows of a chunk of Candles to ``f``
+        """
+
+        if format == "jsonl":
+
+            def write(candles):
+                for row in candles.iter_rows():
+                    f.write(json.dumps(dict(zip(self.headers, row))))
+                    f.write("\n")
+                f.flush()
+
+            return write
+
+        writer = csv.writer(f, delimiter="\t" if format == "tsv" else ",")
+        writer.writerow(self.headers)
+
+        def write(candles):
+            writer.writerows(candles.iter_rows())
+            f.flush()
+
+        return write
+
+
+class _Downloaded(CmcScraper):
+    # CmcScraper holding data downloaded for it, e.g. by an AsyncCmcScraper or a
+    # CmcBatchScraper, and formatting it. It never downloads anything itself, so
+    # a coin without quotes in the range is not downloaded again.
+
+    def _download_data(self, **kwargs):
+        pass
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Decoding of the json responses of coinmarketcap.com, with msgspec or orjson when
+installed
+"""
+
+import json
+from typing import List, Optional, TypedDict, Union
+
+from . import events
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Schemas of the fields the scrapers read. msgspec decodes them straight into plain
+# dicts and skips everything else in the payload, e.g. the 'timestamp' of each quote
+# or the dozens of fields of each coin of the listing.
+
+
+class _Status(TypedDict, total=False):
+    error_code: Union[int, str]
+    error_message: Optional[str]
+
+
+class _QuoteValues(TypedDict, total=False):
+    open: Optional[float]
+    high: Optional[float]
+    low: Optional[float]
+    close: Optional[float]
+    volume: Optional[float]
+    marketCap: Optional[float]
+
+
+class _Quote(TypedDict, total=False):
+    timeOpen: str
+    timeHigh: str
+    timeLow: str
+    timeClose: str
+    quote: _QuoteValues
+
+
+class _Historical(TypedDict, total=False):
+    id: int
+    name: str
+    symbol: str
+    quotes: List[_Quote]
+
+
+class _HistoricalResponse(TypedDict, total=False):
+    status: _Status
+    data: Optional[_Historical]
+
+
+class _Coin(TypedDict, total=False):
+    id: int
+    name: str
+    symbol: str
+
+
+class _Listing(TypedDict, total=False):
+    cryptoCurrencyList: List[_Coin]
+
+
+class _ListingResponse(TypedDict, total=False):
+    status: _Status
+    data: Optional[_Listing]
+
+
+if msgspec is not None:
+    _historical_decoder = msgspec.json.Decoder(_HistoricalResponse)
+    _listing_decoder = msgspec.json.Decoder(_ListingResponse)
+else:
+    _historical_decoder = _listing_decoder = None
+
+
+def loads(content):
+    """
+    Decodes json, with orjson when installed.
+    :param content: bytes or str of json
+    :return: decoded json data
+    """
+
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _decode(response, decoder, kind):
+    with events.span("cryptocmd.decode", **{"cryptocmd.payload": kind}):
+        return _decode_content(response, decoder)
+
+
+def _decode_content(response, decoder):
+    content = getattr(response, "content", None)
+    if not isinstance(content, (bytes, str)) or getattr(response, "decoded", False):
+        # already decoded (by the response cache), or not a body we can read
+        return response.json()
+
+    if decoder is not None:
+        try:
+            return decoder.decode(content)
+        except msgspec.DecodeError:
+            # not json, or the api changed its schema: decode it like any json so
+            # the error (or the new schema) is the same as without msgspec
+            pass
+    return loads(content)
+
+
+def historical(response):
+    """
+    Decodes a response of the historical api, keeping only the fields of the
+    quotes read by the scrapers when msgspec is installed.
+    :param response: response of the historical api
+    :return: json data of the response
+    """
+
+    return _decode(response, _historical_decoder, "historical")
+
+
+def listing(response):
+    """
+    Decodes a response of the listing api, keeping only the id, symbol and name of
+    the coins when msgspec is installed.
+    :param response: response of the listing api
+    :return: json data of the response
+    """
+
+    return _decode(response, _listing_decoder, "listing")
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Timing events of requests, chunks, ingestion, DataFrame building and exports
+"""
+
+import threading
+import time
+
+_listeners = ()
+_listeners_lock = threading.Lock()
+
+
+class Event(object):
+    """
+    A timed stage of the scraper, e.g. one request.
+
+    ``name`` is one of 'cryptocmd.request', 'cryptocmd.decode', 'cryptocmd.chunk',
+    'cryptocmd.download', 'cryptocmd.ingest', 'cryptocmd.dataframe' and
+    'cryptocmd.export'. ``attributes`` describe the stage, e.g. ``http.url`` and
+    ``http.response.body.size`` of a request.
+
+    """
+
+    __slots__ = ("name", "attributes", "start_ns", "end_ns", "error")
+
+    def __init__(self, name, attributes, start_ns, end_ns, error=None):
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = start_ns
+        self.end_ns = end_ns
+        self.error = error
+
+    def __repr__(self):
+        return "<Event name:{}, duration:{:.6f}, attributes:{}>".format(
+            self.name, self.duration, self.attributes
+        )
+
+    @property
+    def duration(self):
+        """Seconds the stage took."""
+        return (self.end_ns - self.start_ns) / 1e9
+
+
+class _Span(object):
+    # times a stage and sends its Event to the listeners
+
+    __slots__ = ("name", "attributes", "start_ns", "_perf_ns")
+
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = attributes
+
+    def set(self, **attributes):
+        """Adds attributes to the event of the stage."""
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        self.start_ns = time.time_ns()
+        self._perf_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = self.start_ns + time.perf_counter_ns() - self._perf_ns
+        _emit(Event(self.name, self.attributes, self.start_ns, end_ns, exc))
+
+
+class _NullSpan(object):
+    # stands in for _Span when nobody listens, so instrumentation costs a call
+
+    __slots__ = ()
+
+    def __bool__(self):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name, **attributes):
+    """
+    Times the stage of a ``with`` block, e.g. ``with span('cryptocmd.ingest'):``.
+    The span is falsy when nobody listens, so costly attributes can be skipped
+    with ``if span: span.set(...)``.
+    :param name: name of the event
+    :param attributes: attributes of the event, more can be added with ``set``.
+    :return: context manager of the stage
+    """
+
+    if not _listeners:
+        return _NULL_SPAN
+    return _Span(name, attributes)
+
+
+def _emit(event):
+    for listener in _listeners:
+        try:
+            listener(event)
+        except Exception as e:
+            print("Error message (event listener) :", e)
+
+
+def add_listener(listener):
+    """
+    Registers a function called with every Event, from the thread of the stage.
+    :param listener: callable taking an Event
+    """
+
+    global _listeners
+
+    with _listeners_lock:
+        _listeners = _listeners + (listener,)
+
+
+def remove_listener(listener):
+    """
+    Unregisters a function registered with ``add_listener``.
+    :param listener: callable to unregister
+    """
+
+    global _listeners
+
+    with _listeners_lock:
+        _listeners = tuple(other for other in _listeners if other != listener)
+
+
+class LoggingListener(object):
+    """
+    Listener logging every Event to the 'cryptocmd' logger, at DEBUG level.
+
+    """
+
+    def __init__(self, logger=None, level=None):
+        """
+        :param logger: (optional) logger to log to, 'cryptocmd' by default.
+        :param level: (optional) level of the records, DEBUG by default.
+        """
+
+        import logging
+
+        self.logger = logger or logging.getLogger("cryptocmd")
+        self.level = logging.DEBUG if level is None else level
+
+    def __call__(self, event):
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(
+                self.level,
+                "%s took %.3f ms %s",
+                event.name,
+                event.duration * 1000,
+                event.attributes,
+                extra={"event": event},
+            )
+
+
+class OpenTelemetryListener(object):
+    """
+    Listener recording every Event as a span of an OpenTelemetry tracer, e.g.
+    ``OpenTelemetryListener(opentelemetry.trace.get_tracer('cryptocmd'))``.
+
+    """
+
+    def __init__(self, tracer):
+        """
+        :param tracer: OpenTelemetry tracer to record the spans with.
+        """
+
+        self.tracer = tracer
+
+    def __call__(self, event):
+        span = self.tracer.start_span(
+            event.name, attributes=event.attributes, start_time=event.start_ns
+        )
+        if event.error is not None:
+            span.record_exception(event.error)
+        span.end(end_time=event.end_ns)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Single-flight de-duplication of concurrent identical calls
+"""
+
+import threading
+
+
+class _Call(object):
+    # a call in flight, and its outcome once done
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Runs at most one call per key at a time: threads asking for a key while a call
+    for it is in flight wait for that call and share its result (or its error),
+    instead of making the same call again.
+
+    Results are not kept once the call is done, so later calls run again.
+
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "<SingleFlight in_flight:{}>".format(len(self._calls))
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Calls ``fn(*args, **kwargs)``, unless a call for ``key`` is already in flight.
+        :param key: hashable identifying the call e.g. the url of a request
+        :param fn: function to call
+        :return: result of the call, shared by all the callers of the same key
+        """
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
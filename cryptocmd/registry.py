@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Cached lookup of coinmarketcap.com coin ids by coin code and name
+"""
+
+import json
+import os
+import threading
+import time
+
+from . import decode, utils
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def _listing_url():
+    return (
+        "{}/cryptocurrency/listing?start=1&limit=5000"
+        "&sortBy=market_cap&sortType=desc&convert=USD"
+        "&cryptoType=all&tagType=all&audited=false"
+    ).format(utils._CMC_DATA_API)
+
+
+class CoinRegistry(object):
+    """
+    Index of the coins listed on coinmarketcap.com.
+
+    The listing is downloaded once and kept for ``ttl`` seconds, optionally on disk,
+    so that resolving many coin codes costs a single request.
+
+    """
+
+    def __init__(self, ttl=24 * 60 * 60, cache_path=None, session=None):
+        """
+        :param ttl: seconds after which the listing is downloaded again.
+        :param cache_path: (optional) json file to persist the listing to, so it is
+            reused across processes while fresher than ``ttl``.
+        :param session: (optional) CmcSession to download the listing through.
+        """
+
+        self.ttl = ttl
+        self.cache_path = cache_path
+        self.session = session
+        self.fetched_at = None
+        self._coins = []
+        self._by_symbol = {}
+        self._by_symbol_name = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "<CoinRegistry coins:{}, ttl:{}, cache_path:{}>".format(
+            len(self._coins), self.ttl, self.cache_path
+        )
+
+    def __len__(self):
+        return len(self._coins)
+
+    @property
+    def is_stale(self):
+        """``True`` if the listing was never loaded or is older than ``ttl``."""
+        return self.fetched_at is None or time.time() - self.fetched_at > self.ttl
+
+    def _index(self, coins, fetched_at):
+        by_symbol = {}
+        by_symbol_name = {}
+        # listing is sorted by market cap, so the first id of a symbol is the biggest coin
+        for coin_id, symbol, name in coins:
+            by_symbol.setdefault(symbol.upper(), []).append(coin_id)
+            by_symbol_name.setdefault((symbol.upper(), name.lower()), coin_id)
+
+        self._coins = coins
+        self._by_symbol = by_symbol
+        self._by_symbol_name = by_symbol_name
+        self.fetched_at = fetched_at
+
+    def _load_cache(self):
+        if not (self.cache_path and os.path.exists(self.cache_path)):
+            return False
+
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                cached = json.load(f)
+            fetched_at = cached["fetched_at"]
+            coins = [tuple(coin) for coin in cached["coins"]]
+        except (IOError, ValueError, KeyError, TypeError):
+            return False
+
+        if time.time() - fetched_at > self.ttl:
+            return False
+
+        self._index(coins, fetched_at)
+        return True
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+
+        directory = os.path.dirname(os.path.abspath(self.cache_path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = "{}.tmp".format(self.cache_path)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"fetched_at": self.fetched_at, "coins": self._coins}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def refresh(self, session=None):
+        """
+        Downloads the listing and rebuilds the indexes.
+        :param session: (optional) CmcSession to download the listing through.
+        """
+
+        json_data = decode.listing(
+            utils.get_url_data(_listing_url(), session=session or self.session)
+        )
+        self.update(json_data)
+
+    def update(self, json_data):
+        """
+        Rebuilds the indexes from a downloaded listing.
+        :param json_data: json data of the listing api
+        """
+
+        error_code = json_data["status"]["error_code"]
+        if str(error_code) == "400":
+            raise utils.InvalidCoinCode(
+                "Coin listing is unavailable on coinmarketcap.com"
+            )
+        if str(error_code) != "0":
+            raise Exception(json_data["status"]["error_message"])
+
+        coins = [
+            (c["id"], c["symbol"], c["name"])
+            for c in json_data["data"]["cryptoCurrencyList"]
+        ]
+        self._index(coins, time.time())
+        self._save_cache()
+
+    def load(self, session=None):
+        """
+        Makes sure a listing fresher than ``ttl`` is loaded, reading it from
+        ``cache_path`` when possible and downloading it otherwise.
+        :param session: (optional) CmcSession to download the listing through.
+        """
+
+        if not self.is_stale:
+            return
+
+        with self._lock:
+            if self.is_stale and not self._load_cache():
+                self.refresh(session)
+
+    def get_ids(self, coin_code, session=None):
+        """
+        Returns all the ids listed under a coin code, biggest market cap first.
+        :param coin_code: coin code of a cryptocurrency e.g. btc
+        :param session: (optional) CmcSession to download the listing through.
+        """
+
+        self.load(session)
+        return list(self._by_symbol.get(coin_code.upper(), []))
+
+    def get_id(self, coin_code, coin_name=None, session=None):
+        """
+        Returns the id of a coin.
+        :param coin_code: coin code of a cryptocurrency e.g. btc
+        :param coin_name: coin name in case of many coins with same code e.g. sol -> solana, solcoin
+        :param session: (optional) CmcSession to download the listing through.
+        :return: numeric coin id for the cryptocurrency on coinmarketcap.com
+        """
+
+        self.load(session)
+
+        if coin_name is None:
+            ids = self._by_symbol.get(coin_code.upper())
+            coin_id = ids[0] if ids else None
+        else:
+            coin_id = self._by_symbol_name.get((coin_code.upper(), coin_name.lower()))
+
+        if coin_id is None:
+            raise utils.InvalidCoinCode(
+                "'{}' coin code is unavailable on coinmarketcap.com".format(coin_code)
+            )
+        return coin_id
+
+
+def get_default_registry():
+    """
+    Returns the process-wide registry used when no registry is passed explicitly.
+    """
+
+    global _default_registry
+
+    if _default_registry is None:
+        with _default_registry_lock:
+            if _default_registry is None:
+                _default_registry = CoinRegistry()
+    return _default_registry
+
+
+def set_default_registry(registry):
+    """
+    Replaces the process-wide registry, e.g. with one persisted to disk.
+    :param registry: CoinRegistry to use, or ``None`` to start over with a fresh one.
+    """
+
+    global _default_registry
+
+    with _default_registry_lock:
+        _default_registry = registry
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Pooled HTTP transport for requests made to coinmarketcap.com
+"""
+
+import threading
+import time
+
+from .throttle import RetryPolicy, get_default_rate_limiter
+
+_HEADERS = {"User-Agent": "Mozilla/5.0", "Accept-Encoding": "gzip, deflate"}
+
+_default_session = None
+_default_session_lock = threading.Lock()
+
+
+class CmcSession(object):
+    """
+    Keep-alive HTTP session with a connection pool, shared between scrapers so that
+    consecutive requests reuse already open TCP/TLS connections.
+
+    """
+
+    def __init__(
+        self,
+        pool_size=10,
+        timeout=30,
+        headers=None,
+        rate_limiter=None,
+        retry=None,
+        cache=None,
+    ):
+        """
+        :param pool_size: maximum number of connections kept open per host.
+            Should be at least the number of requests made concurrently.
+        :param timeout: (optional) seconds to wait for the server before giving up,
+            either a single number or a (connect, read) tuple. ``None`` waits forever.
+        :param headers: (optional) extra headers sent with every request.
+        :param rate_limiter: (optional) RateLimiter to send requests through. The
+            process-wide one of ``throttle.get_default_rate_limiter`` is used when not
+            given, so every scraper shares the same budget.
+        :param retry: (optional) RetryPolicy of failed requests. Throttled (429),
+            server errors (5xx), connection errors and timeouts are retried 3 times
+            with exponential backoff by default; ``False`` disables retries.
+        :param cache: (optional) ResponseCache to serve repeated requests from.
+        """
+
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.retry = RetryPolicy() if retry is None else retry
+        self.cache = cache
+        # requests is imported with the first session rather than by 'import cryptocmd'
+        from requests import Session
+        from requests.adapters import HTTPAdapter
+
+        self.session = Session()
+        self.session.headers.update(_HEADERS)
+        if headers:
+            self.session.headers.update(headers)
+
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def __repr__(self):
+        return "<CmcSession pool_size:{}, timeout:{}>".format(
+            self.pool_size, self.timeout
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get(self, url, **kwargs):
+        """
+        Send a GET request through the pooled session, within the rate limit and
+        retrying it when it fails transiently. With a ``cache``, fresh cached
+        responses are returned without any request.
+        :param url: 'url' to request
+        :param kwargs: Optional arguments that ``requests.Session.get`` takes.
+        :return: response object of get request of the 'url'
+        """
+
+        if self.cache is None:
+            return self._send(url, **kwargs)
+
+        cached, fresh = self.cache.lookup(url)
+        if cached is None:
+            return self.cache.save(url, self._send(url, **kwargs))
+        if fresh:
+            return cached
+
+        # stale: revalidate when the server gave a validator, re-download otherwise
+        headers = dict(kwargs.pop("headers", None) or {})
+        if "ETag" in cached.headers:
+            headers["If-None-Match"] = cached.headers["ETag"]
+        if "Last-Modified" in cached.headers:
+            headers["If-Modified-Since"] = cached.headers["Last-Modified"]
+        if headers:
+            kwargs["headers"] = headers
+
+        response = self._send(url, **kwargs)
+        if response.status_code == 304:
+            self.cache.revalidated(url)
+            return cached
+        return self.cache.save(url, response)
+
+    def _send(self, url, **kwargs):
+        from requests.exceptions import ConnectionError, Timeout
+
+        kwargs.setdefault("timeout", self.timeout)
+        rate_limiter = self.rate_limiter or get_default_rate_limiter()
+        retry = self.retry or RetryPolicy(max_retries=0)
+
+        attempt = 0
+        while True:
+            rate_limiter.acquire()
+            try:
+                response = self.session.get(url, **kwargs)
+            except (ConnectionError, Timeout):
+                if not retry.should_retry(attempt):
+                    raise
+                time.sleep(retry.delay(attempt))
+                attempt += 1
+                continue
+
+            status = response.status_code
+            if status in retry.statuses and retry.should_retry(attempt, status):
+                delay = retry.delay(attempt, response.headers.get("Retry-After"))
+                if status == 429:
+                    rate_limiter.throttled(delay)
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            if status in retry.statuses and self.retry:
+                # retries are exhausted, the error is not handed over as data
+                response.raise_for_status()
+            if response.ok:
+                rate_limiter.succeeded()
+            return response
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+
+
+def get_default_session():
+    """
+    Returns the process-wide session used when no session is passed explicitly.
+    """
+
+    global _default_session
+
+    if _default_session is None:
+        with _default_session_lock:
+            if _default_session is None:
+                _default_session = CmcSession()
+    return _default_session
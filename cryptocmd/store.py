@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Local SQLite store of daily candles, so that only missing days are downloaded
+"""
+
+from contextlib import closing
+import datetime
+import sqlite3
+import threading
+
+from . import utils
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS coins (
+    coin_id INTEGER PRIMARY KEY,
+    symbol TEXT,
+    name TEXT
+);
+CREATE TABLE IF NOT EXISTS candles (
+    coin_id INTEGER NOT NULL,
+    fiat TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    time_open TEXT,
+    time_high TEXT,
+    time_low TEXT,
+    time_close TEXT,
+    open REAL,
+    high REAL,
+    low REAL,
+    close REAL,
+    volume REAL,
+    market_cap REAL,
+    PRIMARY KEY (coin_id, fiat, day)
+);
+CREATE TABLE IF NOT EXISTS coverage (
+    coin_id INTEGER NOT NULL,
+    fiat TEXT NOT NULL,
+    start_day INTEGER NOT NULL,
+    end_day INTEGER NOT NULL
+);
+"""
+
+
+def _day(date_or_dt):
+    """Day number (proleptic Gregorian ordinal) of a date or datetime."""
+    if isinstance(date_or_dt, datetime.datetime):
+        date_or_dt = date_or_dt.date()
+    return date_or_dt.toordinal()
+
+
+def _format_day(day):
+    return datetime.date.fromordinal(day).strftime("%d-%m-%Y")
+
+
+class CandleStore(object):
+    """
+    Persistent store of daily candles keyed by (coin id, fiat).
+
+    Keeps track of the date ranges it already holds, so a scraper backed by the store
+    only downloads the days it has never seen before, e.g. just the latest day on a
+    daily refresh.
+
+    """
+
+    def __init__(self, path):
+        """
+        :param path: path of the SQLite database file, created if it does not exist.
+        """
+
+        self.path = path
+        self._lock = threading.Lock()
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def __repr__(self):
+        return "<CandleStore path:{}>".format(self.path)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def missing_ranges(self, coin_id, fiat, start_day, end_day):
+        """
+        Returns the day ranges within [start_day, end_day] not held by the store.
+        :param coin_id: numeric coin id on coinmarketcap.com
+        :param fiat: fiat code eg. USD, EUR
+        :param start_day: first day of the range, as a date ordinal
+        :param end_day: last day of the range, as a date ordinal
+        :return: list of (start_day, end_day) tuples, oldest first
+        """
+
+        with closing(self._connect()) as conn:
+            covered = conn.execute(
+                "SELECT start_day, end_day FROM coverage "
+                "WHERE coin_id = ? AND fiat = ? AND end_day >= ? AND start_day <= ? "
+                "ORDER BY start_day",
+                (coin_id, fiat.upper(), start_day, end_day),
+            ).fetchall()
+
+        gaps = []
+        cursor = start_day
+        for covered_start, covered_end in covered:
+            if covered_start > cursor:
+                gaps.append((cursor, covered_start - 1))
+            cursor = max(cursor, covered_end + 1)
+        if cursor <= end_day:
+            gaps.append((cursor, end_day))
+        return gaps
+
+    def put(self, coin_id, fiat, coin_data, start_day, end_day):
+        """
+        Saves downloaded candles and marks [start_day, end_day] as held, up to the
+        last day returned only: days missing at the end, e.g. yesterday before CMC
+        publishes it, are downloaded again next time.
+        :param coin_id: numeric coin id on coinmarketcap.com
+        :param fiat: fiat code eg. USD, EUR
+        :param coin_data: json data as returned by ``download_coin_data``
+        :param start_day: first day the download covered, as a date ordinal
+        :param end_day: last day the download covered, as a date ordinal
+        """
+
+        fiat = fiat.upper()
+        data = coin_data["data"]
+        rows = []
+        for _row in data["quotes"]:
+            _row_quote = _row["quote"]
+            rows.append(
+                (
+                    coin_id,
+                    fiat,
+                    _day(datetime.date.fromisoformat(_row["timeOpen"][:10])),
+                    _row["timeOpen"],
+                    _row["timeHigh"],
+                    _row["timeLow"],
+                    _row["timeClose"],
+                    _row_quote["open"],
+                    _row_quote["high"],
+                    _row_quote["low"],
+                    _row_quote["close"],
+                    _row_quote["volume"],
+                    _row_quote["marketCap"],
+                )
+            )
+
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO coins VALUES (?, ?, ?)",
+                (coin_id, data.get("symbol"), data.get("name")),
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO candles VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+            if not rows:
+                return
+            end_day = min(end_day, max(row[2] for row in rows))
+
+            # merge the new range with the ones it touches into a single range
+            touching = conn.execute(
+                "SELECT MIN(start_day), MAX(end_day) FROM coverage "
+                "WHERE coin_id = ? AND fiat = ? AND end_day >= ? AND start_day <= ?",
+                (coin_id, fiat, start_day - 1, end_day + 1),
+            ).fetchone()
+            if touching[0] is not None:
+                start_day = min(start_day, touching[0])
+                end_day = max(end_day, touching[1])
+            conn.execute(
+                "DELETE FROM coverage "
+                "WHERE coin_id = ? AND fiat = ? AND end_day >= ? AND start_day <= ?",
+                (coin_id, fiat, start_day - 1, end_day + 1),
+            )
+            conn.execute(
+                "INSERT INTO coverage VALUES (?, ?, ?, ?)",
+                (coin_id, fiat, start_day, end_day),
+            )
+
+    def get(self, coin_id, fiat, start_day, end_day):
+        """
+        Reads held candles in the same format ``download_coin_data`` returns them.
+        :param coin_id: numeric coin id on coinmarketcap.com
+        :param fiat: fiat code eg. USD, EUR
+        :param start_day: first day to read, as a date ordinal
+        :param end_day: last day to read, as a date ordinal
+        :return: json data with historical OHLCV data, quotes ordered oldest first
+        """
+
+        with closing(self._connect()) as conn:
+            coin = conn.execute(
+                "SELECT symbol, name FROM coins WHERE coin_id = ?", (coin_id,)
+            ).fetchone()
+            rows = conn.execute(
+                "SELECT time_open, time_high, time_low, time_close, "
+                "open, high, low, close, volume, market_cap FROM candles "
+                "WHERE coin_id = ? AND fiat = ? AND day BETWEEN ? AND ? ORDER BY day",
+                (coin_id, fiat.upper(), start_day, end_day),
+            ).fetchall()
+
+        quotes = [
+            {
+                "timeOpen": row[0],
+                "timeHigh": row[1],
+                "timeLow": row[2],
+                "timeClose": row[3],
+                "quote": {
+                    "open": row[4],
+                    "high": row[5],
+                    "low": row[6],
+                    "close": row[7],
+                    "volume": row[8],
+                    "marketCap": row[9],
+                },
+            }
+            for row in rows
+        ]
+        symbol, name = coin if coin else (None, None)
+        return {
+            "status": {"error_code": 0, "error_message": None},
+            "data": {"id": coin_id, "symbol": symbol, "name": name, "quotes": quotes},
+        }
+
+    def download_coin_data(
+        self,
+        coin_code,
+        start_date,
+        end_date,
+        fiat,
+        coin_name,
+        id_number=None,
+        max_workers=None,
+        session=None,
+        checkpoint=None,
+        resume=True,
+    ):
+        """
+        Drop-in replacement of ``utils.download_coin_data`` which downloads only the
+        days missing from the store, saves them and answers from the store.
+        Parameters are the same as the ones of ``utils.download_coin_data``.
+
+        :return: json data with historical OHLCV data for the cryptocurrency
+        """
+
+        coin_id = (
+            id_number
+            if id_number
+            else utils.get_coin_id(coin_code, coin_name, session=session)
+        )
+        start_dt, end_dt = utils._date_range(start_date, end_date)
+        start_day, end_day = _day(start_dt), _day(end_dt)
+
+        # CMC only returns closed daily candles, the current UTC day is never fetched
+        last_closed_day = _day(datetime.datetime.now(datetime.timezone.utc)) - 1
+
+        for gap_start, gap_end in self.missing_ranges(
+            coin_id, fiat, start_day, min(end_day, last_closed_day)
+        ):
+            coin_data = utils.download_coin_data(
+                coin_code,
+                _format_day(gap_start),
+                _format_day(gap_end),
+                fiat,
+                coin_name,
+                coin_id,
+                max_workers=max_workers,
+                session=session,
+                checkpoint=checkpoint,
+                resume=resume,
+            )
+            self.put(coin_id, fiat, coin_data, gap_start, gap_end)
+
+        return self.get(coin_id, fiat, start_day, end_day)
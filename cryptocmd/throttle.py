@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Rate limiting and retries of requests made to coinmarketcap.com
+"""
+
+import datetime
+import random
+import threading
+import time
+
+_default_rate_limiter = None
+_default_rate_limiter_lock = threading.Lock()
+
+
+class RateLimiter(object):
+    """
+    Token bucket limiting the number of requests per second, shared by every thread
+    (and event loop) sending requests through it.
+
+    It adapts to the server: when a request is throttled (HTTP 429) all requests are
+    paused for the time asked by the server and the rate is halved, then it grows
+    back to ``rate`` as requests succeed.
+
+    """
+
+    def __init__(self, rate=None, burst=None, min_rate=0.1):
+        """
+        :param rate: (optional) maximum requests per second. ``None`` does not limit
+            the rate, but still pauses requests when the server throttles them.
+        :param burst: (optional) number of requests which can be sent at once after
+            a quiet period. Defaults to ``rate`` (at least 1).
+        :param min_rate: lowest requests per second the rate is reduced to when the
+            server throttles requests.
+        """
+
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate or 1.0)
+        self.min_rate = min_rate
+        self.current_rate = rate
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "<RateLimiter rate:{}, burst:{}, current_rate:{}>".format(
+            self.rate, self.burst, self.current_rate
+        )
+
+    def reserve(self):
+        """
+        Takes a token from the bucket.
+        :return: seconds to wait before sending the request
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._paused_until - now)
+            if self.current_rate is None:
+                return wait
+
+            self._tokens = min(
+                self.burst,
+                self._tokens + (now - self._updated_at) * self.current_rate,
+            )
+            self._updated_at = now
+            self._tokens -= 1
+            if self._tokens < 0:
+                wait = max(wait, -self._tokens / self.current_rate)
+            return wait
+
+    def acquire(self):
+        """Blocks until a request can be sent."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def throttled(self, delay):
+        """
+        Pauses all requests after the server throttled one, and halves the rate.
+        :param delay: seconds to pause requests for
+        """
+
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            if self.current_rate is not None:
+                self.current_rate = max(self.min_rate, self.current_rate / 2)
+
+    def succeeded(self):
+        """Grows the rate back towards ``rate`` after a successful request."""
+        if self.current_rate is None or self.current_rate >= self.rate:
+            return
+
+        with self._lock:
+            self.current_rate = min(self.rate, self.current_rate * 1.1)
+
+
+class RetryPolicy(object):
+    """
+    Exponential backoff with full jitter for failed requests, honoring the
+    ``Retry-After`` header of the server.
+
+    """
+
+    def __init__(
+        self,
+        max_retries=3,
+        backoff_factor=0.5,
+        max_backoff=60,
+        statuses=(429, 500, 502, 503, 504),
+    ):
+        """
+        :param max_retries: number of times a request is retried before giving up.
+        :param backoff_factor: seconds of the first backoff, doubled on each retry.
+        :param max_backoff: maximum seconds to wait before a retry.
+        :param statuses: HTTP status codes which are retried.
+        """
+
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+
+    def __repr__(self):
+        return "<RetryPolicy max_retries:{}, backoff_factor:{}>".format(
+            self.max_retries, self.backoff_factor
+        )
+
+    def should_retry(self, attempt, status=None):
+        """
+        :param attempt: number of retries already made
+        :param status: (optional) HTTP status code of the response, ``None`` for
+            connection errors and timeouts.
+        :return: ``True`` if the request should be sent again
+        """
+
+        if attempt >= self.max_retries:
+            return False
+        return status is None or status in self.statuses
+
+    def delay(self, attempt, retry_after=None):
+        """
+        :param attempt: number of retries already made
+        :param retry_after: (optional) value of the ``Retry-After`` header
+        :return: seconds to wait before the next attempt
+        """
+
+        seconds = parse_retry_after(retry_after)
+        if seconds is not None:
+            return min(seconds, self.max_backoff)
+
+        backoff = min(self.max_backoff, self.backoff_factor * 2**attempt)
+        return random.uniform(0, backoff)
+
+
+def parse_retry_after(value):
+    """
+    Parses a ``Retry-After`` header, given either in seconds or as an HTTP date.
+    :param value: header value, or ``None``
+    :return: seconds to wait, or ``None`` if the header is missing or invalid
+    """
+
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    from email.utils import parsedate_to_datetime
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max(0.0, (retry_at - now).total_seconds())
+
+
+def get_default_rate_limiter():
+    """
+    Returns the process-wide rate limiter used by sessions without their own.
+    """
+
+    global _default_rate_limiter
+
+    if _default_rate_limiter is None:
+        with _default_rate_limiter_lock:
+            if _default_rate_limiter is None:
+                _default_rate_limiter = RateLimiter()
+    return _default_rate_limiter
+
+
+def set_default_rate_limiter(rate_limiter):
+    """
+    Replaces the process-wide rate limiter, e.g. to cap the requests per second of
+    every scraper of the process: ``set_default_rate_limiter(RateLimiter(5))``.
+    :param rate_limiter: RateLimiter to use, or ``None`` to start over with one
+        which does not limit the rate.
+    """
+
+    global _default_rate_limiter
+
+    with _default_rate_limiter_lock:
+        _default_rate_limiter = rate_limiter
@@ -7,91 +7,111 @@ import json
 import os
 import sys
 import datetime
-from requests import get
+from collections import deque
+from functools import lru_cache
+from . import events
+from .flight import SingleFlight
+from .session import get_default_session
 
 
 _CMC_DATA_API = "https://api.coinmarketcap.com/data-api/v3"
 
-with open(os.path.join(os.path.dirname(__file__), "fiat_ids.json")) as _f:
-    _FIAT_IDS = json.load(_f)
+# identical windows requested at the same time by different scrapers are fetched once
+_chunk_flights = SingleFlight()
 
-_SUPPORTED_FIATS = ", ".join(sorted(_FIAT_IDS))
 
-_HEADERS = {"User-Agent": "Mozilla/5.0"}
-
-
-def get_url_data(url):
+def get_url_data(url, session=None):
     """
     This method downloads the data of the web page.
     :param url: 'url' of the web page to download
+    :param session: (optional) CmcSession to send the request through.
+        Defaults to the process-wide shared session.
     :return: response object of get request of the 'url'
     """
 
+    if session is None:
+        session = get_default_session()
+
     try:
-        response = get(url, headers=_HEADERS)
+        with events.span("cryptocmd.request", **{"http.url": url}) as span:
+            response = session.get(url)
+            if span:
+                span.set(**_response_attributes(response))
         return response
     except Exception as e:
         print("Error message (get_url_data) :", e)
         raise e
 
 
-def get_coin_id(coin_code, coin_name):
+def _response_attributes(response):
+    # event attributes of a response: status, body size and time to the headers
+    attributes = {
+        "http.status_code": response.status_code,
+        "http.response.body.size": len(response.content),
+    }
+    elapsed = getattr(response, "elapsed", None)
+    if elapsed is not None:
+        attributes["http.elapsed"] = elapsed.total_seconds()
+    return attributes
+
+
+def get_coin_id(coin_code, coin_name, session=None, registry=None):
     """
     This method fetches the id of currency from the given code
     :param coin_code: coin code of a cryptocurrency e.g. btc
     :param coin_name: coin name in case of many coins with same code e.g. sol -> solana, solcoin
+    :param session: (optional) CmcSession to send the request through
+    :param registry: (optional) CoinRegistry to resolve the code with.
+        Defaults to the process-wide registry, which downloads the listing once.
     :return: numeric coin id for the cryptocurrency on coinmarketcap.com
     """
 
-    api_url = (
-        "{}/cryptocurrency/listing?start=1&limit=5000"
-        "&sortBy=market_cap&sortType=desc&convert=USD"
-        "&cryptoType=all&tagType=all&audited=false"
-    ).format(_CMC_DATA_API)
+    if registry is None:
+        from .registry import get_default_registry
+
+        registry = get_default_registry()
 
     try:
-        json_data = get_url_data(api_url).json()
-        error_code = json_data["status"]["error_code"]
-        if str(error_code) == "0":
-            coins = json_data["data"]["cryptoCurrencyList"]
-            matches = [
-                c
-                for c in coins
-                if c["symbol"].upper() == coin_code.upper()
-                and (coin_name is None or c["name"].lower() == coin_name.lower())
-            ]
-            if matches:
-                return matches[0]["id"]
-            raise InvalidCoinCode(
-                "'{}' coin code is unavailable on coinmarketcap.com".format(coin_code)
-            )
-        if str(error_code) == "400":
-            raise InvalidCoinCode(
-                "'{}' coin code is unavailable on coinmarketcap.com".format(coin_code)
-            )
-        raise Exception(json_data["status"]["error_message"])
+        return registry.get_id(coin_code, coin_name, session=session)
     except Exception as e:
         print("Error fetching coin id data for coin code {}".format(coin_code))
         print("Error message:", e)
         raise e
 
 
-def download_coin_data(
-    coin_code, start_date, end_date, fiat, coin_name, id_number=None
-):
+@lru_cache(maxsize=1)
+def _fiat_ids():
+    """
+    Returns the fiat codes and ids of coinmarketcap.com, read on first use.
     """
-    Download price history for the specified cryptocurrency and time range from CoinMarketCap.
 
-    :param coin_code: coin code of a cryptocurrency e.g. btc
-    :param start_date: date since when to scrape data (in the format of dd-mm-yyyy)
-    :param end_date: date to which scrape the data (in the format of dd-mm-yyyy).
-        Defaults to today. CMC only returns completed daily candles, so the latest
-        candle returned will always be the last completed UTC day regardless of this value.
+    with open(os.path.join(os.path.dirname(__file__), "fiat_ids.json")) as f:
+        return json.load(f)
+
+
+def _get_convert_id(fiat):
+    """
+    Returns the numeric id coinmarketcap.com uses for a fiat.
     :param fiat: fiat code eg. USD, EUR
-    :param coin_name: coin name in case of many coins with same code e.g. sol -> solana, solcoin
-    :param id_number: id number for the token on coinmarketcap. Will override coin_code and coin_name when provided.
+    """
 
-    :return: json data with historical OHLCV data for the cryptocurrency
+    fiat_ids = _fiat_ids()
+    convert_id = fiat_ids.get(fiat.upper())
+    if convert_id is None:
+        supported = ", ".join(sorted(fiat_ids))
+        raise ValueError(f"Unknown fiat '{fiat}'. Supported: {supported}.")
+    return convert_id
+
+
+def _date_range(start_date, end_date):
+    """
+    Parses a date range, filling in the defaults used by coinmarketcap.com.
+    :param start_date: date since when to scrape data (in the format of dd-mm-yyyy).
+        Defaults to the first day of data on coinmarketcap.com.
+    :param end_date: date to which scrape the data (in the format of dd-mm-yyyy).
+        Defaults to today.
+    :return: (start, end) tuple of UTC datetimes
+    :raises InvalidParameters: if the range is empty, i.e. start is after end.
     """
 
     if start_date is None:
@@ -101,50 +121,261 @@ def download_coin_data(
     if end_date is None:
         end_date = datetime.date.today().strftime("%d-%m-%Y")
 
-    coin_id = id_number if id_number else get_coin_id(coin_code, coin_name)
-    convert_id = _FIAT_IDS.get(fiat.upper())
-    if convert_id is None:
-        raise ValueError(f"Unknown fiat '{fiat}'. Supported: {_SUPPORTED_FIATS}.")
-
     start_dt = datetime.datetime.strptime(start_date, "%d-%m-%Y").replace(
         tzinfo=datetime.timezone.utc
     )
     end_dt = datetime.datetime.strptime(end_date, "%d-%m-%Y").replace(
         tzinfo=datetime.timezone.utc
     )
+    if start_dt > end_dt:
+        raise InvalidParameters(
+            "'start_date' ({}) is after 'end_date' ({})".format(start_date, end_date)
+        )
+    return start_dt, end_dt
+
+
+def _chunk_windows(start_dt, end_dt):
+    """
+    Split a date range into the yearly windows requested from the historical API.
+    :param start_dt: first day to fetch (UTC datetime)
+    :param end_dt: last day to fetch (UTC datetime)
+    :return: list of (timeStart, timeEnd) datetime tuples in chronological order
+    """
+
+    # CMC caps responses at ~365 entries per request; split into yearly chunks
+    # so long/all-time ranges always return daily granularity.
+    # timeStart is exclusive (first returned day = timeStart + 1), so each
+    # chunk's timeStart equals the previous chunk's timeEnd — no overlap, no gap.
+    windows = []
+    chunk_start = start_dt - datetime.timedelta(days=1)
+
+    while chunk_start < end_dt:
+        chunk_end = min(chunk_start + datetime.timedelta(days=365), end_dt)
+        windows.append((chunk_start, chunk_end))
+        chunk_start = chunk_end + datetime.timedelta(days=1)
+
+    return windows
+
+
+def _historical_url(coin_id, convert_id, chunk_start, chunk_end):
+    """
+    Returns the url of one window of the historical API.
+    :param coin_id: numeric coin id on coinmarketcap.com
+    :param convert_id: numeric id of the fiat to quote prices in
+    :param chunk_start: exclusive start of the window (UTC datetime)
+    :param chunk_end: end of the window (UTC datetime)
+    """
+
+    return (
+        "{}/cryptocurrency/historical?id={}&convertId={}&timeStart={}&timeEnd={}"
+    ).format(
+        _CMC_DATA_API,
+        coin_id,
+        convert_id,
+        int(chunk_start.timestamp()),
+        int(chunk_end.timestamp()),
+    )
+
+
+def _check_chunk(json_data):
+    """
+    Raises the error reported by the historical API, if any.
+    :param json_data: json data of one window
+    :return: the json data
+    """
+
+    status = json_data.get("status", {})
+    error_code = status.get("error_code")
+    if error_code and str(error_code) != "0":
+        raise Exception(status.get("error_message", "Unknown error"))
+    return json_data
+
+
+def _fetch_chunk(coin_id, convert_id, chunk_start, chunk_end, session=None):
+    """
+    Fetch one window of the historical API.
+    :param coin_id: numeric coin id on coinmarketcap.com
+    :param convert_id: numeric id of the fiat to quote prices in
+    :param chunk_start: exclusive start of the window (UTC datetime)
+    :param chunk_end: end of the window (UTC datetime)
+    :param session: (optional) CmcSession to send the request through
+    :return: json data of the window, shared with the concurrent callers of the
+        same window: it must not be modified.
+    """
+
+    api_url = _historical_url(coin_id, convert_id, chunk_start, chunk_end)
+    with events.span(
+        "cryptocmd.chunk",
+        **{
+            "cryptocmd.coin_id": coin_id,
+            "cryptocmd.convert_id": convert_id,
+            "cryptocmd.time_start": int(chunk_start.timestamp()),
+            "cryptocmd.time_end": int(chunk_end.timestamp()),
+        },
+    ):
+        return _chunk_flights.do(api_url, _download_chunk, api_url, session)
+
+
+def _download_chunk(api_url, session=None):
+    from . import decode
+
+    return _check_chunk(decode.historical(get_url_data(api_url, session=session)))
+
+
+def _iter_chunks(
+    coin_id, convert_id, windows, max_workers=None, session=None, checkpoint=None
+):
+    """
+    Fetch windows one by one, or concurrently when more than one worker is allowed.
+    At most ``max_workers`` windows are fetched ahead of the one being consumed,
+    so memory stays bounded however many windows there are.
+    :param coin_id: numeric coin id on coinmarketcap.com
+    :param convert_id: numeric id of the fiat to quote prices in
+    :param windows: list of (timeStart, timeEnd) tuples as made by _chunk_windows
+    :param max_workers: maximum number of requests in flight at once
+    :param session: (optional) CmcSession to send the requests through
+    :param checkpoint: (optional) ChunkCheckpoint to take the windows it holds from,
+        and to save every fetched window to as soon as it arrives.
+    :return: generator of json data, one per window, in the same order as windows
+    """
+
+    saved = {}
+    if checkpoint is not None:
+        saved = checkpoint.get(coin_id, convert_id, windows)
+
+    def fetch(window):
+        json_data = saved.get(window)
+        if json_data is None:
+            json_data = _fetch_chunk(coin_id, convert_id, *window, session=session)
+            if checkpoint is not None:
+                checkpoint.put(coin_id, convert_id, window, json_data)
+        return json_data
+
+    if not max_workers or max_workers <= 1 or len(windows) <= 1:
+        for window in windows:
+            yield fetch(window)
+        return
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(windows)))
+    windows = iter(windows)
+    pending = deque()
+
+    def submit_next():
+        window = next(windows, None)
+        if window is not None:
+            pending.append(executor.submit(fetch, window))
+
+    try:
+        for _ in range(max_workers):
+            submit_next()
+
+        while pending:
+            # yield in window order so the first failing window (by date) is raised
+            json_data = pending.popleft().result()
+            submit_next()
+            yield json_data
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _fetch_chunks(
+    coin_id, convert_id, windows, max_workers=None, session=None, checkpoint=None
+):
+    """
+    Fetch all windows, concurrently when more than one worker is allowed.
+    Parameters are the same as the ones of ``_iter_chunks``.
+    :return: list of json data, one per window, in the same order as windows
+    """
+
+    return list(
+        _iter_chunks(coin_id, convert_id, windows, max_workers, session, checkpoint)
+    )
+
+
+def _merge_chunks(chunks):
+    """
+    Stitches the json data of consecutive windows into a single response.
+    :param chunks: list of json data in window order
+    :return: json data of the first window holding the quotes of all windows
+    """
+
+    all_quotes = []
+    result_json = None
+    for json_data in chunks:
+        if result_json is None:
+            # copied, as the chunk may be shared with other scrapers
+            result_json = dict(json_data, data=dict(json_data["data"]))
+        all_quotes.extend(json_data["data"]["quotes"])
+
+    result_json["data"]["quotes"] = all_quotes
+    return result_json
+
+
+def download_coin_data(
+    coin_code,
+    start_date,
+    end_date,
+    fiat,
+    coin_name,
+    id_number=None,
+    max_workers=None,
+    session=None,
+    checkpoint=None,
+    resume=True,
+):
+    """
+    Download price history for the specified cryptocurrency and time range from CoinMarketCap.
+
+    :param coin_code: coin code of a cryptocurrency e.g. btc
+    :param start_date: date since when to scrape data (in the format of dd-mm-yyyy)
+    :param end_date: date to which scrape the data (in the format of dd-mm-yyyy).
+        Defaults to today. CMC only returns completed daily candles, so the latest
+        candle returned will always be the last completed UTC day regardless of this value.
+    :param fiat: fiat code eg. USD, EUR
+    :param coin_name: coin name in case of many coins with same code e.g. sol -> solana, solcoin
+    :param id_number: id number for the token on coinmarketcap. Will override coin_code and coin_name when provided.
+    :param max_workers: (optional) number of yearly chunks to request concurrently.
+        Chunks are fetched one after another when not given.
+    :param session: (optional) CmcSession to send the requests through.
+        Defaults to the process-wide shared session.
+    :param checkpoint: (optional) ChunkCheckpoint saving the yearly chunks as they
+        arrive, so that when the download fails, calling it again only fetches the
+        chunks which are missing. The chunks are dropped once it succeeds.
+    :param resume: (optional) if ``False``, chunks saved by a previous failed call
+        are dropped and every chunk is fetched again.
+
+    :return: json data with historical OHLCV data for the cryptocurrency
+    """
+
+    start_dt, end_dt = _date_range(start_date, end_date)
+    start_date, end_date = start_dt.strftime("%d-%m-%Y"), end_dt.strftime("%d-%m-%Y")
+
+    coin_id = (
+        id_number if id_number else get_coin_id(coin_code, coin_name, session=session)
+    )
+    convert_id = _get_convert_id(fiat)
+    windows = _chunk_windows(start_dt, end_dt)
+    if checkpoint is not None and not resume:
+        checkpoint.discard(coin_id, convert_id)
 
     try:
-        # CMC caps responses at ~365 entries per request; split into yearly chunks
-        # so long/all-time ranges always return daily granularity.
-        # timeStart is exclusive (first returned day = timeStart + 1), so each
-        # chunk's timeStart equals the previous chunk's timeEnd — no overlap, no gap.
-        all_quotes = []
-        result_json = None
-        chunk_start = start_dt - datetime.timedelta(days=1)
-
-        while chunk_start < end_dt:
-            chunk_end = min(chunk_start + datetime.timedelta(days=365), end_dt)
-            api_url = (
-                "{}/cryptocurrency/historical"
-                "?id={}&convertId={}&timeStart={}&timeEnd={}"
-            ).format(
-                _CMC_DATA_API,
-                coin_id,
-                convert_id,
-                int(chunk_start.timestamp()),
-                int(chunk_end.timestamp()),
+        with events.span(
+            "cryptocmd.download",
+            **{
+                "cryptocmd.coin_id": coin_id,
+                "cryptocmd.convert_id": convert_id,
+                "cryptocmd.chunks": len(windows),
+            },
+        ):
+            chunks = _fetch_chunks(
+                coin_id, convert_id, windows, max_workers, session, checkpoint
             )
-            json_data = get_url_data(api_url).json()
-            status = json_data.get("status", {})
-            error_code = status.get("error_code")
-            if error_code and str(error_code) != "0":
-                raise Exception(status.get("error_message", "Unknown error"))
-            if result_json is None:
-                result_json = json_data
-            all_quotes.extend(json_data["data"]["quotes"])
-            chunk_start = chunk_end + datetime.timedelta(days=1)
-
-        result_json["data"]["quotes"] = all_quotes
+            result_json = _merge_chunks(chunks)
+
+        if checkpoint is not None:
+            checkpoint.discard(coin_id, convert_id)
 
         if id_number:
             show_coin_info = False
@@ -178,6 +409,96 @@ def download_coin_data(
         raise e
 
 
+def _iter_coin_chunks(
+    coin_code,
+    start_date,
+    end_date,
+    fiat,
+    coin_name,
+    id_number=None,
+    max_workers=None,
+    session=None,
+    newest_first=False,
+):
+    """
+    Download price history window by window. Parameters are the same as the ones of
+    ``iter_coin_data``.
+    :return: generator of json data of each window, in the requested order
+    """
+
+    start_dt, end_dt = _date_range(start_date, end_date)
+
+    coin_id = (
+        id_number if id_number else get_coin_id(coin_code, coin_name, session=session)
+    )
+    convert_id = _get_convert_id(fiat)
+
+    windows = _chunk_windows(start_dt, end_dt)
+    if newest_first:
+        windows.reverse()
+
+    try:
+        for json_data in _iter_chunks(
+            coin_id, convert_id, windows, max_workers, session=session
+        ):
+            yield json_data
+    except Exception as e:
+        print(
+            "Error fetching price data for {} for interval '{}' and '{}'".format(
+                f"(id {id_number})" if id_number else coin_code,
+                start_dt.strftime("%d-%m-%Y"),
+                end_dt.strftime("%d-%m-%Y"),
+            )
+        )
+        print("Error message (download_data) :", e)
+        raise e
+
+
+def iter_coin_data(
+    coin_code,
+    start_date,
+    end_date,
+    fiat,
+    coin_name,
+    id_number=None,
+    max_workers=None,
+    session=None,
+    newest_first=False,
+):
+    """
+    Generator version of ``download_coin_data``: yearly windows are downloaded on
+    demand and their quotes yielded one at a time, so processing can start with the
+    first window and memory stays flat however long the history is.
+
+    :param coin_code: coin code of a cryptocurrency e.g. btc
+    :param start_date: date since when to scrape data (in the format of dd-mm-yyyy)
+    :param end_date: date to which scrape the data (in the format of dd-mm-yyyy).
+    :param fiat: fiat code eg. USD, EUR
+    :param coin_name: coin name in case of many coins with same code e.g. sol -> solana, solcoin
+    :param id_number: id number for the token on coinmarketcap. Will override coin_code and coin_name when provided.
+    :param max_workers: (optional) number of yearly chunks to download ahead concurrently.
+    :param session: (optional) CmcSession to send the requests through.
+    :param newest_first: (optional) yield the newest quote first instead of the oldest.
+
+    :return: generator of quotes, in the format of ``json_data['data']['quotes']``
+    """
+
+    for json_data in _iter_coin_chunks(
+        coin_code,
+        start_date,
+        end_date,
+        fiat,
+        coin_name,
+        id_number,
+        max_workers,
+        session,
+        newest_first,
+    ):
+        quotes = json_data["data"]["quotes"]
+        for quote in reversed(quotes) if newest_first else quotes:
+            yield quote
+
+
 def _replace(s, bad_chars):
     if sys.version_info > (3, 0):
         # For Python 3
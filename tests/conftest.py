@@ -0,0 +1,222 @@
+"""
+Helpers and fixtures shared by the tests: mocked responses and a fake of the
+coinmarketcap.com api.
+"""
+
+import asyncio
+import copy
+import datetime
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from cryptocmd.registry import set_default_registry
+
+
+def _make_quote(date_str):
+    """Return a minimal CMC quote dict for a given UTC date string (YYYY-MM-DD)."""
+    return {
+        "timeOpen": f"{date_str}T00:00:00.000Z",
+        "timeHigh": f"{date_str}T12:00:00.000Z",
+        "timeLow": f"{date_str}T06:00:00.000Z",
+        "timeClose": f"{date_str}T23:59:59.999Z",
+        "quote": {
+            "open": 50000.0,
+            "high": 51000.0,
+            "low": 49000.0,
+            "close": 50500.0,
+            "volume": 1000000.0,
+            "marketCap": 900000000000.0,
+        },
+    }
+
+
+def _make_response(quotes, coin_id=1, symbol="BTC", name="Bitcoin"):
+    """Return a minimal CMC historical API response dict."""
+    return {
+        "status": {"error_code": 0, "error_message": None},
+        "data": {
+            "id": coin_id,
+            "symbol": symbol,
+            "name": name,
+            "quotes": quotes,
+        },
+    }
+
+
+def _mock_get_url_data(response_dict):
+    """Return a mock whose .json() returns response_dict."""
+    mock_response = MagicMock()
+    mock_response.json.return_value = response_dict
+    return mock_response
+
+
+_LISTING = {
+    "status": {"error_code": 0},
+    "data": {
+        "cryptoCurrencyList": [
+            {"id": 1, "symbol": "BTC", "name": "Bitcoin"},
+            {"id": 5426, "symbol": "SOL", "name": "Solana"},
+            {"id": 1027, "symbol": "ETH", "name": "Ethereum"},
+            {"id": 4236, "symbol": "SOL", "name": "SOLcoin"},
+            {"id": 52, "symbol": "XRP", "name": "XRP"},
+        ]
+    },
+}
+
+# listed coins by id, for the symbol and name of the historical api responses
+_COINS = {str(coin["id"]): coin for coin in _LISTING["data"]["cryptoCurrencyList"]}
+
+
+def _utc_date(timestamp):
+    return datetime.datetime.fromtimestamp(
+        int(timestamp), tz=datetime.timezone.utc
+    ).date()
+
+
+class FakeCmcApi(object):
+    """
+    Fake of ``utils.get_url_data``, and of ``aio.get_url_data`` with
+    ``get_url_data``, serving the listing and the historical api.
+
+    Windows of the historical api get one quote per day from timeStart to timeEnd
+    (like the live API, the day of timeStart itself is part of the response), or
+    a single quote of ``day`` when given. Every requested url is recorded in
+    ``urls``, and the most requests in flight at once in ``peak``.
+
+    """
+
+    def __init__(
+        self,
+        day=None,
+        empty_ids=(),
+        fail_ids=(),
+        fail_years=(),
+        fail_after=None,
+        delay=0.0,
+    ):
+        """
+        :param day: (optional) 'YYYY-MM-DD' date of the single quote of every window.
+        :param empty_ids: coin ids whose windows have no quotes.
+        :param fail_ids: coin ids whose windows fail with ConnectionError.
+        :param fail_years: years whose windows, by timeStart, fail with
+            ConnectionError.
+        :param fail_after: (optional) number of requests after which all fail.
+        :param delay: seconds every response takes.
+        """
+
+        self.day = day
+        self.empty_ids = empty_ids
+        self.fail_ids = fail_ids
+        self.fail_years = fail_years
+        self.fail_after = fail_after
+        self.delay = delay
+        self.urls = []
+        self.peak = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def historical_urls(self):
+        return [url for url in self.urls if "historical" in url]
+
+    def json(self, url):
+        """Records a request and returns the json data of its response."""
+        with self._lock:
+            self.urls.append(url)
+            failed = self.fail_after is not None and len(self.urls) > self.fail_after
+
+        if "listing" in url:
+            return copy.deepcopy(_LISTING)
+
+        params = dict(p.split("=") for p in url.split("?")[1].split("&"))
+        if (
+            failed
+            or params["id"] in self.fail_ids
+            or _utc_date(params["timeStart"]).year in self.fail_years
+        ):
+            raise ConnectionError("boom")
+
+        if params["id"] in self.empty_ids:
+            quotes = []
+        elif self.day is not None:
+            quotes = [_make_quote(self.day)]
+        else:
+            day, end = _utc_date(params["timeStart"]), _utc_date(params["timeEnd"])
+            quotes = []
+            while day <= end:
+                quotes.append(_make_quote(day.isoformat()))
+                day += datetime.timedelta(days=1)
+
+        coin = _COINS.get(params["id"], _COINS["1"])
+        return _make_response(
+            quotes, coin_id=int(params["id"]), symbol=coin["symbol"], name=coin["name"]
+        )
+
+    def _enter(self):
+        with self._lock:
+            self._in_flight += 1
+            self.peak = max(self.peak, self._in_flight)
+
+    def _exit(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def __call__(self, url, **kwargs):
+        self._enter()
+        try:
+            json_data = self.json(url)
+            time.sleep(self.delay)
+            return _mock_get_url_data(json_data)
+        finally:
+            self._exit()
+
+    async def get_url_data(self, url, session):
+        self._enter()
+        try:
+            json_data = self.json(url)
+            await asyncio.sleep(self.delay)
+            return json_data
+        finally:
+            self._exit()
+
+
+@pytest.fixture(autouse=True)
+def fresh_default_registry():
+    set_default_registry(None)
+    yield
+    set_default_registry(None)
+
+
+@pytest.fixture
+def listing():
+    """json data of the listing api served by FakeCmcApi."""
+    return copy.deepcopy(_LISTING)
+
+
+@pytest.fixture
+def fake_api():
+    """FakeCmcApi factory, taking its parameters e.g. ``fake_api(delay=0.01)``."""
+    return FakeCmcApi
+
+
+@pytest.fixture
+def cmc_api(request):
+    """
+    FakeCmcApi serving the requests of the synchronous scrapers. Parameters of the
+    fake are given by indirect parametrization, e.g.
+    ``@pytest.mark.parametrize("cmc_api", [{"delay": 0.01}], indirect=True)``.
+    """
+    api = FakeCmcApi(**getattr(request, "param", {}))
+    with patch("cryptocmd.utils.get_url_data", side_effect=api):
+        yield api
+
+
+@pytest.fixture
+def async_cmc_api(request):
+    """FakeCmcApi serving the requests of the asyncio scrapers, like cmc_api."""
+    api = FakeCmcApi(**getattr(request, "param", {}))
+    with patch("cryptocmd.aio.get_url_data", side_effect=api.get_url_data):
+        yield api
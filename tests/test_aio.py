@@ -0,0 +1,151 @@
+"""
+Tests for the asyncio client.
+"""
+
+import asyncio
+import datetime
+
+import pytest
+
+from cryptocmd import AsyncCmcScraper, AsyncCmcSession, CmcScraper
+from cryptocmd.throttle import RetryPolicy
+
+# every response takes a little while, so that requests overlap
+slow_api = pytest.mark.parametrize("async_cmc_api", [{"delay": 0.01}], indirect=True)
+
+
+class TestAsyncCmcScraper:
+    """AsyncCmcScraper offers awaitable versions of the scraper methods."""
+
+    def test_same_rows_as_sync_scraper(self, cmc_api, async_cmc_api):
+        _, expected = CmcScraper(
+            "BTC", "01-01-2020", "31-12-2023", id_number=1
+        ).get_data()
+
+        scraper = AsyncCmcScraper("BTC", "01-01-2020", "31-12-2023", id_number=1)
+        _, rows = asyncio.run(scraper.get_data())
+
+        assert rows == expected
+        assert len(async_cmc_api.urls) == 4
+
+    @slow_api
+    def test_coin_code_resolved_with_shared_registry(self, async_cmc_api):
+        # the listing arrives late, while the other scrapers wait for it
+        async def scrape_all():
+            scrapers = [
+                AsyncCmcScraper(code, "01-01-2024", "02-01-2024")
+                for code in ("btc", "eth", "sol")
+            ]
+            return await asyncio.gather(*[s.get_data() for s in scrapers])
+
+        results = asyncio.run(scrape_all())
+
+        assert len(results) == 3
+        assert len([u for u in async_cmc_api.urls if "listing" in u]) == 1
+
+    @slow_api
+    def test_chunks_limited_by_semaphore(self, async_cmc_api):
+        scraper = AsyncCmcScraper(
+            "BTC", "01-01-2014", "31-12-2023", id_number=1, max_workers=3
+        )
+        asyncio.run(scraper.get_data())
+
+        assert async_cmc_api.peak == 3
+
+    @pytest.mark.parametrize("async_cmc_api", [{"fail_after": 2}], indirect=True)
+    def test_failed_chunk_raises(self, async_cmc_api):
+        scraper = AsyncCmcScraper("BTC", "01-01-2014", "31-12-2023", id_number=1)
+        with pytest.raises(ConnectionError):
+            asyncio.run(scraper.get_data())
+
+    def test_dataframe_and_export(self, tmp_path, async_cmc_api):
+        pytest.importorskip("pandas")
+        scraper = AsyncCmcScraper("BTC", "01-01-2024", "05-01-2024", id_number=1)
+        dataframe = asyncio.run(scraper.get_dataframe())
+        asyncio.run(scraper.export("csv", name="btc", path=str(tmp_path)))
+
+        assert dataframe["Date"].iloc[0] == datetime.datetime(2024, 1, 5)
+        assert (tmp_path / "btc.csv").read_text().startswith("Date,Open")
+
+    @slow_api
+    def test_iter_quotes(self, cmc_api, async_cmc_api):
+        scraper = CmcScraper("BTC", "01-01-2020", "31-12-2023", id_number=1)
+        expected = list(scraper.iter_quotes(batch_size=100, interval="1M"))
+
+        async def collect(scraper):
+            return [batch async for batch in scraper.iter_quotes(100, "1M")]
+
+        scraper = AsyncCmcScraper(
+            "BTC", "01-01-2020", "31-12-2023", id_number=1, max_workers=2
+        )
+        batches = asyncio.run(collect(scraper))
+
+        assert batches == expected
+        assert async_cmc_api.peak == 2
+        assert len(scraper.candles) == 0
+
+    def test_export_stream(self, tmp_path, cmc_api, async_cmc_api):
+        CmcScraper("BTC", "01-01-2022", "31-12-2023", id_number=1).export_stream(
+            "jsonl", name="sync", path=str(tmp_path)
+        )
+
+        scraper = AsyncCmcScraper("BTC", "01-01-2022", "31-12-2023", id_number=1)
+        asyncio.run(scraper.export_stream("jsonl", name="async", path=str(tmp_path)))
+
+        expected = (tmp_path / "sync.jsonl").read_text()
+        assert (tmp_path / "async.jsonl").read_text() == expected
+        assert expected.startswith('{"Date": "31-12-2023"')
+
+    def test_scraper_attributes(self):
+        scraper = AsyncCmcScraper("BTC", "01-01-2024", "05-01-2024", id_number=1)
+        assert scraper.start_date == "01-01-2024"
+        assert len(scraper.candles) == 0
+        with pytest.raises(AttributeError):
+            scraper.export_csv
+
+
+class TestAsyncCmcSession:
+    """AsyncCmcSession opens a pooled aiohttp session on first use."""
+
+    def test_client_configured(self):
+        pytest.importorskip("aiohttp")
+
+        async def open_and_close():
+            async with AsyncCmcSession(pool_size=4, timeout=5) as session:
+                client = session._client()
+                assert client.connector.limit == 4
+                assert client.timeout.total == 5
+                assert client.headers["User-Agent"] == "Mozilla/5.0"
+
+        asyncio.run(open_and_close())
+
+    def test_exhausted_retries_raise(self):
+        aiohttp = pytest.importorskip("aiohttp")
+        requests = []
+
+        class FakeResponse(object):
+            status = 503
+            headers = {"Retry-After": "0"}
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *args):
+                pass
+
+            def raise_for_status(self):
+                raise aiohttp.ClientResponseError(None, (), status=self.status)
+
+            async def json(self, content_type=None):
+                raise AssertionError("error pages are not decoded")
+
+        class FakeClient(object):
+            def get(self, url):
+                requests.append(url)
+                return FakeResponse()
+
+        session = AsyncCmcSession(retry=RetryPolicy(max_retries=2))
+        session._session = FakeClient()
+        with pytest.raises(aiohttp.ClientResponseError):
+            asyncio.run(session.get_json("https://example.com"))
+        assert len(requests) == 3
@@ -0,0 +1,89 @@
+"""
+Tests for the memory-mapped candle archive.
+"""
+
+import pytest
+
+from cryptocmd import CandleArchive, CmcScraper
+
+np = pytest.importorskip("numpy")
+
+
+def _scraper(start_date="01-01-2020", end_date="31-12-2023", order_ascending=False):
+    scraper = CmcScraper(
+        "BTC", start_date, end_date, order_ascending=order_ascending, id_number=1
+    )
+    scraper.get_data()
+    return scraper
+
+
+def _in_march_2021(row):
+    day, month, year = row[0].split("-")
+    return (year, month) == ("2021", "03") and int(day) <= 15
+
+
+@pytest.fixture
+def archive(tmp_path, cmc_api):
+    archive = CandleArchive(str(tmp_path / "archive"))
+    archive.save(_scraper())
+    return archive
+
+
+class TestCandleArchive:
+    """CandleArchive serves archived candles like a scraper, without parsing."""
+
+    def test_same_rows_as_scraper(self, archive):
+        for order_ascending in (False, True):
+            headers, rows = _scraper(order_ascending=order_ascending).get_data()
+            scraper = archive.scraper(
+                1, "01-03-2021", "15-03-2021", order_ascending=order_ascending
+            )
+
+            assert scraper.get_data() == (
+                headers,
+                [row for row in rows if _in_march_2021(row)],
+            )
+            assert (scraper.start_date, scraper.end_date) == (
+                "01-03-2021",
+                "15-03-2021",
+            )
+
+    def test_all_time(self, archive):
+        expected = _scraper()
+        scraper = archive.scraper(1, all_time=True)
+        assert scraper.get_data() == expected.get_data()
+        assert scraper.start_date == expected.start_date
+
+    def test_range_is_a_view_of_the_file(self, archive):
+        candles = archive.get(1, "USD", "01-01-2021", "31-01-2021")
+
+        assert len(candles) == 31
+        close = candles.as_numpy("close", copy=False)
+        assert not close.flags.writeable
+        assert isinstance(close.base, np.memmap)
+
+    def test_dataframe_matches_scraper(self, archive):
+        pytest.importorskip("pandas")
+        expected = _scraper().get_dataframe()
+        expected = expected[
+            (expected["Date"] >= "2021-03-01") & (expected["Date"] <= "2021-03-15")
+        ].reset_index(drop=True)
+        dataframe = archive.scraper(1, "01-03-2021", "15-03-2021").get_dataframe(
+            copy=False
+        )
+        assert dataframe.equals(expected)
+
+    def test_put_replaces_days(self, archive):
+        update = _scraper("31-12-2023", "02-01-2024")
+        update.candles.close[0] = 1.0
+        archive.save(update)
+
+        candles = archive.get(1, "USD", "01-01-2020", "02-01-2024")
+        assert candles.row(0)[0] == "02-01-2024"
+        assert candles.row(0)[4] == 1.0
+        assert len(set(candles.as_numpy("time_open"))) == len(candles)
+
+    def test_unknown_coin_is_empty(self, archive):
+        assert len(archive.get(1027, "USD")) == 0
+        scraper = archive.scraper(1, "01-01-2020", "31-01-2020", fiat="EUR")
+        assert scraper.get_data()[1] == []
@@ -0,0 +1,153 @@
+"""
+Tests for the Parquet and Arrow IPC exports.
+"""
+
+import os
+
+import pytest
+
+from cryptocmd import CmcBatchScraper, CmcScraper
+from cryptocmd.candles import Candles, format_date
+
+from .conftest import _make_quote
+
+pa = pytest.importorskip("pyarrow")
+
+
+# a single quote per window, so that every coin and fiat gets one row
+one_quote = pytest.mark.parametrize("cmc_api", [{"day": "2024-01-01"}], indirect=True)
+
+
+@pytest.fixture
+def scraper(cmc_api):
+    scraper = CmcScraper("BTC", "30-12-2023", "02-01-2024", id_number=1)
+    scraper.get_data()
+    return scraper
+
+
+class TestArrowTable:
+    """Scraped data converts to a typed Arrow table."""
+
+    def test_typed_columns(self, scraper):
+        table = scraper.to_arrow()
+
+        assert table.column_names == CmcScraper().headers
+        assert table.schema.field("Date").type == pa.date32()
+        assert table.schema.field("Close").type == pa.float64()
+        assert table.schema.field("Time Open").type == pa.timestamp("ms", tz="UTC")
+        assert str(table.column("Date")[0]) == "2024-01-02"
+
+    def test_same_values_as_dataframe(self, scraper):
+        pytest.importorskip("pandas")
+        table_frame = scraper.to_arrow().to_pandas()
+        frame = scraper.get_dataframe()
+
+        assert table_frame["Close"].tolist() == frame["Close"].tolist()
+        assert (table_frame["Time Close"] == frame["Time Close"]).all()
+
+    def test_missing_values_are_nulls(self):
+        quote = _make_quote("2024-01-01")
+        quote["quote"]["marketCap"] = None
+        scraper = CmcScraper("BTC", "01-01-2024", "01-01-2024")
+        scraper.candles = Candles.from_quotes([quote])
+        table = scraper.to_arrow()
+
+        assert table.column("Market Cap").null_count == 1
+        assert table.column("Close").null_count == 0
+
+    def test_coin_column_is_dictionary_encoded(self, scraper):
+        table = scraper.to_arrow(coin_column=True)
+        assert table.column_names[0] == "Coin"
+        assert pa.types.is_dictionary(table.schema.field("Coin").type)
+
+
+class TestArrowExport:
+    """export writes Parquet and Arrow IPC files, optionally partitioned."""
+
+    def test_parquet_roundtrip(self, tmp_path, scraper):
+        import pyarrow.parquet as pq
+
+        scraper.export("parquet", name="btc", path=str(tmp_path))
+
+        table = pq.read_table(str(tmp_path / "btc.parquet"))
+        assert table.equals(scraper.to_arrow())
+        metadata = pq.ParquetFile(str(tmp_path / "btc.parquet")).metadata
+        assert metadata.row_group(0).column(1).compression == "ZSTD"
+
+    def test_arrow_file_can_be_memory_mapped(self, tmp_path, scraper):
+        scraper.export("arrow", name="btc", path=str(tmp_path))
+
+        with pa.memory_map(str(tmp_path / "btc.arrow")) as source:
+            table = pa.ipc.open_file(source).read_all()
+        assert table.equals(scraper.to_arrow())
+
+    def test_partitioned_by_year(self, tmp_path, scraper):
+        import pyarrow.dataset as ds
+
+        scraper.export(
+            "parquet", name="btc", path=str(tmp_path), partition_by=["coin", "year"]
+        )
+
+        assert sorted(os.listdir(tmp_path / "btc" / "Coin=BTC")) == [
+            "Year=2023",
+            "Year=2024",
+        ]
+        dataset = ds.dataset(str(tmp_path / "btc"), partitioning="hive")
+        assert dataset.count_rows() == len(scraper.candles)
+
+    def test_write_error_printed(self, tmp_path, capsys, scraper):
+        missing = str(tmp_path / "missing")
+        assert scraper.export("parquet", name="btc", path=missing) is None
+        assert "I/O error" in capsys.readouterr().out
+
+    def test_unknown_partition_column(self, tmp_path, scraper):
+        with pytest.raises(ValueError):
+            scraper.export("parquet", path=str(tmp_path), partition_by=["month"])
+
+
+class TestBatchArrowExport:
+    """CmcBatchScraper exports all coins to a single table."""
+
+    @one_quote
+    def test_partitioned_by_coin_and_fiat(self, tmp_path, cmc_api):
+        import pyarrow.dataset as ds
+
+        batch = CmcBatchScraper(
+            ["btc", "eth"], "01-01-2024", "02-01-2024", fiat=["USD", "EUR"]
+        )
+        batch.export(
+            "feather", name="prices", path=str(tmp_path), partition_by=["coin"]
+        )
+
+        assert sorted(os.listdir(tmp_path / "prices")) == ["Coin=btc", "Coin=eth"]
+        table = ds.dataset(
+            str(tmp_path / "prices"), format="ipc", partitioning="hive"
+        ).to_table()
+        assert table.num_rows == 4
+        assert sorted(table.column("Fiat").to_pylist()) == ["EUR"] * 2 + ["USD"] * 2
+
+    def test_only_arrow_formats(self):
+        with pytest.raises(ValueError):
+            CmcBatchScraper(["btc"]).export("csv")
+
+    @one_quote
+    def test_default_name_from_downloaded_data(self, tmp_path, cmc_api):
+        batch = CmcBatchScraper([1, "eth"], all_time=True)
+        path = batch.export("parquet", path=str(tmp_path))
+
+        times = [
+            time
+            for scraper in batch.results.values()
+            for time in scraper.candles.time_open
+        ]
+        first, last = format_date(min(times)), format_date(max(times))
+        assert os.path.basename(path) == "BTC_eth_USD-{}_{}.parquet".format(first, last)
+        assert os.path.exists(path)
+
+    @one_quote
+    def test_write_error_printed(self, tmp_path, capsys, cmc_api):
+        batch = CmcBatchScraper(["btc"], "01-01-2024", "02-01-2024")
+        path = batch.export("parquet", path=str(tmp_path / "missing"))
+
+        assert path is None
+        assert "I/O error" in capsys.readouterr().out
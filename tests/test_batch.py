@@ -0,0 +1,125 @@
+"""
+Tests for the multi-coin batch scraper.
+"""
+
+import pytest
+
+from cryptocmd import CmcBatchScraper
+
+# a single quote per window, so that every coin and fiat gets one row
+one_quote = pytest.mark.parametrize("cmc_api", [{"day": "2024-01-01"}], indirect=True)
+
+
+class TestCmcBatchScraper:
+    """CmcBatchScraper scrapes many coins with shared resolution and scheduling."""
+
+    @one_quote
+    def test_results_per_coin(self, cmc_api):
+        batch = CmcBatchScraper(["btc", "eth", 52], "01-01-2024", "02-01-2024")
+        data = batch.get_data()
+
+        assert set(data) == {"btc", "eth", 52}
+        headers, rows = data["eth"]
+        assert headers[0] == "Date"
+        assert rows[0][0] == "01-01-2024"
+        assert batch.errors == {}
+        assert len([u for u in cmc_api.urls if "listing" in u]) == 1
+
+    @pytest.mark.parametrize(
+        "cmc_api", [{"day": "2024-01-01", "fail_ids": ("1027",)}], indirect=True
+    )
+    def test_partial_failures_reported_per_coin(self, cmc_api):
+        batch = CmcBatchScraper(["btc", "eth", "nope"], "01-01-2024", "02-01-2024")
+        data = batch.get_data()
+
+        assert set(data) == {"btc"}
+        assert isinstance(batch.errors["eth"], ConnectionError)
+        assert "nope" in batch.errors
+
+    @pytest.mark.parametrize(
+        "cmc_api", [{"day": "2024-01-01", "delay": 0.02}], indirect=True
+    )
+    def test_chunks_scheduled_across_coins(self, cmc_api):
+        batch = CmcBatchScraper(
+            [1, 1027, 52], "01-01-2020", "01-01-2024", max_workers=4
+        )
+        batch.get_data()
+
+        assert len(batch.results) == 3
+        assert cmc_api.peak == 4
+
+    @pytest.mark.parametrize(
+        "cmc_api", [{"day": "2024-01-01", "empty_ids": ("52",)}], indirect=True
+    )
+    def test_coin_without_quotes_not_downloaded_again(self, cmc_api):
+        batch = CmcBatchScraper(["btc", 52], "01-01-2024", "02-01-2024")
+        data = batch.get_data()
+        requests = len(cmc_api.urls)
+
+        assert data[52][1] == []
+        assert batch.get_data()[52][1] == []
+        assert batch.get_data(interval="1w")[52][1] == []
+        assert len(cmc_api.urls) == requests
+
+    @one_quote
+    def test_interval(self, cmc_api):
+        batch = CmcBatchScraper(["btc", "eth"], "01-01-2024", "02-01-2024")
+        data = batch.get_data(interval="1M")
+
+        assert set(data) == {"btc", "eth"}
+        headers, rows = data["btc"]
+        assert rows == list(batch.results["btc"].candles.resample("1M").iter_rows())
+
+    @one_quote
+    def test_long_format_dataframe(self, cmc_api):
+        pytest.importorskip("pandas")
+        batch = CmcBatchScraper(["btc", "eth"], "01-01-2024", "02-01-2024")
+        dataframe = batch.get_dataframe()
+
+        assert list(dataframe.columns[:2]) == ["Coin", "Date"]
+        assert sorted(dataframe["Coin"].unique()) == ["btc", "eth"]
+
+
+class TestMultiFiat:
+    """A list of fiats shares id resolution and scheduling across fiats."""
+
+    @one_quote
+    def test_results_per_coin_and_fiat(self, cmc_api):
+        batch = CmcBatchScraper(
+            ["btc", "eth"], "01-01-2024", "02-01-2024", fiat=["USD", "EUR"]
+        )
+        data = batch.get_data()
+
+        assert set(data) == {
+            ("btc", "USD"),
+            ("btc", "EUR"),
+            ("eth", "USD"),
+            ("eth", "EUR"),
+        }
+        assert batch.results[("eth", "EUR")].fiat == "EUR"
+        assert len([u for u in cmc_api.urls if "listing" in u]) == 1
+        convert_ids = {
+            u.split("convertId=")[1].split("&")[0] for u in cmc_api.historical_urls
+        }
+        assert convert_ids == {"2781", "2790"}
+
+    def test_unknown_fiat_rejected(self):
+        batch = CmcBatchScraper(["btc"], "01-01-2024", "02-01-2024", fiat=["USD", "?"])
+        with pytest.raises(ValueError):
+            batch.get_data()
+
+    @one_quote
+    def test_long_format_dataframe_with_fiat_column(self, cmc_api):
+        pytest.importorskip("pandas")
+        batch = CmcBatchScraper(
+            ["btc", 52], "01-01-2024", "02-01-2024", fiat=["USD", "EUR"]
+        )
+        dataframe = batch.get_dataframe()
+
+        assert list(dataframe.columns[:3]) == ["Coin", "Fiat", "Date"]
+        assert len(dataframe) == 4
+        assert list(dataframe["Coin"].cat.categories) == ["btc", 52]
+        assert (
+            dataframe.groupby(["Coin", "Fiat"], observed=True).size().tolist()
+            == [1] * 4
+        )
@@ -0,0 +1,126 @@
+"""
+Tests for the HTTP response cache.
+"""
+
+import datetime
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from cryptocmd import CmcScraper, CmcSession, ResponseCache
+from cryptocmd.utils import _historical_url
+
+from .conftest import _make_quote, _make_response
+
+
+def _response(body, status=200, headers=None):
+    response = MagicMock()
+    response.status_code = status
+    response.headers = headers or {}
+    response.content = json.dumps(body).encode()
+    response.json.return_value = body
+    return response
+
+
+def _url(days_ago):
+    # one week window of the historical api, ending days_ago days before today
+    end = datetime.datetime.now(datetime.timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    ) - datetime.timedelta(days=days_ago)
+    return _historical_url(1, 2781, end - datetime.timedelta(days=7), end)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(str(tmp_path / "http.db"), ttl=60)
+
+
+@pytest.fixture
+def session(cache):
+    session = CmcSession(cache=cache)
+    session.session = MagicMock()
+    session.session.get.return_value = _response(
+        _make_response([_make_quote("2024-01-01")])
+    )
+    return session
+
+
+class TestResponseCache:
+    """Closed windows are cached forever, recent ones for a short while."""
+
+    def test_closed_window_served_from_cache(self, session):
+        url = _url(days_ago=30)
+        first = session.get(url).json()
+        with patch("cryptocmd.cache.time.time", return_value=2e10):
+            cached = session.get(url)
+
+        assert cached.from_cache
+        assert cached.json() == first
+        assert session.session.get.call_count == 1
+
+    def test_key_ignores_parameter_order(self, session):
+        base, query = _url(days_ago=30).split("?")
+        session.get(_url(days_ago=30))
+        session.get("{}?{}".format(base, "&".join(reversed(query.split("&")))))
+        assert session.session.get.call_count == 1
+
+    def test_recent_window_expires(self, session):
+        url = _url(days_ago=0)
+        session.get(url)
+        assert session.get(url).from_cache
+        with patch("cryptocmd.cache.time.time", return_value=2e10):
+            session.get(url)
+        assert session.session.get.call_count == 2
+
+    def test_stale_response_revalidated_with_etag(self, session):
+        url = _url(days_ago=0)
+        session.session.get.return_value.headers = {"ETag": '"v1"'}
+        session.get(url)
+
+        session.session.get.return_value = _response(None, status=304)
+        with patch("cryptocmd.cache.time.time", return_value=2e10):
+            response = session.get(url)
+
+        assert response.from_cache
+        assert response.json()["status"]["error_code"] == 0
+        headers = session.session.get.call_args.kwargs["headers"]
+        assert headers["If-None-Match"] == '"v1"'
+
+    def test_errors_not_cached(self, session, cache):
+        session.session.get.return_value = _response(
+            {"status": {"error_code": "500", "error_message": "boom"}}
+        )
+        session.get(_url(days_ago=30))
+        session.session.get.return_value = _response({}, status=503)
+        with patch("cryptocmd.session.time.sleep"):
+            session.get(_url(days_ago=60))
+        assert len(cache) == 0
+
+    def test_least_recently_used_evicted(self, tmp_path):
+        body = _make_response([_make_quote("2024-01-01")])
+        size = len(json.dumps(body).encode())
+        cache = ResponseCache(str(tmp_path / "http.db"), max_size=2 * size)
+        urls = [_url(days_ago=30 + i) for i in range(3)]
+
+        cache.save(urls[0], _response(body))
+        cache.save(urls[1], _response(body))
+        cache.lookup(urls[0])
+        cache.save(urls[2], _response(body))
+
+        assert len(cache) == 2
+        assert cache.lookup(urls[1])[0] is None
+        assert cache.lookup(urls[0])[0] is not None
+
+    def test_repeated_scrape_costs_no_request(self, session):
+        def fake_get(url, **kwargs):
+            return _response(_make_response([_make_quote("2020-06-01")]))
+
+        session.session.get.side_effect = fake_get
+        for _ in range(2):
+            scraper = CmcScraper(
+                "BTC", "01-01-2015", "31-12-2020", id_number=1, session=session
+            )
+            scraper.get_data()
+
+        assert session.session.get.call_count == 6
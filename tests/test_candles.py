@@ -0,0 +1,435 @@
+"""
+Tests for the columnar candle storage.
+"""
+
+from array import array
+import datetime
+import io
+import math
+from unittest.mock import patch
+
+import pytest
+
+from cryptocmd import CmcScraper
+from cryptocmd.candles import (
+    Candles,
+    Resampler,
+    format_date,
+    format_time,
+    parse_time,
+    resample_chunks,
+)
+
+from .conftest import _make_quote, _make_response, _mock_get_url_data
+
+
+class TestTimeConversion:
+    """API timestamps round trip through int64 epoch milliseconds."""
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            "2013-04-28T00:00:00.000Z",
+            "2024-02-29T23:59:59.999Z",
+            "2026-04-25T12:34:56.789Z",
+        ],
+    )
+    def test_round_trip(self, value):
+        assert format_time(parse_time(value)) == value
+
+    def test_before_epoch(self):
+        value = "1969-12-31T23:59:59.999Z"
+        assert parse_time(value) == -1
+        assert format_time(-1) == value
+        assert format_date(-1) == "31-12-1969"
+
+    def test_other_layouts_fall_back_to_strptime(self):
+        assert parse_time("2024-01-01T00:00:00.5Z") == parse_time(
+            "2024-01-01T00:00:00.500Z"
+        )
+
+    def test_epoch(self):
+        assert parse_time("1970-01-01T00:00:00.000Z") == 0
+        assert parse_time("1970-01-02T00:00:00.001Z") == 86400001
+        assert format_date(86400001) == "02-01-1970"
+
+
+class TestCandles:
+    """Candles keep every field in a typed array."""
+
+    def test_columns_are_typed_arrays(self):
+        candles = Candles.from_quotes([_make_quote("2024-01-01")])
+        assert isinstance(candles.close, array) and candles.close.typecode == "d"
+        assert isinstance(candles.time_open, array)
+        assert candles.time_open.typecode == "q"
+        assert len(candles) == 1
+
+    def test_row_view_matches_api(self):
+        quote = _make_quote("2024-01-01")
+        row = Candles.from_quotes([quote]).row(0)
+        assert row == [
+            "01-01-2024",
+            50000.0,
+            51000.0,
+            49000.0,
+            50500.0,
+            1000000.0,
+            900000000000.0,
+            quote["timeOpen"],
+            quote["timeHigh"],
+            quote["timeLow"],
+            quote["timeClose"],
+        ]
+
+    def test_missing_values_round_trip_as_none(self):
+        quote = _make_quote("2024-01-01")
+        quote["quote"]["marketCap"] = None
+        candles = Candles.from_quotes([quote])
+        assert candles.row(0)[6] is None
+
+    def test_from_quotes_in_requested_order(self):
+        quotes = [_make_quote("2024-01-01"), _make_quote("2024-01-02")]
+        ascending = Candles.from_quotes(quotes)
+        descending = Candles.from_quotes(quotes, descending=True)
+        assert [r[0] for r in ascending.iter_rows()] == ["01-01-2024", "02-01-2024"]
+        assert [r[0] for r in descending.iter_rows()] == ["02-01-2024", "01-01-2024"]
+
+    def test_from_quotes_sorts_unordered_quotes(self):
+        quotes = [
+            _make_quote("2024-01-02"),
+            _make_quote("2024-01-03"),
+            _make_quote("2024-01-01"),
+        ]
+        candles = Candles.from_quotes(quotes, descending=True)
+        assert candles.is_sorted(descending=True)
+        assert candles.row(0)[0] == "03-01-2024"
+
+    def test_sort_and_reverse(self):
+        candles = Candles.from_quotes(
+            [
+                _make_quote("2024-01-02"),
+                _make_quote("2024-01-03"),
+                _make_quote("2024-01-01"),
+            ]
+        )
+        candles.sort()
+        assert [r[0] for r in candles.iter_rows()] == [
+            "01-01-2024",
+            "02-01-2024",
+            "03-01-2024",
+        ]
+        candles.reverse()
+        assert candles.row(0)[0] == "03-01-2024"
+
+
+class TestScraperColumns:
+    """CmcScraper keeps its data as columns and builds rows only when asked."""
+
+    def _scraper(self):
+        quotes = [_make_quote("2024-01-01"), _make_quote("2024-01-02")]
+        with patch("cryptocmd.utils.get_url_data") as mock_get:
+            mock_get.return_value = _mock_get_url_data(_make_response(quotes))
+            scraper = CmcScraper("BTC", "01-01-2024", "02-01-2024", id_number=1)
+            scraper._download_data()
+        return scraper
+
+    def test_rows_built_lazily(self):
+        scraper = self._scraper()
+        assert len(scraper.candles) == 2
+        assert scraper._rows is None
+        assert scraper.rows[0][0] == "02-01-2024"
+        assert scraper.rows is scraper.rows
+
+    def test_rows_assignment_replaces_data(self):
+        scraper = self._scraper()
+        scraper.rows = scraper.rows[:1]
+        assert len(scraper.candles) == 1
+        assert scraper.rows[0][0] == "02-01-2024"
+        assert scraper.start_date == scraper.end_date == "02-01-2024"
+        assert scraper.get_data("csv").count("\n") == 2
+
+    def test_rows_edited_in_place(self):
+        pd = pytest.importorskip("pandas")
+        scraper = self._scraper()
+        del scraper.rows[0]
+        scraper.rows[0][4] = 1.0
+
+        csv_data = scraper.get_data("csv")
+        assert csv_data.count("\n") == 2
+        assert csv_data.splitlines()[1].startswith(
+            "01-01-2024,50000.0,51000.0,49000.0,1.0"
+        )
+        dataframe = scraper.get_dataframe()
+        assert dataframe["Close"].tolist() == [1.0]
+        assert dataframe["Date"].tolist() == [pd.Timestamp(2024, 1, 1)]
+
+    def test_candles_edited_after_rows_built(self):
+        scraper = self._scraper()
+        assert len(scraper.rows) == 2
+        scraper.candles.close[0] = 1.0
+        assert scraper.get_data("csv").splitlines()[1].split(",")[4] == "1.0"
+
+    def test_export_does_not_build_rows(self):
+        scraper = self._scraper()
+        csv_data = scraper.get_data("csv")
+        assert csv_data.splitlines()[1].startswith("02-01-2024,50000.0")
+        assert scraper._rows is None
+
+    def test_dataframe_from_columns(self):
+        pd = pytest.importorskip("pandas")
+        dataframe = self._scraper().get_dataframe()
+        assert dataframe["Date"].iloc[0] == pd.Timestamp("2024-01-02")
+        assert dataframe["Close"].dtype == "float64"
+        assert str(dataframe["Time Open"].dtype) == "datetime64[ns, UTC]"
+        assert dataframe["Time Close"].iloc[1] == pd.Timestamp(
+            "2024-01-01T23:59:59.999Z"
+        )
+
+    def test_dataframe_without_copy_shares_memory(self):
+        np = pytest.importorskip("numpy")
+        pytest.importorskip("pandas")
+        scraper = self._scraper()
+        dataframe = scraper.get_dataframe(copy=False)
+        assert np.shares_memory(
+            dataframe["Close"].to_numpy(), scraper.candles.as_numpy("close", copy=False)
+        )
+        assert not np.shares_memory(
+            scraper.get_dataframe()["Close"].to_numpy(),
+            scraper.candles.as_numpy("close", copy=False),
+        )
+
+    def test_dataframe_without_copy_survives_redownload(self):
+        pytest.importorskip("pandas")
+        scraper = self._scraper()
+        dataframe = scraper.get_dataframe(copy=False)
+        quotes = [_make_quote("2024-01-01")]
+        with patch("cryptocmd.utils.get_url_data") as mock_get:
+            mock_get.return_value = _mock_get_url_data(_make_response(quotes))
+            scraper._download_data(forced=True)
+
+        assert len(scraper.candles) == 1
+        assert len(dataframe) == 2
+        dataframe = scraper.get_dataframe(copy=False)
+        with pytest.raises(BufferError):
+            scraper.candles.extend(quotes)
+
+    def test_dataframe_coin_column_of_id_number(self):
+        pytest.importorskip("pandas")
+        quotes = [_make_quote("2024-01-01")]
+        with patch("cryptocmd.utils.get_url_data") as mock_get:
+            mock_get.return_value = _mock_get_url_data(_make_response(quotes))
+            scraper = CmcScraper(None, "01-01-2024", "01-01-2024", id_number=1)
+            dataframe = scraper.get_dataframe(coin_column=True)
+
+        assert list(dataframe["Coin"]) == ["BTC"]
+
+    def test_dataframe_coin_column(self):
+        pytest.importorskip("pandas")
+        dataframe = self._scraper().get_dataframe(coin_column=True, date_as_index=True)
+        assert dataframe.columns[0] == "Coin"
+        assert dataframe["Coin"].dtype == "category"
+        assert list(dataframe["Coin"]) == ["BTC", "BTC"]
+
+
+def _varied_quotes(start, days):
+    """Return daily quotes from a ``datetime.date`` with prices changing every day."""
+    quotes = []
+    for i in range(days):
+        date_str = (start + datetime.timedelta(days=i)).isoformat()
+        quote = _make_quote(date_str)
+        price = 100.0 + (i * 37) % 50
+        quote["quote"].update(
+            open=price,
+            high=price + 10 + i % 7,
+            low=price - 10 - i % 5,
+            close=price + 1,
+            volume=1000.0 + i,
+            marketCap=1e6 + i,
+        )
+        quote["timeHigh"] = f"{date_str}T{i % 24:02d}:00:00.000Z"
+        quote["timeLow"] = f"{date_str}T{(i * 5) % 24:02d}:30:00.000Z"
+        quotes.append(quote)
+    return quotes
+
+
+def _rows(candles):
+    return list(candles.iter_rows())
+
+
+class TestResample:
+    """Daily candles roll up into weekly and monthly candles in a single pass."""
+
+    # monday 1 january 2024 to sunday 31 march 2024
+    _QUOTES = _varied_quotes(datetime.date(2024, 1, 1), 91)
+
+    def _daily(self, descending=False):
+        return Candles.from_quotes(self._QUOTES, descending=descending)
+
+    def test_weekly(self):
+        weekly = self._daily().resample("1w")
+
+        assert len(weekly) == 13
+        week = self._QUOTES[7:14]
+        assert weekly.row(1) == [
+            "08-01-2024",
+            week[0]["quote"]["open"],
+            max(q["quote"]["high"] for q in week),
+            min(q["quote"]["low"] for q in week),
+            week[-1]["quote"]["close"],
+            sum(q["quote"]["volume"] for q in week),
+            week[-1]["quote"]["marketCap"],
+            week[0]["timeOpen"],
+            max(week, key=lambda q: q["quote"]["high"])["timeHigh"],
+            min(week, key=lambda q: q["quote"]["low"])["timeLow"],
+            week[-1]["timeClose"],
+        ]
+
+    def test_monthly(self):
+        monthly = self._daily().resample("1M")
+
+        assert [row[0] for row in _rows(monthly)] == [
+            "01-01-2024",
+            "01-02-2024",
+            "01-03-2024",
+        ]
+        february = self._QUOTES[31:60]
+        assert monthly.volume[1] == sum(q["quote"]["volume"] for q in february)
+        assert monthly.close[2] == self._QUOTES[-1]["quote"]["close"]
+
+    def test_periods_of_many_days_weeks_and_months(self):
+        assert len(self._daily().resample("1d")) == 91
+        assert _rows(self._daily().resample("1d")) == _rows(self._daily())
+        assert len(self._daily().resample("2w")) == 7
+        assert len(self._daily().resample("3M")) == 1
+
+    def test_partial_first_period(self):
+        daily = Candles.from_quotes(self._QUOTES[2:10])
+        weekly = daily.resample("1w")
+        assert [row[0] for row in _rows(weekly)] == ["03-01-2024", "08-01-2024"]
+
+    def test_descending_matches_ascending(self):
+        ascending = self._daily().resample("1w")
+        descending = self._daily(descending=True).resample("1w")
+        descending.reverse()
+        assert _rows(descending) == _rows(ascending)
+
+    def test_missing_values_skipped(self):
+        quotes = _varied_quotes(datetime.date(2024, 1, 1), 7)
+        for field in ("open", "high", "low", "volume"):
+            quotes[0]["quote"][field] = None
+        quotes[-1]["quote"]["close"] = None
+        quotes[-1]["quote"]["marketCap"] = None
+
+        for descending in (False, True):
+            weekly = Candles.from_quotes(quotes, descending=descending).resample("1w")
+            assert weekly.open[0] == quotes[1]["quote"]["open"]
+            assert weekly.high[0] == max(q["quote"]["high"] for q in quotes[1:])
+            assert weekly.low[0] == min(q["quote"]["low"] for q in quotes[1:])
+            assert weekly.volume[0] == sum(q["quote"]["volume"] for q in quotes[1:])
+            assert weekly.close[0] == quotes[-2]["quote"]["close"]
+            assert weekly.market_cap[0] == quotes[-2]["quote"]["marketCap"]
+
+    def test_all_missing_stays_missing(self):
+        quotes = _varied_quotes(datetime.date(2024, 1, 1), 3)
+        for quote in quotes:
+            quote["quote"]["volume"] = None
+        weekly = Candles.from_quotes(quotes).resample("1w")
+        assert math.isnan(weekly.volume[0])
+
+    @pytest.mark.parametrize("descending", [False, True])
+    def test_chunks_match_whole(self, descending):
+        daily = self._daily(descending)
+        chunks = []
+        for start, end in ((0, 10), (10, 11), (11, 50), (50, 91)):
+            chunk = Candles()
+            for column, values in zip(chunk.columns, daily.columns):
+                column.extend(values[start:end])
+            chunks.append(chunk)
+
+        streamed = Candles()
+        for candles in resample_chunks(chunks, "1w", descending):
+            for column, values in zip(streamed.columns, candles.columns):
+                column.extend(values)
+
+        assert _rows(streamed) == _rows(daily.resample("1w"))
+
+    def test_complete_periods_yielded_early(self):
+        resampler = Resampler("1w")
+        assert len(resampler.feed(Candles.from_quotes(self._QUOTES[:10]))) == 1
+        assert len(resampler.flush()) == 1
+        assert len(resampler.flush()) == 0
+
+    def test_same_as_pandas(self):
+        pd = pytest.importorskip("pandas")
+        daily = self._daily()
+        frame = pd.DataFrame(
+            {name: daily.as_numpy(name) for name in daily.value_columns},
+            index=pd.to_datetime(daily.as_numpy("time_open"), unit="ms"),
+        )
+        expected = frame.resample("W-MON", label="left", closed="left").agg(
+            {"open": "first", "high": "max", "low": "min", "close": "last"}
+        )
+        expected["volume"] = (
+            frame["volume"].resample("W-MON", label="left", closed="left").sum()
+        )
+
+        weekly = daily.resample("1w")
+        for name in ("open", "high", "low", "close", "volume"):
+            assert list(weekly.as_numpy(name)) == list(expected[name])
+
+    @pytest.mark.parametrize("interval", ["", "0w", "1y", "1m", "-1d", "1.5w", 7, None])
+    def test_invalid_interval(self, interval):
+        with pytest.raises(ValueError):
+            self._daily().resample(interval)
+
+
+class TestScraperInterval:
+    """CmcScraper rolls its data up with ``interval``."""
+
+    def _scraper(self, order_ascending=False):
+        return CmcScraper(
+            None,
+            "01-01-2024",
+            "31-03-2024",
+            order_ascending=order_ascending,
+            id_number=1,
+        )
+
+    def test_get_data(self, cmc_api):
+        scraper = self._scraper()
+        headers, weekly = scraper.get_data(interval="1w")
+        _, daily = scraper.get_data()
+
+        assert headers == scraper.headers
+        assert weekly == _rows(scraper.candles.resample("1w"))
+        # newest first, like the daily data
+        assert weekly[0][7] > weekly[-1][7]
+        assert len(daily) == len(scraper.candles)
+
+    def test_get_data_format(self, cmc_api):
+        scraper = self._scraper()
+        csv = scraper.get_data("csv", interval="1M")
+        assert len(csv.strip().splitlines()) == 1 + 4
+
+    def test_invalid_interval_before_download(self, cmc_api):
+        with pytest.raises(ValueError):
+            self._scraper().get_data(interval="1y")
+        assert cmc_api.urls == []
+
+    @pytest.mark.parametrize("order_ascending", [True, False])
+    def test_streaming_matches_get_data(self, order_ascending, cmc_api):
+        scraper = self._scraper(order_ascending)
+        _, weekly = scraper.get_data(interval="1w")
+        streamed = list(self._scraper(order_ascending).iter_quotes(interval="1w"))
+        f = io.StringIO()
+        self._scraper(order_ascending).export_stream("csv", f, interval="1w")
+
+        assert streamed == weekly
+        assert len(f.getvalue().strip().splitlines()) == 1 + len(weekly)
+
+    def test_get_dataframe(self, cmc_api):
+        pytest.importorskip("pandas")
+        scraper = self._scraper()
+        dataframe = scraper.get_dataframe(interval="1M")
+        assert len(dataframe) == 4
+        assert len(scraper.candles) > 4
@@ -0,0 +1,129 @@
+"""
+Tests for the chunk level checkpoints of downloads.
+"""
+
+import datetime
+
+import pytest
+
+from cryptocmd import ChunkCheckpoint, CmcScraper
+from cryptocmd.utils import _chunk_windows, _date_range, download_coin_data
+
+_START, _END = "01-01-2015", "01-01-2021"
+
+
+def _windows():
+    return _chunk_windows(*_date_range(_START, _END))
+
+
+def _download(checkpoint, **kwargs):
+    return download_coin_data(
+        None, _START, _END, "USD", None, 1, checkpoint=checkpoint, **kwargs
+    )
+
+
+def _succeed(api):
+    # lets the fake api serve every window again, and forgets its requests
+    api.fail_years = ()
+    del api.urls[:]
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    return ChunkCheckpoint(str(tmp_path / "chunks.db"))
+
+
+class TestDownloadCoinData:
+    def test_retry_resumes_from_missing_windows(self, checkpoint, cmc_api):
+        windows = _windows()
+        cmc_api.fail_years = (2018,)
+        with pytest.raises(ConnectionError):
+            _download(checkpoint)
+        saved = len(checkpoint)
+        assert 0 < saved < len(windows)
+
+        _succeed(cmc_api)
+        data = _download(checkpoint)
+
+        assert len(cmc_api.urls) == len(windows) - saved
+        expected = _download(None)
+        assert data["data"]["quotes"] == expected["data"]["quotes"]
+        assert len(checkpoint) == 0
+
+    def test_concurrent_windows_saved_as_they_arrive(self, checkpoint, cmc_api):
+        windows = _windows()
+        cmc_api.fail_years = (2016,)
+        with pytest.raises(ConnectionError):
+            _download(checkpoint, max_workers=4)
+        saved = checkpoint.get(1, 2781, windows)
+        assert windows[0] in saved and windows[1] not in saved
+
+        _succeed(cmc_api)
+        _download(checkpoint, max_workers=4)
+        assert len(cmc_api.urls) == len(windows) - len(saved)
+
+    def test_no_resume_starts_over(self, checkpoint, cmc_api):
+        cmc_api.fail_years = (2018,)
+        with pytest.raises(ConnectionError):
+            _download(checkpoint)
+
+        _succeed(cmc_api)
+        _download(checkpoint, resume=False)
+        assert len(cmc_api.urls) == len(_windows())
+
+    def test_recent_windows_not_saved(self, checkpoint):
+        today = datetime.datetime.now(datetime.timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        recent = (today - datetime.timedelta(days=30), today)
+        closed = (recent[0] - datetime.timedelta(days=30), recent[0])
+
+        checkpoint.put(1, 2781, recent, {"data": {}})
+        checkpoint.put(1, 2781, closed, {"data": {}})
+
+        assert list(checkpoint.get(1, 2781, [recent, closed])) == [closed]
+
+
+class TestScraper:
+    def _scraper(self, checkpoint):
+        return CmcScraper(
+            None, _START, _END, id_number=1, max_workers=1, checkpoint=checkpoint
+        )
+
+    def test_retry_resumes(self, checkpoint, cmc_api):
+        scraper = self._scraper(checkpoint)
+        cmc_api.fail_years = (2018,)
+        with pytest.raises(ConnectionError):
+            scraper.get_data()
+        saved = len(checkpoint)
+        assert saved
+
+        _succeed(cmc_api)
+        _, rows = scraper.get_data()
+
+        assert len(cmc_api.urls) == len(_windows()) - saved
+        assert len(rows) == len(self._scraper(None).get_data()[1])
+
+    def test_forced_retry_resumes(self, checkpoint, cmc_api):
+        scraper = self._scraper(checkpoint)
+        scraper.get_data()
+        cmc_api.fail_years = (2018,)
+        with pytest.raises(ConnectionError):
+            scraper.get_data(forced=True)
+        saved = len(checkpoint)
+        assert saved
+
+        _succeed(cmc_api)
+        scraper.get_data(forced=True)
+        windows = _chunk_windows(*_date_range(scraper.start_date, scraper.end_date))
+        assert len(cmc_api.urls) == len(windows) - saved
+
+    def test_forced_starts_over(self, checkpoint, cmc_api):
+        # windows left by another scraper's failed download are not reused
+        cmc_api.fail_years = (2018,)
+        with pytest.raises(ConnectionError):
+            self._scraper(checkpoint).get_data()
+
+        _succeed(cmc_api)
+        self._scraper(checkpoint).get_data(forced=True)
+        assert len(cmc_api.urls) == len(_windows())
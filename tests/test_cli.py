@@ -0,0 +1,148 @@
+"""
+Tests for the cryptocmd command-line tool.
+"""
+
+import json
+import os
+from unittest.mock import PropertyMock, patch
+
+import pytest
+
+from cryptocmd import CmcScraper, cli
+from cryptocmd.utils import _chunk_windows, _date_range
+
+_DATES = ["--start", "01-01-2024", "--end", "02-01-2024"]
+
+
+def _manifest(path):
+    with open(os.path.join(path, cli._MANIFEST_NAME)) as f:
+        return json.load(f)
+
+
+# a single quote per window, so that every job writes one row
+@pytest.mark.parametrize("cmc_api", [{"day": "2024-01-01"}], indirect=True)
+class TestMain:
+    def test_one_file_per_coin(self, tmp_path, capsys, cmc_api):
+        status = cli.main(["btc", "eth", "52", "-o", str(tmp_path), "-j", "2"] + _DATES)
+
+        assert status == 0
+        files = sorted(os.listdir(tmp_path))
+        assert "btc_USD-01-01-2024_01-01-2024.csv" in files
+        assert "52_USD-01-01-2024_01-01-2024.csv" in files
+        assert len([name for name in files if name.endswith(".csv")]) == 3
+
+        err = capsys.readouterr().err
+        assert "[3/3]" in err
+        assert "3 jobs in" in err and "3 done" in err and "rows/s" in err
+
+    def test_coins_file_and_fiats(self, tmp_path, cmc_api):
+        coins_file = tmp_path / "coins.txt"
+        coins_file.write_text("# majors\nbtc, eth\n\nbtc\n")
+        out = tmp_path / "out"
+
+        status = cli.main(
+            ["-f", str(coins_file), "--fiat", "usd,eur", "-o", str(out), "-q"] + _DATES
+        )
+
+        assert status == 0
+        assert set(_manifest(out)["jobs"]) == {
+            "btc/USD",
+            "btc/EUR",
+            "eth/USD",
+            "eth/EUR",
+        }
+
+    def test_resumes_from_manifest(self, tmp_path, cmc_api):
+        argv = ["btc", "eth", "-o", str(tmp_path), "-q"] + _DATES
+
+        cmc_api.fail_ids = ("1027",)
+        assert cli.main(argv) == 1
+        jobs = _manifest(tmp_path)["jobs"]
+        assert jobs["btc/USD"] == {"status": "done", "rows": 1}
+        assert jobs["eth/USD"]["status"] == "failed"
+
+        cmc_api.fail_ids = ()
+        del cmc_api.urls[:]
+        assert cli.main(argv) == 0
+        historical = cmc_api.historical_urls
+        assert historical and all("id=1027" in url for url in historical)
+        assert _manifest(tmp_path)["jobs"]["eth/USD"]["status"] == "done"
+
+    def test_restart_ignores_manifest(self, tmp_path, cmc_api):
+        argv = ["btc", "-o", str(tmp_path), "-q"] + _DATES
+        cli.main(argv)
+
+        del cmc_api.urls[:]
+        cli.main(argv + ["--restart"])
+        assert cmc_api.historical_urls
+
+    def test_other_options_do_not_resume(self, tmp_path, capsys, cmc_api):
+        cli.main(["btc", "-o", str(tmp_path), "-q"] + _DATES)
+
+        status = cli.main(["btc", "-o", str(tmp_path), "-F", "json"] + _DATES)
+
+        assert status == 2
+        assert "--restart" in capsys.readouterr().err
+
+    def test_start_without_end_runs_up_to_today(self, tmp_path, cmc_api):
+        cli.main(["btc", "-s", "01-01-2024", "-o", str(tmp_path), "-q"])
+
+        # 2024 up to today, not every year since 2013
+        windows = _chunk_windows(*_date_range("01-01-2024", None))
+        assert len(cmc_api.historical_urls) == len(windows)
+
+    def test_other_fiats_do_not_resume(self, tmp_path, cmc_api):
+        cli.main(["btc", "-o", str(tmp_path), "-q"] + _DATES)
+        assert (
+            cli.main(["btc", "--fiat", "EUR", "-o", str(tmp_path), "-q"] + _DATES) == 2
+        )
+
+    def test_failed_export_is_failed_job(self, tmp_path, cmc_api):
+        argv = ["btc", "-o", str(tmp_path), "-q"] + _DATES
+        with patch("cryptocmd.core.CmcScraper.export", return_value=None):
+            assert cli.main(argv) == 1
+
+        jobs = _manifest(tmp_path)["jobs"]
+        assert jobs["btc/USD"]["status"] == "failed"
+
+    def test_rows_not_built(self, tmp_path, cmc_api):
+        rows = PropertyMock(side_effect=AssertionError("rows built"))
+        argv = ["btc", "-F", "json", "-o", str(tmp_path), "-q"] + _DATES
+        with patch.object(CmcScraper, "rows", rows):
+            assert cli.main(argv) == 0
+
+    def test_partitioned_dataset(self, tmp_path, cmc_api):
+        pytest.importorskip("pyarrow")
+        import pyarrow.dataset as ds
+
+        status = cli.main(
+            ["btc", "eth", "-F", "parquet", "--partition-by", "fiat,year"]
+            + ["--fiat", "USD,EUR", "-o", str(tmp_path), "-q"]
+            + _DATES
+        )
+
+        assert status == 0
+        table = ds.dataset(
+            str(tmp_path / "coins"), format="parquet", partitioning="hive"
+        ).to_table()
+        assert table.num_rows == 4
+        assert sorted(set(table.column("Coin").to_pylist())) == ["btc", "eth"]
+
+    def test_invalid_arguments(self, tmp_path, capsys, cmc_api):
+        with pytest.raises(SystemExit):
+            cli.main(["-o", str(tmp_path)])
+        with pytest.raises(SystemExit):
+            cli.main(["btc", "-F", "csv", "--partition-by", "coin"])
+        assert "--partition-by" in capsys.readouterr().err
+        with pytest.raises(SystemExit):
+            cli.main(["btc", "-e", "02-01-2024"])
+        assert "--end needs --start" in capsys.readouterr().err
+
+
+def test_split():
+    assert cli._split(["btc,eth  sol # comment", "# only a comment", "1027"]) == [
+        "btc",
+        "eth",
+        "sol",
+        "1027",
+    ]
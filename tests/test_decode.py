@@ -0,0 +1,104 @@
+"""
+Tests for the decoding of api responses.
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from cryptocmd import decode
+from cryptocmd.cache import CachedResponse
+from cryptocmd.candles import Candles
+
+from .conftest import _make_quote, _make_response
+
+
+def _response(body):
+    response = MagicMock(spec=["content", "json"])
+    response.content = body if isinstance(body, bytes) else json.dumps(body).encode()
+    return response
+
+
+def _fields(quote):
+    return {field: quote[field] for field in decode._Quote.__annotations__} | {
+        "quote": {
+            field: quote["quote"][field]
+            for field in decode._QuoteValues.__annotations__
+        }
+    }
+
+
+class TestHistorical:
+    """Historical responses keep the fields the scrapers read."""
+
+    def test_same_fields_as_json(self):
+        quotes = [_make_quote("2024-01-01"), _make_quote("2024-01-02")]
+        quotes[1]["quote"]["marketCap"] = None
+        body = _make_response(quotes)
+
+        json_data = decode.historical(_response(body))
+
+        assert json_data["status"]["error_code"] == 0
+        assert json_data["data"]["symbol"] == "BTC"
+        assert json_data["data"]["quotes"] == [_fields(q) for q in quotes]
+        assert len(Candles.from_quotes(json_data["data"]["quotes"])) == 2
+
+    def test_unused_fields_skipped(self):
+        pytest.importorskip("msgspec")
+        body = _make_response([_make_quote("2024-01-01")])
+        json_data = decode.historical(_response(body))
+        assert "timestamp" not in json_data["data"]["quotes"][0]["quote"]
+
+    def test_error_response(self):
+        body = {"status": {"error_code": "500", "error_message": "boom"}}
+        assert decode.historical(_response(body)) == body
+
+    def test_unexpected_schema_falls_back_to_json(self):
+        body = _make_response([_make_quote("2024-01-01")])
+        body["data"]["quotes"][0]["quote"]["open"] = "n/a"
+        assert decode.historical(_response(body)) == body
+
+    def test_invalid_json_raises_value_error(self):
+        with pytest.raises(ValueError):
+            decode.historical(_response(b"<html>503</html>"))
+
+    def test_without_fast_decoders(self):
+        body = _make_response([_make_quote("2024-01-01")])
+        with patch.object(decode, "_historical_decoder", None):
+            with patch.object(decode, "orjson", None):
+                assert decode.historical(_response(body)) == body
+
+
+class TestListing:
+    """Listing responses keep the id, symbol and name of the coins."""
+
+    def test_coins(self, listing):
+        body = json.loads(json.dumps(listing))
+        for coin in body["data"]["cryptoCurrencyList"]:
+            coin["quotes"] = [{"name": "USD", "price": 1.0}]
+            coin["tags"] = ["mineable"]
+
+        json_data = decode.listing(_response(body))
+
+        coins = json_data["data"]["cryptoCurrencyList"]
+        assert [c["id"] for c in coins] == [
+            c["id"] for c in listing["data"]["cryptoCurrencyList"]
+        ]
+        if decode.msgspec is not None:
+            assert set(coins[0]) == {"id", "symbol", "name"}
+
+    def test_mocked_response_uses_json(self, listing):
+        response = MagicMock()
+        response.json.return_value = listing
+        assert decode.listing(response) is listing
+
+    def test_cached_response_decoded_once(self, listing):
+        body = json.dumps(listing).encode()
+        response = CachedResponse("https://example.com", body, json_data=listing)
+        assert response.decoded
+        assert decode.listing(response) is listing
+
+        response = CachedResponse("https://example.com", body)
+        assert not response.decoded
+        assert decode.listing(response)["data"]["cryptoCurrencyList"]
@@ -0,0 +1,165 @@
+"""
+Tests for the timing events of requests, chunks, ingestion and exports.
+"""
+
+import datetime
+import logging
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from cryptocmd import CmcScraper, events
+from cryptocmd.utils import get_url_data
+
+
+@pytest.fixture
+def recorded():
+    """Record the events emitted while the test runs."""
+    recorded = []
+    events.add_listener(recorded.append)
+    yield recorded
+    events.remove_listener(recorded.append)
+
+
+def _names(recorded):
+    return [event.name for event in recorded]
+
+
+def _scraper(**kwargs):
+    return CmcScraper(
+        "BTC", "01-01-2024", "10-01-2024", id_number=1, max_workers=1, **kwargs
+    )
+
+
+class TestSpan:
+    def test_disabled_without_listeners(self):
+        with events.span("cryptocmd.test", a=1) as span:
+            assert not span
+            span.set(b=2)
+
+    def test_event(self, recorded):
+        with events.span("cryptocmd.test", a=1) as span:
+            assert span
+            span.set(b=2)
+
+        (event,) = recorded
+        assert event.name == "cryptocmd.test"
+        assert event.attributes == {"a": 1, "b": 2}
+        assert event.error is None
+        assert event.end_ns >= event.start_ns
+        assert event.duration >= 0
+
+    def test_error_recorded(self, recorded):
+        with pytest.raises(KeyError):
+            with events.span("cryptocmd.test"):
+                raise KeyError("boom")
+
+        assert isinstance(recorded[0].error, KeyError)
+
+    def test_failing_listener_ignored(self, recorded):
+        def failing(event):
+            raise RuntimeError("boom")
+
+        events.add_listener(failing)
+        try:
+            with events.span("cryptocmd.test"):
+                pass
+        finally:
+            events.remove_listener(failing)
+
+        assert _names(recorded) == ["cryptocmd.test"]
+
+    def test_remove_listener(self):
+        recorded = []
+        events.add_listener(recorded.append)
+        events.remove_listener(recorded.append)
+        with events.span("cryptocmd.test"):
+            pass
+        assert recorded == []
+
+
+class TestInstrumentation:
+    def test_request(self, recorded):
+        response = MagicMock(status_code=200, content=b"{}")
+        response.elapsed = datetime.timedelta(milliseconds=250)
+        session = MagicMock()
+        session.get.return_value = response
+
+        assert get_url_data("https://example.com/api", session=session) is response
+
+        (event,) = recorded
+        assert event.name == "cryptocmd.request"
+        assert event.attributes == {
+            "http.url": "https://example.com/api",
+            "http.status_code": 200,
+            "http.response.body.size": 2,
+            "http.elapsed": 0.25,
+        }
+
+    def test_download_and_ingest(self, recorded, cmc_api):
+        _, rows = _scraper().get_data()
+
+        names = _names(recorded)
+        assert names.count("cryptocmd.chunk") == 1
+        assert "cryptocmd.decode" in names
+        assert names.index("cryptocmd.download") < names.index("cryptocmd.ingest")
+
+        chunk = recorded[names.index("cryptocmd.chunk")]
+        assert chunk.attributes["cryptocmd.coin_id"] == 1
+        download = recorded[names.index("cryptocmd.download")]
+        assert download.attributes["cryptocmd.chunks"] == 1
+        ingest = recorded[names.index("cryptocmd.ingest")]
+        assert ingest.attributes["cryptocmd.rows"] == len(rows)
+
+    def test_dataframe(self, recorded, cmc_api):
+        pytest.importorskip("pandas")
+        dataframe = _scraper().get_dataframe()
+
+        (event,) = [e for e in recorded if e.name == "cryptocmd.dataframe"]
+        assert event.attributes["cryptocmd.rows"] == len(dataframe)
+
+    def test_export(self, recorded, tmp_path, cmc_api):
+        scraper = _scraper()
+        scraper.export("csv", name="btc", path=str(tmp_path))
+
+        (event,) = [e for e in recorded if e.name == "cryptocmd.export"]
+        assert event.attributes == {"cryptocmd.format": "csv"}
+
+    def test_no_events_when_disabled(self, cmc_api):
+        with patch.object(events, "_emit") as emit:
+            _scraper().get_data()
+
+        emit.assert_not_called()
+
+
+class TestListeners:
+    def _event(self, error=None):
+        return events.Event("cryptocmd.test", {"a": 1}, 1000, 3000, error)
+
+    def test_logging_listener(self, caplog):
+        listener = events.LoggingListener()
+        with caplog.at_level(logging.DEBUG, logger="cryptocmd"):
+            listener(self._event())
+
+        (record,) = caplog.records
+        assert record.name == "cryptocmd"
+        assert "cryptocmd.test" in record.getMessage()
+        assert record.event.attributes == {"a": 1}
+
+    def test_logging_listener_disabled_level(self, caplog):
+        with caplog.at_level(logging.INFO, logger="cryptocmd"):
+            events.LoggingListener()(self._event())
+        assert caplog.records == []
+
+    def test_opentelemetry_listener(self):
+        tracer = MagicMock()
+        error = ValueError("boom")
+
+        events.OpenTelemetryListener(tracer)(self._event(error))
+
+        tracer.start_span.assert_called_once_with(
+            "cryptocmd.test", attributes={"a": 1}, start_time=1000
+        )
+        span = tracer.start_span.return_value
+        span.record_exception.assert_called_once_with(error)
+        span.end.assert_called_once_with(end_time=3000)
@@ -0,0 +1,72 @@
+"""
+Tests for exporting scraped data.
+"""
+
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+
+from cryptocmd import CmcScraper
+from cryptocmd.utils import InvalidParameters
+
+
+class TestExportStream:
+    """export_stream writes every chunk as soon as it is downloaded."""
+
+    def _scraper(self, **kwargs):
+        return CmcScraper("BTC", "01-01-2021", "31-12-2023", id_number=1, **kwargs)
+
+    @pytest.mark.parametrize("order_ascending", [False, True])
+    def test_csv_same_as_export(self, order_ascending, cmc_api):
+        expected = self._scraper(order_ascending=order_ascending).get_data("csv")
+        out = io.StringIO(newline="")
+        self._scraper(order_ascending=order_ascending).export_stream("csv", out)
+
+        assert out.getvalue() == expected
+
+    def test_tsv_same_as_export(self, cmc_api):
+        expected = self._scraper().get_data("tsv")
+        out = io.StringIO(newline="")
+        self._scraper().export_stream("tsv", out)
+
+        assert out.getvalue() == expected
+
+    def test_jsonl(self, cmc_api):
+        expected = json.loads(self._scraper().get_data("json"))
+        out = io.StringIO()
+        self._scraper().export_stream("jsonl", out)
+
+        assert [json.loads(line) for line in out.getvalue().splitlines()] == expected
+
+    def test_chunks_written_before_next_download(self, fake_api):
+        out = io.StringIO(newline="")
+        written = []
+        fake = fake_api()
+
+        def recording(url, **kwargs):
+            written.append(len(out.getvalue().splitlines()))
+            return fake(url, **kwargs)
+
+        with patch("cryptocmd.utils.get_url_data", side_effect=recording):
+            self._scraper().export_stream("csv", out)
+
+        assert len(written) == 3
+        assert written[0] == 1  # only the headers
+        assert written[1] > 300 and written[2] > written[1]
+
+    def test_scraper_keeps_no_data(self, cmc_api):
+        scraper = self._scraper()
+        scraper.export_stream("csv", io.StringIO())
+
+        assert len(scraper.candles) == 0
+
+    def test_file_named_after_range(self, tmp_path, cmc_api):
+        self._scraper().export_stream("csv", path=str(tmp_path))
+
+        assert (tmp_path / "BTC_USD-01-01-2021_31-12-2023.csv").exists()
+
+    def test_unsupported_format(self):
+        with pytest.raises(InvalidParameters):
+            self._scraper().export_stream("xlsx", io.BytesIO())
@@ -0,0 +1,79 @@
+"""
+Tests for the single-flight de-duplication of concurrent requests.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import pytest
+
+from cryptocmd import CmcScraper
+from cryptocmd.flight import SingleFlight
+from cryptocmd.utils import get_coin_id
+
+# responses take a while, so that the requests of the scrapers overlap
+slow_api = pytest.mark.parametrize("cmc_api", [{"delay": 0.05}], indirect=True)
+
+
+class TestSingleFlight:
+    """Concurrent calls of the same key share a single call."""
+
+    def test_concurrent_calls_share_result(self):
+        flights = SingleFlight()
+        calls = []
+        started = threading.Event()
+
+        def fn():
+            calls.append(1)
+            started.set()
+            time.sleep(0.05)
+            return object()
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            leader = executor.submit(flights.do, "key", fn)
+            started.wait()
+            followers = [executor.submit(flights.do, "key", fn) for _ in range(3)]
+            results = {id(f.result()) for f in [leader] + followers}
+
+        assert len(calls) == 1
+        assert len(results) == 1
+
+    def test_error_shared_and_not_kept(self):
+        flights = SingleFlight()
+
+        def fail():
+            raise ConnectionError("boom")
+
+        with pytest.raises(ConnectionError):
+            flights.do("key", fail)
+        assert flights.do("key", lambda: 42) == 42
+
+    def test_different_keys_not_shared(self):
+        flights = SingleFlight()
+        assert flights.do("a", lambda: 1) == 1
+        assert flights.do("b", lambda: 2) == 2
+
+
+class TestSharedRequests:
+    """Scrapers asking for the same data at the same time send one request each."""
+
+    @slow_api
+    def test_same_windows_fetched_once(self, cmc_api):
+        def scrape():
+            return CmcScraper("BTC", "01-01-2020", "31-12-2023", id_number=1).get_data()
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            results = [f.result() for f in [executor.submit(scrape) for _ in "abc"]]
+
+        assert len(cmc_api.urls) == 4
+        assert results[0] == results[1] == results[2]
+        assert len(results[0][1]) == len(set(row[0] for row in results[0][1]))
+
+    @slow_api
+    def test_coin_id_resolved_with_one_listing_request(self, cmc_api):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            ids = list(executor.map(lambda c: get_coin_id(c, None), ["btc"] * 4))
+
+        assert ids == [1] * 4
+        assert len(cmc_api.urls) == 1
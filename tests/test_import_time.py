@@ -0,0 +1,59 @@
+"""
+Tests that 'import cryptocmd' leaves heavy dependencies unimported. Its wall-clock
+cost is measured in benchmarks/test_import.py.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+# modules only imported once the features needing them are used
+_DEFERRED_MODULES = (
+    "asyncio",
+    "email.utils",
+    "msgspec",
+    "orjson",
+    "requests",
+    "sqlite3",
+    "tablib",
+)
+
+
+def _imported_modules(statement):
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            statement + "\nimport sys\nprint('\\n'.join(sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stdout.splitlines())
+
+
+@pytest.mark.parametrize("module", _DEFERRED_MODULES)
+def test_module_not_imported(module):
+    assert module not in _imported_modules("import cryptocmd")
+
+
+def test_scraper_construction_is_lazy():
+    modules = _imported_modules(
+        "from cryptocmd import CmcScraper\nCmcScraper('BTC', '01-01-2024', '10-01-2024')"
+    )
+    assert "requests" not in modules
+    assert "tablib" not in modules
+
+
+def test_lazy_attributes():
+    import cryptocmd
+    from cryptocmd.aio import AsyncCmcScraper
+    from cryptocmd.store import CandleStore
+
+    assert cryptocmd.AsyncCmcScraper is AsyncCmcScraper
+    assert cryptocmd.CandleStore is CandleStore
+    assert "CoinRegistry" in dir(cryptocmd)
+    with pytest.raises(AttributeError):
+        cryptocmd.NotAScraper
@@ -0,0 +1,84 @@
+"""
+Tests for the cached coin id registry.
+"""
+
+import json
+import time
+
+import pytest
+
+from cryptocmd import CmcScraper, CoinRegistry
+from cryptocmd.registry import get_default_registry, set_default_registry
+from cryptocmd.utils import InvalidCoinCode, get_coin_id
+
+
+class TestCoinRegistry:
+    """CoinRegistry indexes the listing and serves lookups from memory."""
+
+    def test_lookup_by_code(self, cmc_api):
+        registry = CoinRegistry()
+        assert registry.get_id("btc") == 1
+        assert registry.get_id("ETH") == 1027
+        assert len(cmc_api.urls) == 1
+
+    def test_same_code_prefers_biggest_coin(self, cmc_api):
+        registry = CoinRegistry()
+        assert registry.get_id("sol") == 5426
+        assert registry.get_ids("sol") == [5426, 4236]
+
+    def test_lookup_by_code_and_name(self, cmc_api):
+        registry = CoinRegistry()
+        assert registry.get_id("sol", "solcoin") == 4236
+
+    def test_unknown_code_raises(self, cmc_api):
+        registry = CoinRegistry()
+        with pytest.raises(InvalidCoinCode):
+            registry.get_id("nope")
+        with pytest.raises(InvalidCoinCode):
+            registry.get_id("sol", "notsolana")
+
+    def test_listing_downloaded_again_after_ttl(self, cmc_api):
+        registry = CoinRegistry(ttl=60)
+        registry.get_id("btc")
+        registry.fetched_at = time.time() - 61
+        registry.get_id("btc")
+        assert len(cmc_api.urls) == 2
+
+    def test_listing_persisted_to_disk(self, cmc_api, tmp_path):
+        cache_path = str(tmp_path / "coins.json")
+        CoinRegistry(cache_path=cache_path).get_id("btc")
+
+        registry = CoinRegistry(cache_path=cache_path)
+        assert registry.get_id("eth") == 1027
+        assert len(cmc_api.urls) == 1
+
+    def test_stale_disk_cache_is_ignored(self, cmc_api, tmp_path):
+        cache_path = tmp_path / "coins.json"
+        cache_path.write_text(
+            json.dumps({"fetched_at": time.time() - 120, "coins": [[7, "BTC", "Old"]]})
+        )
+        registry = CoinRegistry(ttl=60, cache_path=str(cache_path))
+        assert registry.get_id("btc") == 1
+        assert len(cmc_api.urls) == 1
+
+
+class TestDefaultRegistry:
+    """get_coin_id shares one listing across all scrapers of the process."""
+
+    def test_get_coin_id_downloads_listing_once(self, cmc_api):
+        assert get_coin_id("btc", None) == 1
+        assert get_coin_id("sol", "solana") == 5426
+        assert len(cmc_api.urls) == 1
+
+    def test_scrapers_share_listing(self, cmc_api):
+        for code in ("btc", "eth", "sol"):
+            CmcScraper(code, "01-01-2024", "02-01-2024").get_data()
+
+        assert len([u for u in cmc_api.urls if "listing" in u]) == 1
+
+    def test_default_registry_can_be_replaced(self, cmc_api, tmp_path):
+        registry = CoinRegistry(cache_path=str(tmp_path / "coins.json"))
+        set_default_registry(registry)
+        assert get_default_registry() is registry
+        get_coin_id("btc", None)
+        assert (tmp_path / "coins.json").exists()
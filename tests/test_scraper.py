@@ -8,55 +8,15 @@ since the project already makes live network calls in CI.
 """
 
 import datetime
-from unittest.mock import MagicMock, patch
+import time
+from unittest.mock import patch
 
 import pytest
 
 from cryptocmd import CmcScraper
-from cryptocmd.utils import download_coin_data
+from cryptocmd.utils import InvalidParameters, download_coin_data, iter_coin_data
 
-
-# ---------------------------------------------------------------------------
-# Helpers
-# ---------------------------------------------------------------------------
-
-
-def _make_quote(date_str):
-    """Return a minimal CMC quote dict for a given UTC date string (YYYY-MM-DD)."""
-    return {
-        "timeOpen": f"{date_str}T00:00:00.000Z",
-        "timeHigh": f"{date_str}T12:00:00.000Z",
-        "timeLow": f"{date_str}T06:00:00.000Z",
-        "timeClose": f"{date_str}T23:59:59.999Z",
-        "quote": {
-            "open": 50000.0,
-            "high": 51000.0,
-            "low": 49000.0,
-            "close": 50500.0,
-            "volume": 1000000.0,
-            "marketCap": 900000000000.0,
-        },
-    }
-
-
-def _make_response(quotes, coin_id=1, symbol="BTC", name="Bitcoin"):
-    """Return a minimal CMC historical API response dict."""
-    return {
-        "status": {"error_code": 0, "error_message": None},
-        "data": {
-            "id": coin_id,
-            "symbol": symbol,
-            "name": name,
-            "quotes": quotes,
-        },
-    }
-
-
-def _mock_get_url_data(response_dict):
-    """Return a mock whose .json() returns response_dict."""
-    mock_response = MagicMock()
-    mock_response.json.return_value = response_dict
-    return mock_response
+from .conftest import _make_quote, _make_response, _mock_get_url_data
 
 
 # ---------------------------------------------------------------------------
@@ -73,7 +33,7 @@ class TestDefaultEndDate:
 
         captured_urls = []
 
-        def fake_get_url_data(url):
+        def fake_get_url_data(url, **kwargs):
             captured_urls.append(url)
             if "listing" in url:
                 return _mock_get_url_data(
@@ -121,7 +81,7 @@ class TestDefaultEndDate:
 
         captured_urls = []
 
-        def fake_get_url_data(url):
+        def fake_get_url_data(url, **kwargs):
             captured_urls.append(url)
             if "listing" in url:
                 return _mock_get_url_data(
@@ -153,7 +113,7 @@ class TestDefaultEndDate:
         explicit_end = "01-01-2024"
         captured_urls = []
 
-        def fake_get_url_data(url):
+        def fake_get_url_data(url, **kwargs):
             captured_urls.append(url)
             if "listing" in url:
                 return _mock_get_url_data(
@@ -208,6 +168,15 @@ class TestCmcScraperInit:
         assert scraper.start_date is not None
         assert scraper.end_date is not None
 
+    def test_start_after_end_raises_before_fetching(self):
+        """A start date after the end date is rejected without any request."""
+        with patch("cryptocmd.utils.get_url_data") as mock_get:
+            scraper = CmcScraper("BTC", "25-04-2026", "24-04-2026", id_number=1)
+            with pytest.raises(InvalidParameters):
+                scraper.get_data()
+
+        mock_get.assert_not_called()
+
     def test_scraper_rows_parsed_correctly(self):
         """Parsed rows contain correct values from API response."""
         quotes = [_make_quote("2026-04-25")]
@@ -255,6 +224,7 @@ class TestCmcScraperInit:
 
         assert rows[0][0] == "24-04-2026"
         assert rows[1][0] == "25-04-2026"
+        assert (scraper.start_date, scraper.end_date) == ("24-04-2026", "25-04-2026")
 
     def test_order_descending(self):
         """Default order (descending) returns newest row first."""
@@ -270,6 +240,168 @@ class TestCmcScraperInit:
         assert rows[1][0] == "24-04-2026"
 
 
+# ---------------------------------------------------------------------------
+# Unit tests — concurrent chunk fetching
+# ---------------------------------------------------------------------------
+
+
+def _url_params(url):
+    return dict(p.split("=") for p in url.split("?")[1].split("&"))
+
+
+def _fake_chunked_api(delay_first=0.0, fail_on=None):
+    """Return a fake get_url_data serving one quote dated at each chunk's timeEnd."""
+
+    def fake_get_url_data(url, **kwargs):
+        params = _url_params(url)
+        time_end = int(params["timeEnd"])
+        if fail_on is not None and time_end == fail_on:
+            raise ConnectionError("boom")
+        if delay_first and int(params["timeStart"]) < 1400000000:
+            # make the oldest window complete last
+            time.sleep(delay_first)
+        date_str = datetime.datetime.fromtimestamp(
+            time_end, tz=datetime.timezone.utc
+        ).strftime("%Y-%m-%d")
+        return _mock_get_url_data(_make_response([_make_quote(date_str)]))
+
+    return fake_get_url_data
+
+
+class TestConcurrentChunks:
+    """download_coin_data with max_workers fetches yearly chunks in parallel."""
+
+    def test_same_windows_as_serial(self):
+        """Concurrent mode requests exactly the windows the serial mode does."""
+        serial, concurrent = [], []
+
+        def recorder(urls):
+            fake = _fake_chunked_api()
+
+            def wrapped(url, **kwargs):
+                urls.append(url)
+                return fake(url)
+
+            return wrapped
+
+        with patch("cryptocmd.utils.get_url_data", side_effect=recorder(serial)):
+            download_coin_data(None, "01-01-2015", "01-01-2021", "USD", None, 1)
+        with patch("cryptocmd.utils.get_url_data", side_effect=recorder(concurrent)):
+            download_coin_data(
+                None, "01-01-2015", "01-01-2021", "USD", None, 1, max_workers=4
+            )
+
+        assert len(serial) > 1
+        assert sorted(serial) == sorted(concurrent)
+
+    def test_quotes_stitched_in_date_order(self):
+        """Quotes come back in window order even if windows complete out of order."""
+        with patch(
+            "cryptocmd.utils.get_url_data",
+            side_effect=_fake_chunked_api(delay_first=0.05),
+        ):
+            data = download_coin_data(
+                None, "01-01-2014", "01-01-2019", "USD", None, 1, max_workers=8
+            )
+
+        dates = [q["timeOpen"] for q in data["data"]["quotes"]]
+        assert len(dates) > 1
+        assert dates == sorted(dates)
+
+    def test_chunk_failure_raises(self):
+        """A failing chunk aborts the download like the serial loop does."""
+        end_ts = int(
+            datetime.datetime(2019, 1, 1, tzinfo=datetime.timezone.utc).timestamp()
+        )
+        with patch(
+            "cryptocmd.utils.get_url_data",
+            side_effect=_fake_chunked_api(fail_on=end_ts),
+        ):
+            with pytest.raises(ConnectionError):
+                download_coin_data(
+                    None, "01-01-2014", "01-01-2019", "USD", None, 1, max_workers=4
+                )
+
+    def test_scraper_passes_max_workers(self):
+        """CmcScraper forwards max_workers and parses every chunk."""
+        with patch("cryptocmd.utils.get_url_data", side_effect=_fake_chunked_api()):
+            scraper = CmcScraper(
+                "BTC", "01-01-2016", "01-01-2019", id_number=1, max_workers=3
+            )
+            _, rows = scraper.get_data()
+
+        assert rows[0][0] == "01-01-2019"
+        assert len(rows) == 3
+
+
+# ---------------------------------------------------------------------------
+# Unit tests — lazy consumption
+# ---------------------------------------------------------------------------
+
+
+class TestIterQuotes:
+    """iter_coin_data and CmcScraper.iter_quotes download windows on demand."""
+
+    def test_iter_coin_data_is_lazy(self):
+        urls = []
+        fake = _fake_chunked_api()
+
+        def recording(url, **kwargs):
+            urls.append(url)
+            return fake(url)
+
+        with patch("cryptocmd.utils.get_url_data", side_effect=recording):
+            quotes = iter_coin_data(None, "01-01-2016", "01-01-2019", "USD", None, 1)
+            assert urls == []
+            first = next(quotes)
+            assert len(urls) == 1
+            rest = list(quotes)
+
+        assert len(urls) == 3
+        dates = [q["timeOpen"] for q in [first] + rest]
+        assert dates == sorted(dates)
+
+    def test_iter_coin_data_newest_first(self):
+        with patch("cryptocmd.utils.get_url_data", side_effect=_fake_chunked_api()):
+            quotes = list(
+                iter_coin_data(
+                    None, "01-01-2016", "01-01-2019", "USD", None, 1, newest_first=True
+                )
+            )
+
+        dates = [q["timeOpen"] for q in quotes]
+        assert dates == sorted(dates, reverse=True)
+
+    @pytest.mark.parametrize("order_ascending", [False, True])
+    def test_iter_quotes_same_rows_as_get_data(self, order_ascending):
+        with patch("cryptocmd.utils.get_url_data", side_effect=_fake_chunked_api()):
+            _, rows = CmcScraper(
+                "BTC",
+                "01-01-2016",
+                "01-01-2019",
+                order_ascending=order_ascending,
+                id_number=1,
+            ).get_data()
+            scraper = CmcScraper(
+                "BTC",
+                "01-01-2016",
+                "01-01-2019",
+                order_ascending=order_ascending,
+                id_number=1,
+            )
+            assert list(scraper.iter_quotes()) == rows
+
+        assert len(scraper.candles) == 0
+
+    def test_iter_quotes_in_batches(self):
+        with patch("cryptocmd.utils.get_url_data", side_effect=_fake_chunked_api()):
+            scraper = CmcScraper("BTC", "01-01-2016", "01-01-2019", id_number=1)
+            batches = list(scraper.iter_quotes(batch_size=2))
+
+        assert [len(batch) for batch in batches] == [2, 1]
+        assert batches[0][0][0] == "01-01-2019"
+
+
 # ---------------------------------------------------------------------------
 # Integration tests — live network
 # ---------------------------------------------------------------------------
@@ -0,0 +1,62 @@
+"""
+Tests for the pooled HTTP transport.
+"""
+
+from unittest.mock import MagicMock, patch
+
+from cryptocmd import CmcScraper, CmcSession
+from cryptocmd.session import get_default_session
+from cryptocmd.utils import get_url_data
+
+from .conftest import _make_quote, _make_response, _mock_get_url_data
+
+
+class TestCmcSession:
+    """CmcSession configures a keep-alive connection pool."""
+
+    def test_pool_size_applied_to_adapters(self):
+        with CmcSession(pool_size=25) as session:
+            adapter = session.session.get_adapter("https://api.coinmarketcap.com")
+            assert adapter._pool_maxsize == 25
+            assert adapter._pool_connections == 25
+
+    def test_default_headers_request_gzip(self):
+        session = CmcSession()
+        assert "gzip" in session.session.headers["Accept-Encoding"]
+        assert session.session.headers["User-Agent"] == "Mozilla/5.0"
+
+    def test_timeout_used_when_not_given(self):
+        session = CmcSession(timeout=5)
+        session.session = MagicMock()
+        session.get("https://example.com")
+        session.session.get.assert_called_once_with("https://example.com", timeout=5)
+
+    def test_default_session_is_shared(self):
+        assert get_default_session() is get_default_session()
+
+
+class TestSessionReuse:
+    """Requests go through the given session instead of a fresh connection."""
+
+    def test_get_url_data_uses_given_session(self):
+        session = MagicMock()
+        get_url_data("https://example.com", session=session)
+        session.get.assert_called_once_with("https://example.com")
+
+    def test_get_url_data_defaults_to_shared_session(self):
+        with patch("cryptocmd.utils.get_default_session") as default:
+            get_url_data("https://example.com")
+        default.return_value.get.assert_called_once_with("https://example.com")
+
+    def test_scraper_passes_session_to_every_request(self):
+        session = MagicMock()
+        session.get.return_value = _mock_get_url_data(
+            _make_response([_make_quote("2026-04-25")])
+        )
+        scraper = CmcScraper(
+            "BTC", "01-01-2024", "25-04-2026", id_number=1, session=session
+        )
+        scraper.get_data()
+
+        assert session.get.call_count > 1
+        assert all("historical" in c.args[0] for c in session.get.call_args_list)
@@ -0,0 +1,105 @@
+"""
+Tests for the incremental candle store.
+"""
+
+import datetime
+import pytest
+
+from cryptocmd import CandleStore, CmcScraper
+
+from .conftest import _make_quote, _make_response
+
+
+def _days_response(start_day, end_day):
+    """Return json data with a quote for each day of [start_day, end_day]."""
+    return _make_response(
+        [
+            _make_quote(datetime.date.fromordinal(day).isoformat())
+            for day in range(start_day, end_day + 1)
+        ]
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CandleStore(str(tmp_path / "candles.db"))
+
+
+class TestMissingRanges:
+    """CandleStore keeps track of the days it already holds."""
+
+    def test_empty_store_misses_everything(self, store):
+        assert store.missing_ranges(1, "USD", 100, 200) == [(100, 200)]
+
+    def test_adjacent_ranges_are_merged(self, store):
+        store.put(1, "USD", _days_response(100, 150), 100, 150)
+        store.put(1, "USD", _days_response(151, 160), 151, 160)
+        store.put(1, "USD", _days_response(180, 190), 180, 190)
+
+        assert store.missing_ranges(1, "USD", 90, 200) == [
+            (90, 99),
+            (161, 179),
+            (191, 200),
+        ]
+        assert store.missing_ranges(1, "usd", 120, 155) == []
+
+    def test_ranges_are_kept_per_coin_and_fiat(self, store):
+        store.put(1, "USD", _days_response(100, 200), 100, 200)
+        assert store.missing_ranges(1, "EUR", 100, 200) == [(100, 200)]
+        assert store.missing_ranges(2, "USD", 100, 200) == [(100, 200)]
+
+    def test_days_not_returned_at_the_end_stay_missing(self, store):
+        store.put(1, "USD", _days_response(90, 195), 100, 200)
+        assert store.missing_ranges(1, "USD", 100, 200) == [(196, 200)]
+
+        store.put(1, "USD", _make_response([]), 196, 200)
+        assert store.missing_ranges(1, "USD", 100, 200) == [(196, 200)]
+
+
+class TestIncrementalScrape:
+    """A scraper backed by a store only downloads days it has not seen."""
+
+    def test_second_scrape_is_served_from_store(self, store, cmc_api):
+        first = CmcScraper("BTC", "01-01-2024", "10-01-2024", id_number=1, store=store)
+        _, first_rows = first.get_data()
+        requests_made = len(cmc_api.urls)
+        second = CmcScraper("BTC", "01-01-2024", "10-01-2024", id_number=1, store=store)
+        _, second_rows = second.get_data()
+
+        assert requests_made == 1
+        assert len(cmc_api.urls) == 1
+        assert second_rows == first_rows
+        assert [r[0] for r in second_rows][0] == "10-01-2024"
+        assert [r[0] for r in second_rows][-1] == "01-01-2024"
+
+    def test_only_new_days_are_downloaded(self, store, cmc_api):
+        CmcScraper(
+            "BTC", "01-01-2020", "31-12-2023", id_number=1, store=store
+        ).get_data()
+        del cmc_api.urls[:]
+        _, rows = CmcScraper(
+            "BTC", "01-01-2020", "02-01-2024", id_number=1, store=store
+        ).get_data()
+
+        assert len(cmc_api.urls) == 1
+        url = cmc_api.urls[0]
+        params = dict(p.split("=") for p in url.split("?")[1].split("&"))
+        # timeStart is exclusive, so the window starts the day before 01-01-2024
+        assert int(params["timeStart"]) == int(
+            datetime.datetime(2023, 12, 31, tzinfo=datetime.timezone.utc).timestamp()
+        )
+        assert rows[0][0] == "02-01-2024"
+        assert rows[-1][0] == "01-01-2020"
+        assert (
+            len(rows)
+            == (datetime.date(2024, 1, 2) - datetime.date(2020, 1, 1)).days + 1
+        )
+
+    def test_current_day_is_never_requested(self, store, cmc_api):
+        today = datetime.datetime.now(datetime.timezone.utc).date()
+        start = (today - datetime.timedelta(days=5)).strftime("%d-%m-%Y")
+        end = today.strftime("%d-%m-%Y")
+        CmcScraper("BTC", start, end, id_number=1, store=store).get_data()
+        CmcScraper("BTC", start, end, id_number=1, store=store).get_data()
+
+        assert len(cmc_api.urls) == 1
@@ -0,0 +1,178 @@
+"""
+Tests for rate limiting and retries of requests.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from requests.exceptions import ConnectionError, HTTPError
+
+from cryptocmd import CmcScraper, CmcSession
+from cryptocmd.throttle import (
+    RateLimiter,
+    RetryPolicy,
+    get_default_rate_limiter,
+    parse_retry_after,
+    set_default_rate_limiter,
+)
+
+
+def _response(status, headers=None):
+    response = MagicMock()
+    response.status_code = status
+    response.headers = headers or {}
+    return response
+
+
+@pytest.fixture(autouse=True)
+def fresh_default_rate_limiter():
+    set_default_rate_limiter(None)
+    yield
+    set_default_rate_limiter(None)
+
+
+class TestRateLimiter:
+    """RateLimiter is a token bucket which backs off when throttled."""
+
+    def test_unlimited_by_default(self):
+        limiter = RateLimiter()
+        assert [limiter.reserve() for _ in range(100)] == [0.0] * 100
+
+    def test_burst_then_waits_for_rate(self):
+        limiter = RateLimiter(rate=2, burst=2)
+        waits = [limiter.reserve() for _ in range(4)]
+        assert waits[:2] == [0.0, 0.0]
+        assert waits[2] == pytest.approx(0.5, abs=0.01)
+        assert waits[3] == pytest.approx(1.0, abs=0.01)
+
+    def test_throttled_pauses_and_halves_rate(self):
+        limiter = RateLimiter(rate=10)
+        limiter.throttled(3)
+        assert limiter.current_rate == 5
+        assert limiter.reserve() == pytest.approx(3, abs=0.01)
+
+    def test_throttled_pauses_unlimited_limiter(self):
+        limiter = RateLimiter()
+        limiter.throttled(2)
+        assert limiter.reserve() == pytest.approx(2, abs=0.01)
+
+    def test_rate_recovers_on_success(self):
+        limiter = RateLimiter(rate=10)
+        limiter.throttled(0)
+        for _ in range(20):
+            limiter.succeeded()
+        assert limiter.current_rate == 10
+
+    def test_default_rate_limiter_is_shared(self):
+        assert get_default_rate_limiter() is get_default_rate_limiter()
+        assert CmcSession().rate_limiter is None
+
+
+class TestRetryPolicy:
+    """RetryPolicy backs off exponentially with jitter, or as the server asks."""
+
+    def test_backoff_is_jittered_and_capped(self):
+        retry = RetryPolicy(backoff_factor=1, max_backoff=5)
+        for attempt in range(6):
+            assert 0 <= retry.delay(attempt) <= min(5, 2**attempt)
+
+    def test_retry_after_seconds_honored(self):
+        assert RetryPolicy().delay(0, "7") == 7
+
+    def test_retry_after_http_date(self):
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+    def test_gives_up_after_max_retries(self):
+        retry = RetryPolicy(max_retries=2)
+        assert retry.should_retry(1, 503)
+        assert not retry.should_retry(2, 503)
+        assert not retry.should_retry(0, 404)
+
+
+class TestSessionRetries:
+    """CmcSession retries transient failures of a single request."""
+
+    def test_retries_server_errors(self):
+        session = CmcSession()
+        session.session = MagicMock()
+        session.session.get.side_effect = [_response(503), _response(200)]
+        with patch("cryptocmd.session.time.sleep") as sleep:
+            response = session.get("https://example.com")
+
+        assert response.status_code == 200
+        assert session.session.get.call_count == 2
+        assert sleep.call_count == 1
+
+    def test_retries_connection_errors(self):
+        session = CmcSession()
+        session.session = MagicMock()
+        session.session.get.side_effect = [ConnectionError("reset"), _response(200)]
+        with patch("cryptocmd.session.time.sleep"):
+            assert session.get("https://example.com").status_code == 200
+
+    def test_throttled_request_pauses_shared_limiter(self):
+        limiter = RateLimiter(rate=4)
+        session = CmcSession(rate_limiter=limiter)
+        session.session = MagicMock()
+        session.session.get.side_effect = [
+            _response(429, {"Retry-After": "0"}),
+            _response(200),
+        ]
+        with patch("cryptocmd.session.time.sleep") as sleep:
+            session.get("https://example.com")
+
+        sleep.assert_called_once_with(0)
+        assert limiter.current_rate == pytest.approx(2 * 1.1)
+
+    def test_exhausted_retries_raise(self):
+        limiter = RateLimiter(rate=4)
+        session = CmcSession(rate_limiter=limiter, retry=RetryPolicy(max_retries=1))
+        session.session = MagicMock()
+        session.session.get.return_value = _response(503)
+        session.session.get.return_value.raise_for_status.side_effect = HTTPError()
+        with (
+            patch("cryptocmd.session.time.sleep"),
+            patch.object(limiter, "succeeded") as succeeded,
+        ):
+            with pytest.raises(HTTPError):
+                session.get("https://example.com")
+
+        assert session.session.get.call_count == 2
+        succeeded.assert_not_called()
+
+    def test_retries_disabled(self):
+        session = CmcSession(retry=False)
+        session.session = MagicMock()
+        session.session.get.return_value = _response(503)
+        assert session.get("https://example.com").status_code == 503
+        assert session.session.get.call_count == 1
+
+    def test_only_failed_chunk_is_requested_again(self, fake_api):
+        fake = fake_api()
+        with patch("cryptocmd.utils.get_url_data", side_effect=fake):
+            _, expected = CmcScraper(
+                "BTC", "01-01-2020", "31-12-2023", id_number=1
+            ).get_data()
+        urls = []
+
+        def fake_get(url, **kwargs):
+            urls.append(url)
+            # the second window is throttled once
+            if len(urls) == 2:
+                return _response(429, {"Retry-After": "0"})
+            return fake(url)
+
+        session = CmcSession()
+        session.session = MagicMock()
+        session.session.get.side_effect = fake_get
+        scraper = CmcScraper(
+            "BTC", "01-01-2020", "31-12-2023", id_number=1, session=session
+        )
+        with patch("cryptocmd.session.time.sleep"):
+            _, rows = scraper.get_data()
+
+        assert rows == expected
+        assert len(urls) == 5
+        assert urls.count(urls[1]) == 2